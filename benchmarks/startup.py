@@ -0,0 +1,123 @@
+"""Startup-time guard for the CLI.
+
+Runs ``shelfie list`` under ``python -X importtime`` against a throwaway data
+dir and fails if any module on the heavy list was imported on the way, or
+if the command is over either budget:
+
+- the target, 300 ms over a bare interpreter (``--total-budget-ms``);
+- shelfie's own cost, 125 ms above an interpreter that only imports the
+  third-party modules ``list`` can't do without (``FLOOR``, ``--budget-ms``).
+
+Those third-party imports alone take 150-300 ms depending on the machine,
+so the first check also tracks the hardware; the second isolates the code.
+
+    python benchmarks/startup.py                # default budgets
+    python benchmarks/startup.py --budget-ms 100 --runs 9 --top 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HEAVY_MODULES = (
+    "chromadb",
+    "numpy",
+    "openai",
+    "pydantic_ai",
+    "httpx",
+    "fastapi",
+    "uvicorn",
+    "sqlite3",
+)
+
+RUNNER = "from shelfie.cli import app; app(['list'])"
+# Settings, the terminal UI and the document store: needed by ``list`` itself.
+FLOOR = "import pydantic_settings, rich.console, rich.table, typer, tinydb"
+
+
+def _run(env: dict[str, str], importtime: bool = False) -> tuple[float, str]:
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", RUNNER]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        sys.exit(f"shelfie list failed:\n{proc.stderr}")
+    return elapsed, proc.stderr
+
+
+def _time_code(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True)
+    return time.perf_counter() - start
+
+
+def _parse_importtime(stderr: str) -> list[tuple[int, str]]:
+    """Return (cumulative microseconds, module) for every ``-X importtime`` line."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative), name))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--total-budget-ms", type=float, default=300.0,
+                        help="over a bare interpreter")
+    parser.add_argument("--budget-ms", type=float, default=125.0,
+                        help="over the required third-party imports")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to print")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = {**os.environ, "MYREADS_DATA_DIR": data_dir}
+        _run(env)  # warm the filesystem cache and create the data dir
+
+        # Interleaved, so a machine that speeds up or slows down mid-run
+        # shifts both sides alike.
+        bare, floor, timings = [], [], []
+        for _ in range(args.runs):
+            bare.append(_time_code("pass"))
+            floor.append(_time_code(FLOOR))
+            timings.append(_run(env)[0])
+        _, stderr = _run(env, importtime=True)
+
+    imports = _parse_importtime(stderr)
+    loaded = {name for _, name in imports}
+    heavy = sorted(m for m in HEAVY_MODULES if m in loaded)
+
+    total_ms = (statistics.median(timings) - statistics.median(bare)) * 1000
+    own_ms = (statistics.median(timings) - statistics.median(floor)) * 1000
+    print(f"shelfie list (median of {args.runs}): "
+          f"{total_ms:.0f} ms over a bare interpreter (budget {args.total_budget_ms:.0f} ms), "
+          f"{own_ms:.0f} ms over its required imports (budget {args.budget_ms:.0f} ms)")
+    print("slowest imports (cumulative):")
+    for cumulative, name in sorted(imports, reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:7.1f} ms  {name}")
+
+    failures = []
+    if heavy:
+        failures.append(f"heavy modules imported: {', '.join(heavy)}")
+    if total_ms > args.total_budget_ms:
+        failures.append(f"{total_ms:.0f} ms exceeds the {args.total_budget_ms:.0f} ms target")
+    if own_ms > args.budget_ms:
+        failures.append(f"{own_ms:.0f} ms over the required imports exceeds the {args.budget_ms:.0f} ms budget")
+    if failures:
+        sys.exit("FAIL: " + "; ".join(failures))
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
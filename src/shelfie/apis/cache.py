@@ -0,0 +1,416 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from array import array
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from shelfie.config import Settings
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def make_key(provider: str, query: str, params: dict | None = None) -> str:
+    """Build a cache key from provider + normalized query + sorted params."""
+    encoded = json.dumps(params or {}, sort_keys=True, separators=(",", ":"))
+    return f"{provider}|{_normalize_query(query)}|{encoded}"
+
+
+class ResponseCache:
+    """On-disk, TTL-bounded LRU cache for external API responses.
+
+    Entries are JSON payloads stored in a single SQLite table. Reads bump
+    ``last_used`` so that eviction drops the least recently used rows once
+    the table grows past ``max_entries``.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: int = 86400, max_entries: int = 5000) -> None:
+        self._path = path
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = _connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+        )
+
+    def get(self, provider: str, query: str, params: dict | None = None) -> Any | None:
+        key = make_key(provider, query, params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self._ttl:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, provider: str, query: str, value: Any, params: dict | None = None) -> None:
+        key = make_key(provider, query, params)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, last_used)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self._evict()
+
+    def get_or_fetch(
+        self,
+        provider: str,
+        query: str,
+        fetch: Callable[[], Any],
+        params: dict | None = None,
+        refresh: bool = False,
+    ) -> Any:
+        """Return the cached value, or call ``fetch`` and store its result.
+
+        ``refresh=True`` skips the lookup and overwrites whatever is cached.
+        """
+        if not refresh:
+            cached = self.get(provider, query, params)
+            if cached is not None:
+                return cached
+        value = fetch()
+        self.set(provider, query, value, params)
+        return value
+
+    def _evict(self) -> None:
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = count - self._max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN"
+                " (SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+        self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (time.time() - self._ttl,)
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": size,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Content-addressed embedding store keyed by (model, sha256 of text).
+
+    Vectors are kept as float32 blobs. Once the stored bytes exceed
+    ``max_bytes`` the least recently used vectors are evicted.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = _connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, hash))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    def get_many(self, model: str, texts: list[str]) -> list[list[float] | None]:
+        """Return the cached vector for each text, or None where it's missing."""
+        hashes = [text_hash(t) for t in texts]
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({placeholders})",
+                    (model, *chunk),
+                ).fetchall()
+                for h, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[h] = vector.tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND hash = ?",
+                    [(now, model, h) for h in found],
+                )
+            results = [found.get(h) for h in hashes]
+            hit_count = sum(1 for r in results if r is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, model: str, texts: list[str], vectors: list[list[float]]) -> None:
+        now = time.time()
+        rows = [
+            (model, text_hash(t), array("f", v).tobytes(), now)
+            for t, v in zip(texts, vectors)
+        ]
+        with self._lock:
+            added = 0
+            self._conn.execute("BEGIN")
+            try:
+                for row in rows:
+                    old = self._conn.execute(
+                        "SELECT LENGTH(vector) FROM embeddings WHERE model = ? AND hash = ?",
+                        row[:2],
+                    ).fetchone()
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO embeddings (model, hash, vector, last_used)"
+                        " VALUES (?, ?, ?, ?)",
+                        row,
+                    )
+                    added += len(row[2]) - (old[0] if old else 0)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._total_bytes += added
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._total_bytes > self._max_bytes:
+            rows = self._conn.execute(
+                "SELECT model, hash, LENGTH(vector) FROM embeddings ORDER BY last_used LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            victims = []
+            for model, h, size in rows:
+                if self._total_bytes <= self._max_bytes:
+                    break
+                victims.append((model, h))
+                self._total_bytes -= size
+            self._conn.executemany(
+                "DELETE FROM embeddings WHERE model = ? AND hash = ?", victims
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+            "bytes": self._total_bytes,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._total_bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Provider answers of "no such ISBN" are rechecked sooner than real metadata.
+_METADATA_MISS_TTL_SECONDS = 24 * 3600
+
+
+class BookMetadataStore:
+    """Book metadata keyed by ISBN, one :class:`BookSearchResult` dump per row.
+
+    Unlike the response cache, rows are never evicted: a row older than
+    ``ttl_seconds`` is returned flagged as stale, so callers can refetch it
+    but still fall back to it when the providers are down. A ``None``
+    document records that no provider knew the ISBN.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: int = 30 * 86400) -> None:
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = _connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS books ("
+            " isbn TEXT PRIMARY KEY,"
+            " doc TEXT,"
+            " fetched_at REAL NOT NULL)"
+        )
+
+    def get_many(self, isbns: list[str]) -> dict[str, tuple[dict | None, bool]]:
+        """``isbn -> (doc, stale)`` for every ISBN that has a row."""
+        now = time.time()
+        found: dict[str, tuple[dict | None, bool]] = {}
+        with self._lock:
+            unique = list(dict.fromkeys(isbns))
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT isbn, doc, fetched_at FROM books WHERE isbn IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for isbn, doc, fetched_at in rows:
+                    ttl = self._ttl if doc is not None else min(self._ttl, _METADATA_MISS_TTL_SECONDS)
+                    found[isbn] = (json.loads(doc) if doc else None, now - fetched_at > ttl)
+            fresh = sum(1 for _, stale in found.values() if not stale)
+            self.hits += fresh
+            self.misses += len(unique) - fresh
+        return found
+
+    def put_many(self, docs: dict[str, dict | None]) -> None:
+        if not docs:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO books (isbn, doc, fetched_at) VALUES (?, ?, ?)",
+                    [
+                        (isbn, json.dumps(doc) if doc is not None else None, now)
+                        for isbn, doc in docs.items()
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def stats(self) -> dict:
+        cutoff = time.time() - self._ttl
+        with self._lock:
+            entries, stale = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(fetched_at < ?), 0) FROM books", (cutoff,)
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+            "stale": stale,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM books")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_caches: dict[Path, ResponseCache | EmbeddingCache | BookMetadataStore] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(settings: Settings) -> ResponseCache | None:
+    """Return the shared response cache for this data dir, or None if disabled."""
+    if not settings.api_cache_enabled:
+        return None
+    path = settings.api_cache_path
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            settings.ensure_data_dir()
+            cache = ResponseCache(
+                path,
+                ttl_seconds=settings.api_cache_ttl_seconds,
+                max_entries=settings.api_cache_max_entries,
+            )
+            _caches[path] = cache
+        return cache
+
+
+def get_embedding_cache(settings: Settings) -> EmbeddingCache | None:
+    """Return the shared embedding cache for this data dir, or None if disabled."""
+    if not settings.embedding_cache_enabled:
+        return None
+    path = settings.embedding_cache_path
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            settings.ensure_data_dir()
+            cache = EmbeddingCache(path, max_bytes=settings.embedding_cache_max_mb * 1024 * 1024)
+            _caches[path] = cache
+        return cache
+
+
+def get_metadata_store(settings: Settings) -> BookMetadataStore | None:
+    """Return the shared book metadata store for this data dir, or None if disabled."""
+    if not settings.book_metadata_enabled:
+        return None
+    path = settings.book_metadata_path
+    with _caches_lock:
+        store = _caches.get(path)
+        if store is None:
+            settings.ensure_data_dir()
+            store = BookMetadataStore(path, ttl_seconds=settings.book_metadata_ttl_seconds)
+            _caches[path] = store
+        return store
+
+
+def close_caches() -> None:
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.close()
+        _caches.clear()
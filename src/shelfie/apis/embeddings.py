@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from functools import lru_cache
+
+from shelfie.apis import openai_client
+from shelfie.apis.cache import get_embedding_cache
+from shelfie.config import Settings
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+class EmbeddingProvider(ABC):
+    """Turns text into vectors. ``model`` is recorded with every stored vector."""
+
+    model: str
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> list[list[float]]: ...
+
+    async def aembed(self, texts: list[str]) -> list[list[float]]:
+        return await asyncio.to_thread(self.embed, texts)
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """OpenAI embeddings, fronted by the on-disk embedding cache."""
+
+    def __init__(self, settings: Settings) -> None:
+        self._settings = settings
+        self.model = settings.openai_embedding_model
+
+    @property
+    def available(self) -> bool:
+        return bool(self._settings.openai_api_key)
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return openai_client.get_embeddings(
+            texts,
+            api_key=self._settings.openai_api_key,
+            model=self.model,
+            cache=get_embedding_cache(self._settings),
+            base_url=self._settings.openai_base_url,
+        )
+
+    async def aembed(self, texts: list[str]) -> list[list[float]]:
+        # The first call opens the SQLite cache; don't do that on the loop.
+        cache = await asyncio.to_thread(get_embedding_cache, self._settings)
+        return await openai_client.aget_embeddings(
+            texts,
+            api_key=self._settings.openai_api_key,
+            model=self.model,
+            cache=cache,
+            base_url=self._settings.openai_base_url,
+        )
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """Offline, CPU-only embeddings via signed feature hashing.
+
+    Words and character trigrams are hashed into ``dim`` buckets with a
+    random sign, weighted by sublinear term frequency and L2-normalized.
+    That is a fixed random projection of a bag-of-ngrams TF vector, so
+    texts with shared vocabulary and spelling land close together under
+    cosine similarity. No model download and no network; a review embeds
+    in well under a millisecond.
+    """
+
+    def __init__(self, dim: int = 384) -> None:
+        self.dim = dim
+        self.model = f"local-hash-{dim}"
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed_one(text) for text in texts]
+
+    def _embed_one(self, text: str) -> list[float]:
+        vector = [0.0] * self.dim
+        for feature, count in _features(text).items():
+            index, sign = _bucket(feature, self.dim)
+            vector[index] += sign * (1.0 + math.log(count))
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm:
+            vector = [v / norm for v in vector]
+        return vector
+
+
+def _features(text: str) -> Counter[str]:
+    features: Counter[str] = Counter()
+    for word in _WORD_RE.findall(text.lower()):
+        features[f"w:{word}"] += 2
+        padded = f"#{word}#"
+        for i in range(len(padded) - 2):
+            features[f"c:{padded[i:i + 3]}"] += 1
+    return features
+
+
+@lru_cache(maxsize=65536)
+def _bucket(feature: str, dim: int) -> tuple[int, float]:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % dim, 1.0 if value >> 63 else -1.0
+
+
+def get_embedding_provider(settings: Settings) -> EmbeddingProvider:
+    """Return the embedding provider selected by ``settings.embedding_provider``."""
+    if settings.embedding_provider == "local":
+        return LocalEmbeddingProvider(dim=settings.local_embedding_dim)
+    return OpenAIEmbeddingProvider(settings)
@@ -1,49 +1,94 @@
 from __future__ import annotations
 
-import httpx
-
+from shelfie.apis import http_client
 from shelfie.models import BookSearchResult
 
 BASE_URL = "https://www.googleapis.com/books/v1/volumes"
+# ISBNs OR-ed into one query; maxResults tops out at 40, which leaves room
+# for a few extra editions per ISBN.
+ISBN_BATCH = 20
+_MAX_RESULTS = 40
 
 
-def search(query: str, api_key: str = "", max_results: int = 5) -> list[BookSearchResult]:
+def _params(query: str, api_key: str, max_results: int) -> dict:
     params: dict = {"q": query, "maxResults": max_results}
     if api_key:
         params["key"] = api_key
+    return params
+
+
+def search(query: str, api_key: str = "", max_results: int = 5) -> list[BookSearchResult]:
+    resp = http_client.get_client("google_books").get(
+        BASE_URL, params=_params(query, api_key, max_results)
+    )
+    resp.raise_for_status()
+    return _parse(resp.json())
+
+
+async def search_async(query: str, api_key: str = "", max_results: int = 5) -> list[BookSearchResult]:
+    resp = await http_client.get_async_client("google_books").get(
+        BASE_URL, params=_params(query, api_key, max_results)
+    )
+    resp.raise_for_status()
+    return _parse(resp.json())
+
+
+def _parse(data: dict) -> list[BookSearchResult]:
+    return [_parse_item(item) for item in data.get("items", [])]
 
-    resp = httpx.get(BASE_URL, params=params, timeout=10)
+
+def _parse_item(item: dict) -> BookSearchResult:
+    info = item.get("volumeInfo", {})
+    identifiers = info.get("industryIdentifiers", [])
+    isbn = ""
+    for ident in identifiers:
+        if ident.get("type") == "ISBN_13":
+            isbn = ident["identifier"]
+            break
+        if ident.get("type") == "ISBN_10":
+            isbn = ident["identifier"]
+
+    return BookSearchResult(
+        title=info.get("title", "Unknown"),
+        author=", ".join(info.get("authors", ["Unknown"])),
+        isbn=isbn,
+        description=info.get("description", ""),
+        published_date=info.get("publishedDate", ""),
+        page_count=info.get("pageCount", 0),
+        categories=info.get("categories", []),
+        average_rating=info.get("averageRating", 0.0),
+        ratings_count=info.get("ratingsCount", 0),
+        source="google_books",
+        info_url=info.get("infoLink", ""),
+    )
+
+
+def lookup_isbns(
+    isbns: list[str], api_key: str = ""
+) -> tuple[dict[str, BookSearchResult], set[str]]:
+    """Metadata for many ISBNs in one ``isbn:a OR isbn:b`` query, keyed by the ISBN asked for.
+
+    Volumes are matched back through their ISBN-10 and ISBN-13 identifiers,
+    so an ISBN-10 request still finds a volume listed under its ISBN-13.
+    Also returns the ISBNs the response settles, found or not: when a page
+    comes back full (editions can crowd out other ISBNs), only the ones it
+    matched.
+    """
+    query = " OR ".join(f"isbn:{isbn}" for isbn in isbns)
+    resp = http_client.get_client("google_books").get(
+        BASE_URL, params=_params(query, api_key, _MAX_RESULTS)
+    )
     resp.raise_for_status()
-    data = resp.json()
-
-    results: list[BookSearchResult] = []
-    for item in data.get("items", []):
-        info = item.get("volumeInfo", {})
-        identifiers = info.get("industryIdentifiers", [])
-        isbn = ""
-        for ident in identifiers:
-            if ident.get("type") == "ISBN_13":
-                isbn = ident["identifier"]
-                break
-            if ident.get("type") == "ISBN_10":
-                isbn = ident["identifier"]
-
-        results.append(
-            BookSearchResult(
-                title=info.get("title", "Unknown"),
-                author=", ".join(info.get("authors", ["Unknown"])),
-                isbn=isbn,
-                description=info.get("description", ""),
-                published_date=info.get("publishedDate", ""),
-                page_count=info.get("pageCount", 0),
-                categories=info.get("categories", []),
-                average_rating=info.get("averageRating", 0.0),
-                ratings_count=info.get("ratingsCount", 0),
-                source="google_books",
-                info_url=info.get("infoLink", ""),
-            )
-        )
-    return results
+    items = resp.json().get("items", [])
+    wanted = set(isbns)
+    results: dict[str, BookSearchResult] = {}
+    for item in items:
+        for ident in item.get("volumeInfo", {}).get("industryIdentifiers", []):
+            isbn = ident.get("identifier", "")
+            if isbn in wanted and isbn not in results:
+                results[isbn] = _parse_item(item).model_copy(update={"isbn": isbn})
+    answered = set(results) if len(items) >= _MAX_RESULTS else wanted
+    return results, answered
 
 
 def lookup_isbn(title: str, author: str, api_key: str = "") -> str | None:
@@ -53,3 +98,11 @@ def lookup_isbn(title: str, author: str, api_key: str = "") -> str | None:
     if results and results[0].isbn:
         return results[0].isbn
     return None
+
+
+async def lookup_isbn_async(title: str, author: str, api_key: str = "") -> str | None:
+    query = f'intitle:{title} inauthor:{author}'
+    results = await search_async(query, api_key=api_key, max_results=1)
+    if results and results[0].isbn:
+        return results[0].isbn
+    return None
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from shelfie.config import Settings, get_settings
+
+T = TypeVar("T")
+
+# Samples kept per provider, whatever their age.
+_MAX_SAMPLES = 200
+# The breaker judges the error rate on this many most recent calls, so an
+# outage isn't diluted by a long run of earlier successes.
+_BREAKER_CALLS = 20
+# Fewer successful samples than this and the p95 isn't trusted for hedging.
+_MIN_LATENCY_SAMPLES = 10
+_MIN_HEDGE_SECONDS = 0.05
+
+
+class ProviderUnavailable(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+
+class ProviderHealth:
+    """Rolling latency and error rate for one provider, plus its circuit breaker.
+
+    Every call is recorded as ``(finished_at, seconds, ok)``; only samples
+    from the last ``window_seconds`` count. The breaker opens once the last
+    20 of those (at least ``min_calls``) have an error rate of
+    ``error_rate`` or more.
+    While open, :meth:`allow` refuses calls. After ``cooldown_seconds`` it lets
+    a single probe through (half-open): success closes the breaker and
+    starts a clean window, failure reopens it for another cooldown.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 300.0,
+        error_rate: float = 0.5,
+        min_calls: int = 5,
+        cooldown_seconds: float = 30.0,
+    ) -> None:
+        self.name = name
+        self._window = window_seconds
+        self._error_rate = error_rate
+        self._min_calls = min_calls
+        self._cooldown = cooldown_seconds
+        self._lock = threading.Lock()
+        self._samples: deque[tuple[float, float, bool]] = deque(maxlen=_MAX_SAMPLES)
+        self._opened_at: float | None = None
+        self._probing = False
+
+    # ── Recording ────────────────────────────────────────────────────
+
+    def record(self, seconds: float, ok: bool) -> None:
+        now = time.time()
+        with self._lock:
+            if self._probing:
+                self._probing = False
+                if ok:
+                    self._opened_at = None
+                    self._samples.clear()
+                else:
+                    self._opened_at = now
+            self._samples.append((now, seconds, ok))
+            if self._opened_at is None and not ok:
+                calls, errors = self._counts(now)
+                if calls >= self._min_calls and errors / calls >= self._error_rate:
+                    self._opened_at = now
+
+    def abandon(self) -> None:
+        """A call was cancelled before finishing: free the probe slot, record nothing."""
+        with self._lock:
+            self._probing = False
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open state, only one at a time."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.time() - self._opened_at < self._cooldown:
+                return False
+            self._probing = True
+            return True
+
+    # ── Inspection ───────────────────────────────────────────────────
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.time())
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or now - self._opened_at >= self._cooldown:
+            return "half-open"
+        return "open"
+
+    def _recent(self, now: float) -> list[tuple[float, float, bool]]:
+        return [s for s in self._samples if now - s[0] <= self._window]
+
+    def _counts(self, now: float) -> tuple[int, int]:
+        recent = self._recent(now)[-_BREAKER_CALLS:]
+        return len(recent), sum(1 for _, _, ok in recent if not ok)
+
+    def percentile(self, q: float) -> float | None:
+        """Latency percentile (0-100) of recent successful calls, in seconds."""
+        with self._lock:
+            return _percentile([s for _, s, ok in self._recent(time.time()) if ok], q)
+
+    def hedge_after(self, ceiling: float) -> float:
+        """How long to wait on this provider before hedging: its p95, at most ``ceiling``.
+
+        A provider that's slow often enough drags its own p95 up; the
+        ceiling keeps hedging useful then. ``ceiling`` is also the answer
+        until there are enough samples.
+        """
+        with self._lock:
+            latencies = [s for _, s, ok in self._recent(time.time()) if ok]
+        if len(latencies) < _MIN_LATENCY_SAMPLES:
+            return ceiling
+        return min(ceiling, max(_MIN_HEDGE_SECONDS, _percentile(latencies, 95)))
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        with self._lock:
+            recent = self._recent(now)
+            latencies = [s for _, s, ok in recent if ok]
+            errors = sum(1 for _, _, ok in recent if not ok)
+            state = self._state(now)
+            retry_in = (
+                max(0.0, self._cooldown - (now - self._opened_at)) if state == "open" else None
+            )
+        return {
+            "state": state,
+            "calls": len(recent),
+            "errors": errors,
+            "error_rate": errors / len(recent) if recent else 0.0,
+            "p50_ms": _ms(_percentile(latencies, 50)),
+            "p95_ms": _ms(_percentile(latencies, 95)),
+            "p99_ms": _ms(_percentile(latencies, 99)),
+            "retry_in_seconds": retry_in,
+        }
+
+    # ── Persistence ──────────────────────────────────────────────────
+
+    def dump(self) -> dict:
+        with self._lock:
+            return {"samples": list(self._samples), "opened_at": self._opened_at}
+
+    def load(self, state: dict) -> None:
+        with self._lock:
+            self._samples.extend(tuple(s) for s in state.get("samples", []))
+            self._opened_at = state.get("opened_at")
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def _ms(seconds: float | None) -> int | None:
+    return None if seconds is None else round(seconds * 1000)
+
+
+# ── Registry ─────────────────────────────────────────────────────────
+
+_lock = threading.Lock()
+_settings: Settings | None = None
+_providers: dict[str, ProviderHealth] = {}
+
+
+def configure(settings: Settings) -> None:
+    """Apply breaker settings and pick up the health recorded by earlier runs.
+
+    The CLI is one short process per command, so the state is saved to
+    ``provider_health_path`` on shutdown (:func:`save`) and loaded here;
+    a provider that was failing a minute ago stays skipped.
+    """
+    global _settings
+    with _lock:
+        _settings = settings
+        _providers.clear()
+    try:
+        saved = json.loads(settings.provider_health_path.read_text())
+    except (OSError, ValueError):
+        return
+    for name, state in saved.items():
+        get_health(name).load(state)
+
+
+def _configured() -> Settings:
+    """The settings in effect; used before :func:`configure`, it configures from ``get_settings()``."""
+    if _settings is None:
+        configure(get_settings())
+    return _settings
+
+
+def get_health(provider: str) -> ProviderHealth:
+    settings = _configured()
+    with _lock:
+        health = _providers.get(provider)
+        if health is None:
+            health = ProviderHealth(
+                provider,
+                window_seconds=settings.provider_health_window_seconds,
+                error_rate=settings.provider_breaker_error_rate,
+                min_calls=settings.provider_breaker_min_calls,
+                cooldown_seconds=settings.provider_breaker_cooldown_seconds,
+            )
+            _providers[provider] = health
+        return health
+
+
+def hedge_delay(provider: str) -> float | None:
+    """Seconds to give ``provider`` before hedging with the next one; ``None`` when hedging is off."""
+    settings = _configured()
+    if not settings.provider_hedge:
+        return None
+    return get_health(provider).hedge_after(settings.provider_hedge_max_seconds)
+
+
+def snapshot() -> dict[str, dict]:
+    """Health of every provider called (or loaded) so far, by name."""
+    _configured()
+    with _lock:
+        providers = dict(_providers)
+    return {name: health.snapshot() for name, health in sorted(providers.items())}
+
+
+def save() -> None:
+    with _lock:
+        settings, providers = _settings, dict(_providers)
+    if settings is None or not providers:
+        return
+    path = settings.provider_health_path
+    try:
+        settings.ensure_data_dir()
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({name: h.dump() for name, h in providers.items()}))
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def guarded(provider: str, call: Callable[[], T]) -> Callable[[], T]:
+    """Wrap ``call`` so it's refused while ``provider``'s breaker is open and timed when it runs."""
+
+    def run() -> T:
+        health = _admit(provider)
+        start = time.perf_counter()
+        try:
+            value = call()
+        except Exception:
+            health.record(time.perf_counter() - start, ok=False)
+            raise
+        except BaseException:
+            health.abandon()
+            raise
+        health.record(time.perf_counter() - start, ok=True)
+        return value
+
+    return run
+
+
+def guarded_async(provider: str, call: Callable[[], Awaitable[T]]) -> Callable[[], Awaitable[T]]:
+    """Async counterpart of :func:`guarded`."""
+
+    async def run() -> T:
+        health = _admit(provider)
+        start = time.perf_counter()
+        try:
+            value = await call()
+        except Exception:
+            health.record(time.perf_counter() - start, ok=False)
+            raise
+        except BaseException:
+            health.abandon()
+            raise
+        health.record(time.perf_counter() - start, ok=True)
+        return value
+
+    return run
+
+
+def _admit(provider: str) -> ProviderHealth:
+    health = get_health(provider)
+    if not health.allow():
+        raise ProviderUnavailable(f"{provider} is unavailable (circuit open)")
+    return health
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import threading
+from typing import TYPE_CHECKING
+
+from shelfie.config import Settings, get_settings
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    import httpx
+
+_lock = threading.Lock()
+_settings: Settings | None = None
+_clients: dict[str, httpx.Client] = {}
+_async_clients: dict[str, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+# Clients replaced by configure() but possibly still in use by a caller.
+_retired: list[httpx.Client] = []
+_retired_async: list[tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = []
+# Closes scheduled by _discard_async, kept alive until they finish.
+_closing: set[asyncio.Future | Future] = set()
+
+
+def configure(settings: Settings) -> None:
+    """Apply timeout/pool settings to the clients handed out from now on.
+
+    Existing clients may still have requests in flight on other threads,
+    so they're set aside rather than closed; :func:`aclose_retired` (or
+    :func:`close_clients`) closes them once their callers are done.
+    """
+    global _settings
+    with _lock:
+        _settings = settings
+        _retired.extend(_clients.values())
+        _clients.clear()
+        _retired_async.extend(_async_clients.values())
+        _async_clients.clear()
+
+
+def _client_kwargs() -> dict:
+    import httpx
+
+    settings = _settings or get_settings()
+    http2 = settings.http2 and importlib.util.find_spec("h2") is not None
+    return {
+        "timeout": httpx.Timeout(settings.http_timeout, connect=settings.http_connect_timeout),
+        "limits": httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        "http2": http2,
+        "follow_redirects": True,
+    }
+
+
+def get_client(provider: str) -> httpx.Client:
+    """Return the shared, connection-pooling client for ``provider``."""
+    import httpx
+
+    with _lock:
+        client = _clients.get(provider)
+        if client is None:
+            client = httpx.Client(**_client_kwargs())
+            _clients[provider] = client
+        return client
+
+
+def get_async_client(provider: str) -> httpx.AsyncClient:
+    """Return the shared async client for ``provider`` on the running event loop.
+
+    Async connections are bound to the loop that opened them, so a client
+    created under a previous ``asyncio.run`` is replaced rather than reused.
+    """
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    stale = None
+    with _lock:
+        entry = _async_clients.get(provider)
+        if entry is None or entry[0] is not loop:
+            stale = entry
+            entry = (loop, httpx.AsyncClient(**_client_kwargs()))
+            _async_clients[provider] = entry
+    if stale is not None:
+        _discard_async(*stale)
+    return entry[1]
+
+
+def close_clients() -> None:
+    """Close every client; async ones are closed on their own loop where it's still possible."""
+    with _lock:
+        clients = [*_clients.values(), *_retired]
+        entries = [*_async_clients.values(), *_retired_async]
+        _clients.clear()
+        _retired.clear()
+        _async_clients.clear()
+        _retired_async.clear()
+    for client in clients:
+        client.close()
+    for client_loop, client in entries:
+        _discard_async(client_loop, client)
+
+
+async def aclose_clients() -> None:
+    """Close every client, awaiting async clients owned by the running loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        entries = [*_async_clients.values(), *_retired_async]
+        _async_clients.clear()
+        _retired_async.clear()
+    for client_loop, client in entries:
+        if client_loop is loop:
+            await client.aclose()
+        else:
+            _discard_async(client_loop, client)
+    close_clients()
+
+
+async def aclose_retired() -> None:
+    """Close the clients :func:`configure` replaced, once nothing uses them any more."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = list(_retired)
+        entries = list(_retired_async)
+        _retired.clear()
+        _retired_async.clear()
+    for client in clients:
+        client.close()
+    for client_loop, client in entries:
+        if client_loop is loop:
+            await client.aclose()
+        else:
+            _discard_async(client_loop, client)
+
+
+def _discard_async(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+    """Best-effort close of an async client that can't be awaited from here.
+
+    Its connections belong to ``loop``: the close is scheduled there if the
+    loop is still running, run to completion on it if it's idle, and
+    otherwise attempted on whatever loop is at hand, ignoring errors from
+    connections that died with their loop.
+    """
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    try:
+        if loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(_aclose_quietly(client), loop)
+        elif running is not None:
+            future = running.create_task(_aclose_quietly(client))
+        elif not loop.is_closed():
+            loop.run_until_complete(_aclose_quietly(client))
+            return
+        else:
+            asyncio.run(_aclose_quietly(client))
+            return
+    except RuntimeError:
+        return  # the loop went away while we looked
+    _closing.add(future)
+    future.add_done_callback(_closing.discard)
+
+
+async def _aclose_quietly(client: httpx.AsyncClient) -> None:
+    try:
+        await client.aclose()
+    except Exception:
+        pass
@@ -1,18 +1,30 @@
 from __future__ import annotations
 
-import httpx
-
+from shelfie.apis import http_client
 from shelfie.models import BookSearchResult
 
 SEARCH_URL = "https://openlibrary.org/search.json"
+BOOKS_URL = "https://openlibrary.org/api/books"
+# ISBNs per /api/books request; bibkeys go in the query string.
+ISBN_BATCH = 50
+FIELDS = "key,title,author_name,isbn,first_publish_year,number_of_pages_median,subject,ratings_average,ratings_count"
 
 
 def search(query: str, max_results: int = 5) -> list[BookSearchResult]:
-    params = {"q": query, "limit": max_results, "fields": "key,title,author_name,isbn,first_publish_year,number_of_pages_median,subject,ratings_average,ratings_count"}
-    resp = httpx.get(SEARCH_URL, params=params, timeout=10)
+    params = {"q": query, "limit": max_results, "fields": FIELDS}
+    resp = http_client.get_client("open_library").get(SEARCH_URL, params=params)
     resp.raise_for_status()
-    data = resp.json()
+    return _parse(resp.json())
+
+
+async def search_async(query: str, max_results: int = 5) -> list[BookSearchResult]:
+    params = {"q": query, "limit": max_results, "fields": FIELDS}
+    resp = await http_client.get_async_client("open_library").get(SEARCH_URL, params=params)
+    resp.raise_for_status()
+    return _parse(resp.json())
+
 
+def _parse(data: dict) -> list[BookSearchResult]:
     results: list[BookSearchResult] = []
     for doc in data.get("docs", []):
         isbns = doc.get("isbn", [])
@@ -43,3 +55,41 @@ def lookup_isbn(title: str, author: str) -> str | None:
     if results and results[0].isbn:
         return results[0].isbn
     return None
+
+
+async def lookup_isbn_async(title: str, author: str) -> str | None:
+    query = f"{title} {author}"
+    results = await search_async(query, max_results=1)
+    if results and results[0].isbn:
+        return results[0].isbn
+    return None
+
+
+def lookup_isbns(isbns: list[str]) -> dict[str, BookSearchResult]:
+    """Metadata for many ISBNs in one request, keyed by the ISBN asked for."""
+    params = {
+        "bibkeys": ",".join(f"ISBN:{isbn}" for isbn in isbns),
+        "format": "json",
+        "jscmd": "data",
+    }
+    resp = http_client.get_client("open_library").get(BOOKS_URL, params=params)
+    resp.raise_for_status()
+    return _parse_books(resp.json())
+
+
+def _parse_books(data: dict) -> dict[str, BookSearchResult]:
+    results: dict[str, BookSearchResult] = {}
+    for bibkey, book in data.items():
+        isbn = bibkey.removeprefix("ISBN:")
+        authors = [a.get("name", "") for a in book.get("authors", []) if a.get("name")]
+        results[isbn] = BookSearchResult(
+            title=book.get("title", "Unknown"),
+            author=", ".join(authors) or "Unknown",
+            isbn=isbn,
+            published_date=book.get("publish_date", ""),
+            page_count=book.get("number_of_pages", 0) or 0,
+            categories=[s["name"] for s in book.get("subjects", []) if s.get("name")][:5],
+            source="open_library",
+            info_url=book.get("url", ""),
+        )
+    return results
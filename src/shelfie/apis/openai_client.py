@@ -1,12 +1,22 @@
 from __future__ import annotations
 
-from openai import OpenAI
-from pydantic_ai import Agent
-from pydantic_ai.models.openai import OpenAIModel
-from pydantic_ai.providers.openai import OpenAIProvider
+import asyncio
+import threading
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
 from shelfie.models import BookRecommendation, RecommendationResponse
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+    from pydantic_ai import Agent
+
+    from shelfie.apis.cache import EmbeddingCache
+
+# ``openai`` and ``pydantic_ai`` take most of a second to import, so they are
+# imported inside the functions that call them rather than at module load.
+
 RECOMMENDATION_SYSTEM_PROMPT = """\
 You are Shelfie, a deeply thoughtful book recommendation engine. You know the user's reading history, their reviews, and what they're in the mood for right now.
 
@@ -16,7 +26,7 @@ Your job is to recommend books that feel *personally* right — not generic best
 - Their direction preference (explore-new, go-deeper, or balance)
 
 Rules:
-- Recommend 5 books
+- Recommend exactly as many books as the user asks for
 - Mix well-known and lesser-known titles
 - For "explore-new": actively diverge from recent genres/topics
 - For "go-deeper": find books that share the DNA of their favorites
@@ -30,13 +40,145 @@ Rules:
 - Include a mix of match types — not all safe bets"""
 
 
+# ── Client registry ──────────────────────────────────────────────────
+#
+# Clients and agents hold connection pools, so they are built once per
+# (api_key, base_url[, model]) and reused. Async ones are bound to the event
+# loop that created them, like the clients in ``http_client``.
+
+_lock = threading.Lock()
+_clients: dict[tuple[str, str | None], OpenAI] = {}
+_async_clients: dict[tuple[str, str | None], tuple[asyncio.AbstractEventLoop, AsyncOpenAI]] = {}
+_agents: dict[tuple[str, str, str | None], tuple[asyncio.AbstractEventLoop, Agent]] = {}
+
+
+def get_client(api_key: str, base_url: str | None = None) -> OpenAI:
+    """Return the shared sync client for ``(api_key, base_url)``."""
+    from openai import OpenAI
+
+    key = (api_key, base_url)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = OpenAI(api_key=api_key, base_url=base_url)
+            _clients[key] = client
+        return client
+
+
+def get_async_client(api_key: str, base_url: str | None = None) -> AsyncOpenAI:
+    """Return the shared async client for ``(api_key, base_url)`` on the running loop."""
+    from openai import AsyncOpenAI
+
+    loop = asyncio.get_running_loop()
+    key = (api_key, base_url)
+    with _lock:
+        entry = _async_clients.get(key)
+        if entry is None or entry[0] is not loop:
+            entry = (loop, AsyncOpenAI(api_key=api_key, base_url=base_url))
+            _async_clients[key] = entry
+        return entry[1]
+
+
+def get_agent(api_key: str, model: str, base_url: str | None = None) -> Agent:
+    """Return the recommendation agent for ``model``, built on the shared async client."""
+    from pydantic_ai import Agent
+    from pydantic_ai.models.openai import OpenAIModel
+    from pydantic_ai.providers.openai import OpenAIProvider
+
+    loop = asyncio.get_running_loop()
+    key = (api_key, model, base_url)
+    with _lock:
+        entry = _agents.get(key)
+        if entry is not None and entry[0] is loop:
+            return entry[1]
+    provider = OpenAIProvider(openai_client=get_async_client(api_key, base_url))
+    agent = Agent(
+        OpenAIModel(model, provider=provider),
+        system_prompt=RECOMMENDATION_SYSTEM_PROMPT,
+        output_type=RecommendationResponse,
+    )
+    with _lock:
+        _agents[key] = (loop, agent)
+    return agent
+
+
+def close_clients() -> None:
+    """Close every sync client. Async clients and agents are dropped with their loop."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        _async_clients.clear()
+        _agents.clear()
+    for client in clients:
+        client.close()
+
+
+async def aclose_clients() -> None:
+    """Close every client, awaiting async clients owned by the running loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        async_clients = [c for l, c in _async_clients.values() if l is loop]
+        _async_clients.clear()
+        _agents.clear()
+    for client in async_clients:
+        await client.close()
+    close_clients()
+
+
+# ── Embeddings ───────────────────────────────────────────────────────
+
 def get_embeddings(
     texts: list[str],
     api_key: str,
     model: str = "text-embedding-3-small",
+    cache: EmbeddingCache | None = None,
+    base_url: str | None = None,
+) -> list[list[float]]:
+    """Embed ``texts``; with a cache, only texts not seen before go upstream."""
+    if cache is None:
+        return _fetch_embeddings(texts, api_key=api_key, model=model, base_url=base_url)
+
+    vectors = cache.get_many(model, texts)
+    missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+    if missing:
+        fetched = dict(zip(missing, _fetch_embeddings(missing, api_key, model, base_url)))
+        cache.put_many(model, list(fetched), list(fetched.values()))
+        vectors = [v if v is not None else fetched[t] for t, v in zip(texts, vectors)]
+    return vectors
+
+
+async def aget_embeddings(
+    texts: list[str],
+    api_key: str,
+    model: str = "text-embedding-3-small",
+    cache: EmbeddingCache | None = None,
+    base_url: str | None = None,
+) -> list[list[float]]:
+    """Async :func:`get_embeddings`; the SQLite cache is read and written in a worker thread."""
+    if cache is None:
+        return await _afetch_embeddings(texts, api_key=api_key, model=model, base_url=base_url)
+
+    vectors = await asyncio.to_thread(cache.get_many, model, texts)
+    missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+    if missing:
+        fetched = dict(zip(missing, await _afetch_embeddings(missing, api_key, model, base_url)))
+        await asyncio.to_thread(cache.put_many, model, list(fetched), list(fetched.values()))
+        vectors = [v if v is not None else fetched[t] for t, v in zip(texts, vectors)]
+    return vectors
+
+
+def _fetch_embeddings(
+    texts: list[str], api_key: str, model: str, base_url: str | None = None
+) -> list[list[float]]:
+    response = get_client(api_key, base_url).embeddings.create(input=texts, model=model)
+    return [item.embedding for item in response.data]
+
+
+async def _afetch_embeddings(
+    texts: list[str], api_key: str, model: str, base_url: str | None = None
 ) -> list[list[float]]:
-    client = OpenAI(api_key=api_key)
-    response = client.embeddings.create(input=texts, model=model)
+    client = get_async_client(api_key, base_url)
+    response = await client.embeddings.create(input=texts, model=model)
     return [item.embedding for item in response.data]
 
 
@@ -44,28 +186,37 @@ def get_embedding(
     text: str,
     api_key: str,
     model: str = "text-embedding-3-small",
+    cache: EmbeddingCache | None = None,
+    base_url: str | None = None,
 ) -> list[float]:
-    return get_embeddings([text], api_key=api_key, model=model)[0]
+    return get_embeddings([text], api_key=api_key, model=model, cache=cache, base_url=base_url)[0]
 
 
-async def generate_recommendations(
+# ── Recommendations ──────────────────────────────────────────────────
+
+
+@dataclass
+class PromptUsage:
+    """Prompt tokens reported by the provider, summed over one or more calls."""
+
+    prompt_tokens: int = 0
+    cached_prompt_tokens: int = 0
+
+    def add(self, usage) -> None:
+        # ``input_tokens`` in current pydantic_ai, ``request_tokens`` in older releases.
+        self.prompt_tokens += getattr(usage, "input_tokens", None) or getattr(usage, "request_tokens", None) or 0
+        self.cached_prompt_tokens += getattr(usage, "cache_read_tokens", None) or 0
+
+
+def _user_prompt(
     reading_history: str,
     semantic_context: str,
     mood: str,
     direction: str,
-    api_key: str,
-    model: str = "gpt-4o",
-) -> list[BookRecommendation]:
-    provider = OpenAIProvider(api_key=api_key)
-    llm = OpenAIModel(model, provider=provider)
-
-    agent = Agent(
-        llm,
-        system_prompt=RECOMMENDATION_SYSTEM_PROMPT,
-        output_type=RecommendationResponse,
-    )
-
-    user_prompt = f"""## My Reading History (recent, with my reviews)
+    count: int = 5,
+    exclude: list[str] | None = None,
+) -> str:
+    prompt = f"""## My Reading History (recent, with my reviews)
 {reading_history}
 
 ## Reviews Most Relevant to My Current Mood
@@ -74,8 +225,69 @@ async def generate_recommendations(
 ## What I'm Looking For Right Now
 Mood: {mood}
 Direction: {direction}
+"""
+    if exclude:
+        titles = "\n".join(f"- {title}" for title in exclude)
+        prompt += f"""
+## Already Suggested or Already Read — Do NOT Recommend These
+{titles}
+"""
+    noun = "recommendation" if count == 1 else "recommendations"
+    return prompt + f"\nGive me {count} book {noun}."
 
-Give me 5 book recommendations."""
 
-    result = await agent.run(user_prompt)
+async def generate_recommendations(
+    reading_history: str,
+    semantic_context: str,
+    mood: str,
+    direction: str,
+    api_key: str,
+    model: str = "gpt-4o",
+    base_url: str | None = None,
+    count: int = 5,
+    exclude: list[str] | None = None,
+    usage: PromptUsage | None = None,
+) -> list[BookRecommendation]:
+    agent = get_agent(api_key, model, base_url)
+    prompt = _user_prompt(reading_history, semantic_context, mood, direction, count, exclude)
+    result = await agent.run(prompt)
+    if usage is not None:
+        usage.add(result.usage())
     return result.output.recommendations
+
+
+async def stream_recommendations(
+    reading_history: str,
+    semantic_context: str,
+    mood: str,
+    direction: str,
+    api_key: str,
+    model: str = "gpt-4o",
+    base_url: str | None = None,
+    count: int = 5,
+    exclude: list[str] | None = None,
+    usage: PromptUsage | None = None,
+) -> AsyncIterator[BookRecommendation]:
+    """Yield each recommendation as soon as the model has finished writing it.
+
+    The structured output is validated as it streams in; an entry is complete
+    once the next one has started, and the last ones come from the final,
+    fully validated response.
+    """
+    agent = get_agent(api_key, model, base_url)
+    prompt = _user_prompt(reading_history, semantic_context, mood, direction, count, exclude)
+    emitted = 0
+    async with agent.run_stream(prompt) as result:
+        try:
+            async for partial in result.stream_output(debounce_by=None):
+                recs = partial.recommendations
+                while emitted < len(recs) - 1:
+                    yield recs[emitted]
+                    emitted += 1
+            final = await result.get_output()
+        finally:
+            # Also counted when the caller stops early and closes the stream.
+            if usage is not None:
+                usage.add(result.usage())
+    for rec in final.recommendations[emitted:]:
+        yield rec
@@ -1,20 +1,26 @@
 from __future__ import annotations
 
-import asyncio
+import sys
 from datetime import date
-from typing import Annotated, Optional
+from pathlib import Path
+from typing import TYPE_CHECKING, Annotated, Optional
 
 import typer
 from rich.console import Console
 from rich.panel import Panel
+from rich.rule import Rule
 from rich.table import Table
 
 from shelfie.config import get_settings
-from shelfie.models import Direction, Read, ReadStatus
-from shelfie.services.book_lookup import search_books
-from shelfie.services.reads import ReadService
-from shelfie.services.recommendations import RecommendationEngine
-from shelfie.storage import Storage
+from shelfie.models import Direction, Read, ReadStatus, RecommendationSession
+
+if TYPE_CHECKING:
+    from rich.status import Status
+
+    from shelfie.services.export import ExportService
+    from shelfie.services.reads import ReadService
+    from shelfie.services.recommendations import RecommendationEngine
+    from shelfie.storage import Storage
 
 app = typer.Typer(
     name="shelfie",
@@ -22,14 +28,58 @@ app = typer.Typer(
     no_args_is_help=True,
 )
 console = Console()
+# Opened by this command; closed on exit so the TinyDB journal is compacted.
+_storages: list[Storage] = []
+
+
+def _shutdown() -> None:
+    for storage in _storages:
+        storage.close()
+    _storages.clear()
+    # Only modules the command imported have anything to save or close.
+    if (health := sys.modules.get("shelfie.apis.health")) is not None:
+        health.save()
+    if (http_client := sys.modules.get("shelfie.apis.http_client")) is not None:
+        http_client.close_clients()
+    if (openai_client := sys.modules.get("shelfie.apis.openai_client")) is not None:
+        openai_client.close_clients()
+    if (cache := sys.modules.get("shelfie.apis.cache")) is not None:
+        cache.close_caches()
+
+
+@app.callback()
+def main(ctx: typer.Context) -> None:
+    """Your personal book recommendation engine."""
+    # The API modules configure themselves from get_settings() on first use,
+    # so commands like ``list`` never import them.
+    ctx.call_on_close(_shutdown)
 
 
 def _get_services() -> tuple[ReadService, RecommendationEngine]:
+    # Imported here so commands that never touch storage (search, cache,
+    # web, --help) don't pay for it at startup.
+    from shelfie.services.reads import ReadService
+    from shelfie.services.recommendations import RecommendationEngine
+
     settings = get_settings()
-    storage = Storage(settings)
+    storage = _open_storage()
     return ReadService(storage, settings), RecommendationEngine(storage, settings)
 
 
+def _get_export_service() -> ExportService:
+    from shelfie.services.export import ExportService
+
+    return ExportService(_open_storage(), get_settings())
+
+
+def _open_storage() -> Storage:
+    from shelfie.storage import Storage
+
+    storage = Storage(get_settings())
+    _storages.append(storage)
+    return storage
+
+
 # ── log ──────────────────────────────────────────────────────────────
 
 def _pick_book(results: list) -> int:
@@ -115,12 +165,21 @@ def log(
     book_name: Annotated[str, typer.Argument(help="Name of the book to log")],
 ) -> None:
     """Log a book you've read (or are reading). Just give the book name — we'll handle the rest."""
+    from shelfie.apis.cache import get_metadata_store, get_response_cache
+    from shelfie.services.book_lookup import search_books
+
     read_service, _ = _get_services()
     settings = get_settings()
 
     # Step 1: Search for the book
     with console.status("Searching for the book..."):
-        results = search_books(book_name, google_api_key=settings.google_books_api_key)
+        results = search_books(
+            book_name,
+            google_api_key=settings.google_books_api_key,
+            cache=get_response_cache(settings),
+            merge=settings.search_merge_providers,
+            metadata=get_metadata_store(settings),
+        )
 
     if not results:
         console.print("[red]Couldn't find that book. Try a different name?[/red]")
@@ -203,6 +262,25 @@ def log(
             border_style="magenta",
         )
     )
+    _finish_enrichment(read_service, read)
+
+
+def _finish_enrichment(read_service: ReadService, read: Read) -> None:
+    """Run this read's queued lookups now that it's saved, for a bounded time.
+
+    The read is already stored, so stopping here (timeout or Ctrl-C) only
+    leaves the jobs queued for the next ``shelfie jobs --run`` or ``shelfie web``.
+    """
+    settings = get_settings()
+    if not settings.enrichment_background or not read_service.enrichment_status(read.id):
+        return
+    try:
+        with console.status("[dim]Looking up ISBN and embedding the review (Ctrl-C to skip)...[/dim]"):
+            read_service.run_enrichment(timeout=settings.enrichment_cli_wait_seconds)
+    except KeyboardInterrupt:
+        pass
+    if any(job["status"] != "done" for job in read_service.enrichment_status(read.id).values()):
+        console.print("[dim]Some lookups are still queued; [bold]shelfie jobs --run[/bold] finishes them.[/dim]")
 
 
 # ── list ─────────────────────────────────────────────────────────────
@@ -212,14 +290,26 @@ def list_reads(
     status: Annotated[Optional[ReadStatus], typer.Option("--status", "-s", help="Filter by status")] = None,
     min_rating: Annotated[Optional[int], typer.Option("--min-rating", help="Minimum rating filter", min=1, max=5)] = None,
     year: Annotated[Optional[int], typer.Option("--year", "-y", help="Filter by year")] = None,
+    limit: Annotated[int, typer.Option("--limit", "-n", help="Reads per page", min=1)] = 50,
+    cursor: Annotated[Optional[str], typer.Option("--cursor", help="Continue from a previous page")] = None,
+    details: Annotated[bool, typer.Option("--details", help="Add pages and categories from Google Books / Open Library")] = False,
 ) -> None:
     """Show your reading history."""
-    read_service, _ = _get_services()
-    reads = read_service.list_reads(
-        status=status.value if status else None,
-        min_rating=min_rating,
-        year=year,
-    )
+    # Straight from the store: the services (and the API clients they
+    # import) are only loaded for --details.
+    storage = _open_storage()
+    try:
+        docs, next_cursor = storage.list_reads(
+            status=status.value if status else None,
+            min_rating=min_rating,
+            year=year,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+    reads = [Read.from_doc(d) for d in docs]
 
     if not reads:
         console.print("[dim]No reads found. Use [bold]shelfie log[/bold] to add some.[/dim]")
@@ -232,12 +322,31 @@ def list_reads(
     table.add_column("Status")
     table.add_column("Review", max_width=40)
 
+    books = {}
+    if details:
+        from shelfie.services.reads import ReadService
+
+        with console.status("Fetching book details..."):
+            books = ReadService(storage, get_settings()).book_metadata(reads)
+        table.add_column("Pages", justify="right")
+        table.add_column("Categories", max_width=30)
+
     for r in reads:
         stars = "★" * r.rating + "☆" * (5 - r.rating)
         review_preview = r.review[:80] + "..." if len(r.review) > 80 else r.review
-        table.add_row(r.title, r.author, stars, r.status.value, review_preview)
+        row = [r.title, r.author, stars, r.status.value, review_preview]
+        if details:
+            book = books.get(r.id)
+            row += [str(book.page_count or "") if book else "", ", ".join(book.categories[:3]) if book else ""]
+        table.add_row(*row)
 
     console.print(table)
+    _print_next_page_hint(next_cursor)
+
+
+def _print_next_page_hint(next_cursor: str | None) -> None:
+    if next_cursor:
+        console.print(f"[dim]More: add [bold]--cursor {next_cursor}[/bold][/dim]")
 
 
 # ── show ─────────────────────────────────────────────────────────────
@@ -264,24 +373,61 @@ def show(
         content += f"\nStarted: {read.started_at.isoformat()}"
     if read.finished_at:
         content += f"\nFinished: {read.finished_at.isoformat()}"
+    book = read_service.book_metadata([read]).get(read.id) if read.isbn else None
+    if book:
+        facts = [f"Published: {book.published_date}" if book.published_date else "",
+                 f"Pages: {book.page_count}" if book.page_count else ""]
+        if any(facts):
+            content += "\n" + "  |  ".join(f for f in facts if f)
+        if book.categories:
+            content += f"\nCategories: {', '.join(book.categories)}"
+        if book.description:
+            content += f"\n\n[dim]{book.description[:300]}{'...' if len(book.description) > 300 else ''}[/dim]"
     if read.review:
         content += f"\n\n[italic]\"{read.review}\"[/italic]"
+    enrichment = read_service.enrichment_status(read.id)
+    if enrichment:
+        content += "\n\n" + "\n".join(
+            _enrichment_line(kind, job) for kind, job in sorted(enrichment.items())
+        )
     content += f"\n\n[dim]ID: {read.id} | Logged: {read.created_at.strftime('%Y-%m-%d %H:%M')}[/dim]"
 
     console.print(Panel(content, border_style="plum1"))
 
 
+_JOB_STYLES = {"pending": "yellow", "running": "cyan", "done": "green", "failed": "red"}
+
+
+def _enrichment_line(kind: str, job: dict) -> str:
+    style = _JOB_STYLES.get(job["status"], "dim")
+    line = f"[dim]{kind.capitalize()}:[/dim] [{style}]{job['status']}[/{style}]"
+    if job["status"] != "done" and job["last_error"]:
+        line += f" [dim](attempt {job['attempts']}: {job['last_error']})[/dim]"
+    return line
+
+
 # ── search ───────────────────────────────────────────────────────────
 
 @app.command()
 def search(
     query: Annotated[str, typer.Argument(help="Search query (title, author, topic)")],
+    refresh: Annotated[bool, typer.Option("--refresh", help="Bypass the local cache and re-fetch")] = False,
 ) -> None:
     """Search for books via Google Books / Open Library."""
+    from shelfie.apis.cache import get_metadata_store, get_response_cache
+    from shelfie.services.book_lookup import search_books
+
     settings = get_settings()
 
     with console.status("Searching..."):
-        results = search_books(query, google_api_key=settings.google_books_api_key)
+        results = search_books(
+            query,
+            google_api_key=settings.google_books_api_key,
+            cache=get_response_cache(settings),
+            refresh=refresh,
+            merge=settings.search_merge_providers,
+            metadata=get_metadata_store(settings),
+        )
 
     if not results:
         console.print("[dim]No results found.[/dim]")
@@ -307,14 +453,114 @@ def search(
         console.print(Panel(content, title=f"[hot_pink]#{i}[/hot_pink]", border_style="hot_pink"))
 
 
+# ── cache ────────────────────────────────────────────────────────────
+
+@app.command()
+def cache(
+    clear: Annotated[bool, typer.Option("--clear", help="Drop cached API responses, embeddings, book metadata and cached sessions")] = False,
+) -> None:
+    """Show or clear the local caches of book API responses, embeddings, book metadata and sessions."""
+    from shelfie.apis.cache import get_embedding_cache, get_metadata_store, get_response_cache
+
+    settings = get_settings()
+    response_cache = get_response_cache(settings)
+    embedding_cache = get_embedding_cache(settings)
+
+    if clear:
+        for c in (response_cache, embedding_cache, get_metadata_store(settings)):
+            if c is not None:
+                c.clear()
+        if settings.session_cache_enabled:
+            _, rec_engine = _get_services()
+            rec_engine.clear_session_cache()
+        console.print("[magenta]Caches cleared.[/magenta]")
+        return
+
+    if response_cache is None:
+        console.print("  [dim]API cache disabled (API_CACHE_ENABLED=false)[/dim]")
+    else:
+        stats = response_cache.stats()
+        console.print(
+            f"  [bold]{stats['entries']}[/bold] cached API responses  "
+            f"[dim](TTL {settings.api_cache_ttl_seconds}s, max {settings.api_cache_max_entries})[/dim]"
+        )
+
+    if embedding_cache is None:
+        console.print("  [dim]Embedding cache disabled (EMBEDDING_CACHE_ENABLED=false)[/dim]")
+    else:
+        stats = embedding_cache.stats()
+        console.print(
+            f"  [bold]{stats['entries']}[/bold] cached embeddings  "
+            f"[dim]({stats['bytes'] / 1024 / 1024:.1f} of {settings.embedding_cache_max_mb} MB)[/dim]"
+        )
+
+    metadata_store = get_metadata_store(settings)
+    if metadata_store is None:
+        console.print("  [dim]Book metadata store disabled (BOOK_METADATA_ENABLED=false)[/dim]")
+    else:
+        stats = metadata_store.stats()
+        console.print(
+            f"  [bold]{stats['entries']}[/bold] books with stored metadata  "
+            f"[dim]({stats['stale']} due for a refresh)[/dim]"
+        )
+
+    if not settings.session_cache_enabled:
+        console.print("  [dim]Session cache disabled (SESSION_CACHE_ENABLED=false)[/dim]")
+    else:
+        _, rec_engine = _get_services()
+        stats = rec_engine.session_cache_stats()
+        console.print(
+            f"  [bold]{stats['hits']}[/bold] session cache hits, {stats['misses']} misses  "
+            f"[dim]({stats['hit_rate']:.0%} hit rate, {stats['saved_ms'] / 1000:.1f}s saved)[/dim]"
+        )
+
+
+# ── health ───────────────────────────────────────────────────────────
+
+@app.command(name="health")
+def provider_health() -> None:
+    """Show recent latency, error rate and circuit-breaker state per book API."""
+    from shelfie.apis import health
+
+    providers = health.snapshot()
+    if not providers:
+        console.print("[dim]No book API calls recorded in the last few minutes.[/dim]")
+        return
+
+    states = {"closed": "green", "half-open": "yellow", "open": "red"}
+    table = Table(title="Book API health")
+    table.add_column("Provider", style="bold")
+    table.add_column("Breaker")
+    table.add_column("Calls", justify="right")
+    table.add_column("Errors", justify="right")
+    for label in ("p50", "p95", "p99"):
+        table.add_column(label, justify="right")
+    for name, stats in providers.items():
+        style = states.get(stats["state"], "dim")
+        state = f"[{style}]{stats['state']}[/{style}]"
+        if stats["retry_in_seconds"] is not None:
+            state += f" [dim](retry in {stats['retry_in_seconds']:.0f}s)[/dim]"
+        table.add_row(
+            name,
+            state,
+            str(stats["calls"]),
+            f"{stats['error_rate']:.0%}",
+            *(f"{stats[k]} ms" if stats[k] is not None else "-" for k in ("p50_ms", "p95_ms", "p99_ms")),
+        )
+    console.print(table)
+
+
 # ── recommend ────────────────────────────────────────────────────────
 
 @app.command()
 def recommend(
     mood: Annotated[Optional[str], typer.Option("--mood", "-m", help="What you're in the mood for")] = None,
     direction: Annotated[Direction, typer.Option("--direction", "-d", help="explore-new, go-deeper, or balance")] = Direction.BALANCE,
+    refresh: Annotated[bool, typer.Option("--refresh", help="Skip the session cache and ask the model")] = False,
 ) -> None:
     """Get personalized book recommendations based on your reading history and mood."""
+    import asyncio
+
     _, rec_engine = _get_services()
 
     if not mood:
@@ -337,9 +583,11 @@ def recommend(
     console.print(f"[bold]Direction:[/bold] {direction_choice.value}")
     console.print()
 
-    with console.status("Thinking about what you should read next..."):
+    console.print(Rule("[medium_purple1]Recommendations[/medium_purple1]", style="medium_purple1"))
+
+    with console.status("Thinking about what you should read next...") as status:
         try:
-            session = asyncio.run(rec_engine.recommend(mood, direction_choice))
+            session = asyncio.run(_recommend(rec_engine, mood, direction_choice, refresh, status))
         except ValueError as e:
             console.print(f"[red]{e}[/red]")
             raise typer.Exit(1)
@@ -347,18 +595,44 @@ def recommend(
             console.print(f"[red]Error generating recommendations: {e}[/red]")
             raise typer.Exit(1)
 
+    if session.cache_status == "hit":
+        summary = f"  |  from cache (session [dim]{session.cached_from}[/dim])"
+    else:
+        summary = (
+            f"  |  {session.llm_round_trips} LLM call{'s' if session.llm_round_trips != 1 else ''}"
+            f"  |  {session.prompt_tokens} prompt tokens ({session.cached_prompt_tokens} cached)"
+        )
+    console.print()
     console.print(
         Panel(
-            f"Session [dim]{session.id}[/dim]  |  {len(session.recommendations)} recommendations",
-            title="[medium_purple1]Recommendations[/medium_purple1]",
+            f"Session [dim]{session.id}[/dim]  |  {len(session.recommendations)} recommendations"
+            f"{summary}  |  {session.generation_ms} ms",
             border_style="medium_purple1",
         )
     )
 
-    for i, rec in enumerate(session.recommendations, 1):
-        match_label = _match_type_label(rec.match_type)
-        console.print(f"\n  [hot_pink]#{i}[/hot_pink]  [bold]{rec.title}[/bold] by {rec.author}  {match_label}")
-        console.print(f"     [dim]{rec.reason}[/dim]")
+
+async def _recommend(
+    rec_engine: RecommendationEngine, mood: str, direction: Direction, refresh: bool, status: Status
+) -> RecommendationSession:
+    """Print each recommendation as it streams in; returns the saved session."""
+    from shelfie.apis import http_client, openai_client
+
+    count = 0
+    try:
+        async for item in rec_engine.recommend_stream(mood, direction, refresh=refresh):
+            if isinstance(item, RecommendationSession):
+                return item
+            count += 1
+            match_label = _match_type_label(item.match_type)
+            console.print(f"\n  [hot_pink]#{count}[/hot_pink]  [bold]{item.title}[/bold] by {item.author}  {match_label}")
+            console.print(f"     [dim]{item.reason}[/dim]")
+            status.update("Finding the next one...")
+    finally:
+        # Async clients are tied to this loop, so close them before it ends.
+        await openai_client.aclose_clients()
+        await http_client.aclose_clients()
+    raise RuntimeError("Recommendation stream ended without a session.")
 
 
 _MATCH_TYPE_STYLES = {
@@ -377,10 +651,18 @@ def _match_type_label(match_type) -> str:
 # ── recs ─────────────────────────────────────────────────────────────
 
 @app.command()
-def recs() -> None:
+def recs(
+    limit: Annotated[int, typer.Option("--limit", "-n", help="Sessions per page", min=1)] = 20,
+    cursor: Annotated[Optional[str], typer.Option("--cursor", help="Continue from a previous page")] = None,
+) -> None:
     """View past recommendation sessions."""
     _, rec_engine = _get_services()
-    sessions = rec_engine.get_sessions()
+    try:
+        page = rec_engine.get_sessions(limit=limit, cursor=cursor)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+    sessions = page.items
 
     if not sessions:
         console.print("[dim]No recommendation sessions yet. Use [bold]shelfie recommend[/bold] to get started.[/dim]")
@@ -393,6 +675,181 @@ def recs() -> None:
             match_label = _match_type_label(r.match_type)
             console.print(f"    [hot_pink]#{i}[/hot_pink]  {r.title} by {r.author}  {match_label}")
 
+    console.print()
+    _print_next_page_hint(page.next_cursor)
+
+
+# ── blocklist ────────────────────────────────────────────────────────
+
+@app.command()
+def blocklist(
+    rebuild: Annotated[bool, typer.Option("--rebuild", help="Recompute it from every read and past rec")] = False,
+) -> None:
+    """Show how many titles recommendations are filtered against."""
+    _, rec_engine = _get_services()
+
+    if rebuild:
+        with console.status("Rebuilding blocklist..."):
+            size = rec_engine.rebuild_blocklist()
+    else:
+        size = rec_engine.blocklist_size()
+
+    console.print(f"  [bold]{size}[/bold] titles blocked (everything you've logged or been recommended)")
+
+
+# ── jobs ─────────────────────────────────────────────────────────────
+
+@app.command()
+def jobs(
+    run: Annotated[bool, typer.Option("--run", help="Run every queued job now, including ones waiting to retry")] = False,
+    retry_failed: Annotated[bool, typer.Option("--retry-failed", help="Queue failed jobs again")] = False,
+) -> None:
+    """Show (and optionally run) the background ISBN and review-embedding jobs."""
+    read_service, _ = _get_services()
+
+    if retry_failed:
+        console.print(f"Queued {read_service.retry_failed_enrichment()} failed jobs again.")
+    if run:
+        with console.status("Running enrichment jobs..."):
+            ran = read_service.run_enrichment(force=True)
+        console.print(f"Ran {ran} jobs.")
+
+    counts = read_service.enrichment_counts()
+    table = Table(title="Enrichment jobs")
+    table.add_column("Status")
+    table.add_column("Jobs", justify="right")
+    for status, style in _JOB_STYLES.items():
+        table.add_row(f"[{style}]{status}[/{style}]", str(counts.get(status, 0)))
+    console.print(table)
+
+
+# ── import ───────────────────────────────────────────────────────────
+
+@app.command(name="import")
+def import_reads(
+    path: Annotated[Path, typer.Argument(help="Goodreads or StoryGraph CSV export", exists=True, dir_okay=False)],
+    resolve_isbns: Annotated[bool, typer.Option("--resolve-isbns/--no-resolve-isbns", help="Look up ISBNs the export is missing")] = True,
+) -> None:
+    """Import your reading history from a Goodreads or StoryGraph export."""
+    read_service, _ = _get_services()
+
+    with console.status("Reading export...") as status:
+        def on_progress(result) -> None:
+            status.update(
+                f"Importing... {result.rows} rows, {result.imported} new, "
+                f"{result.duplicates} already logged, {result.embedded} reviews embedded"
+            )
+
+        try:
+            result = read_service.import_csv(path, resolve_isbns=resolve_isbns, on_progress=on_progress)
+        except ValueError as e:
+            console.print(f"[red]{e}[/red]")
+            raise typer.Exit(1)
+
+    if result.resumed_from:
+        console.print(f"  [dim]Resumed after row {result.resumed_from}[/dim]")
+    console.print(
+        f"  [bold]{result.imported}[/bold] reads imported  "
+        f"[dim]({result.rows} rows, {result.duplicates} already logged, {result.skipped} skipped, "
+        f"{result.isbns_resolved} ISBNs resolved, {result.embedded} reviews embedded)[/dim]"
+    )
+    if result.failed:
+        console.print(f"  [red]{result.failed} reviews failed to embed — run [bold]shelfie reindex[/bold] to retry.[/red]")
+
+
+# ── export / restore ─────────────────────────────────────────────────
+
+@app.command()
+def export(
+    path: Annotated[Path, typer.Argument(help="Output file (ndjson) or directory (snapshot)")],
+    fmt: Annotated[str, typer.Option("--format", "-f", help="ndjson or snapshot")] = "ndjson",
+) -> None:
+    """Export reads, sessions and review embeddings."""
+    if fmt not in ("ndjson", "snapshot"):
+        console.print("[red]--format must be ndjson or snapshot[/red]")
+        raise typer.Exit(1)
+    exporter = _get_export_service()
+
+    with console.status("Exporting...") as status:
+        def on_progress(result) -> None:
+            status.update(f"Exporting... {result.reads} reads, {result.sessions} sessions, {result.vectors} vectors")
+
+        if fmt == "snapshot":
+            result = exporter.write_snapshot(path, on_progress=on_progress)
+        else:
+            result = exporter.write_ndjson(path, on_progress=on_progress)
+
+    console.print(
+        f"  [bold]{result.reads}[/bold] reads, [bold]{result.sessions}[/bold] sessions and "
+        f"[bold]{result.vectors}[/bold] review vectors written to {path}"
+    )
+
+
+@app.command()
+def restore(
+    path: Annotated[Path, typer.Argument(help="An ndjson export or a snapshot directory", exists=True)],
+) -> None:
+    """Restore an export made with `shelfie export`, skipping anything already here."""
+    exporter = _get_export_service()
+
+    with console.status("Restoring...") as status:
+        def on_progress(result) -> None:
+            status.update(f"Restoring... {result.reads} reads, {result.sessions} sessions, {result.vectors} vectors")
+
+        try:
+            result = exporter.restore(path, on_progress=on_progress)
+        except (ValueError, OSError) as e:
+            console.print(f"[red]{e}[/red]")
+            raise typer.Exit(1)
+
+    console.print(
+        f"  [bold]{result.reads}[/bold] reads, [bold]{result.sessions}[/bold] sessions and "
+        f"[bold]{result.vectors}[/bold] review vectors restored  [dim]({result.duplicates} already present)[/dim]"
+    )
+    if result.vectors_skipped:
+        console.print(
+            f"  [dim]{result.vectors_skipped} vectors skipped (already present or from another "
+            f"embedding provider) — run [bold]shelfie reindex[/bold] to fill any gaps.[/dim]"
+        )
+
+
+# ── reindex ──────────────────────────────────────────────────────────
+
+@app.command()
+def reindex(
+    force: Annotated[bool, typer.Option("--force", help="Re-embed every review, even up-to-date ones")] = False,
+    batch_size: Annotated[int, typer.Option("--batch-size", help="Reviews per embedding request", min=1, max=2048)] = 256,
+    concurrency: Annotated[int, typer.Option("--concurrency", help="Embedding requests in flight", min=1)] = 4,
+) -> None:
+    """Embed reviews that are missing a vector or were embedded with another model."""
+    read_service, _ = _get_services()
+
+    with console.status("Checking review embeddings...") as status:
+        def on_progress(result) -> None:
+            status.update(
+                f"Embedding reviews... {result.embedded}/{result.stale}"
+                + (f" [red]({result.failed} failed)[/red]" if result.failed else "")
+            )
+
+        try:
+            result = read_service.reindex(
+                batch_size=batch_size,
+                concurrency=concurrency,
+                force=force,
+                on_progress=on_progress,
+            )
+        except ValueError as e:
+            console.print(f"[red]{e}[/red]")
+            raise typer.Exit(1)
+
+    console.print(
+        f"  [bold]{result.embedded}[/bold] reviews embedded  "
+        f"[dim]({result.scanned} with reviews, {result.scanned - result.stale} already up to date)[/dim]"
+    )
+    if result.failed:
+        console.print(f"  [red]{result.failed} failed — run [bold]shelfie reindex[/bold] again to retry.[/red]")
+        raise typer.Exit(1)
+
 
 # ── web ──────────────────────────────────────────────────────────────
 
@@ -1,4 +1,7 @@
+import threading
 from pathlib import Path
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -8,6 +11,50 @@ class Settings(BaseSettings):
     myreads_data_dir: Path = Path.home() / ".myreads"
     openai_model: str = "gpt-5.2"
     openai_embedding_model: str = "text-embedding-3-small"
+    openai_base_url: str | None = None
+    embedding_provider: Literal["openai", "local"] = "openai"
+    local_embedding_dim: int = 384
+    storage_backend: Literal["tinydb", "sqlite"] = "tinydb"
+    vector_backend: Literal["chroma", "numpy"] = "chroma"
+    tinydb_journal: bool = True
+    tinydb_journal_compact_bytes: int = 4 * 1024 * 1024
+    api_cache_enabled: bool = True
+    api_cache_ttl_seconds: int = 7 * 24 * 3600
+    api_cache_max_entries: int = 5000
+    search_merge_providers: bool = False
+    io_worker_threads: int = 8
+    embedding_cache_enabled: bool = True
+    embedding_cache_max_mb: int = 64
+    semantic_context_timeout: float = 2.0
+    recommendation_count: int = 5
+    recommendation_overgenerate: int = 2
+    recommendation_max_refills: int = 1
+    context_token_budget: int = 1500
+    context_review_chars: int = 300
+    session_cache_enabled: bool = False
+    session_cache_threshold: float = 0.92
+    session_cache_ttl_seconds: int = 24 * 3600
+    import_chunk_size: int = 500
+    import_isbn_concurrency: int = 8
+    book_metadata_enabled: bool = True
+    book_metadata_ttl_seconds: int = 30 * 24 * 3600
+    enrichment_background: bool = True
+    enrichment_max_attempts: int = 5
+    enrichment_backoff_seconds: float = 2.0
+    enrichment_backoff_max_seconds: float = 600.0
+    enrichment_cli_wait_seconds: float = 15.0
+    http_timeout: float = 10.0
+    http_connect_timeout: float = 5.0
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: float = 30.0
+    http2: bool = False
+    provider_hedge: bool = True
+    provider_hedge_max_seconds: float = 1.0
+    provider_health_window_seconds: float = 300.0
+    provider_breaker_error_rate: float = 0.5
+    provider_breaker_min_calls: int = 5
+    provider_breaker_cooldown_seconds: float = 30.0
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
@@ -15,13 +62,76 @@ class Settings(BaseSettings):
     def tinydb_path(self) -> Path:
         return self.myreads_data_dir / "reads.json"
 
+    @property
+    def sqlite_path(self) -> Path:
+        return self.myreads_data_dir / "reads.sqlite3"
+
+    @property
+    def embedding_cache_path(self) -> Path:
+        return self.myreads_data_dir / "embedding_cache.sqlite3"
+
     @property
     def chroma_path(self) -> Path:
         return self.myreads_data_dir / "chroma"
 
+    @property
+    def numpy_vectors_path(self) -> Path:
+        return self.myreads_data_dir / "vectors"
+
+    @property
+    def reviews_collection(self) -> str:
+        """Vector collection for review vectors; one per provider since dimensions differ."""
+        if self.embedding_provider == "openai":
+            return "reviews"
+        return f"reviews_local_{self.local_embedding_dim}"
+
+    @property
+    def sessions_collection(self) -> str:
+        """Vector collection for recommendation-session moods (the semantic session cache)."""
+        if self.embedding_provider == "openai":
+            return "sessions"
+        return f"sessions_local_{self.local_embedding_dim}"
+
+    @property
+    def api_cache_path(self) -> Path:
+        return self.myreads_data_dir / "api_cache.sqlite3"
+
+    @property
+    def book_metadata_path(self) -> Path:
+        return self.myreads_data_dir / "book_metadata.sqlite3"
+
+    @property
+    def provider_health_path(self) -> Path:
+        return self.myreads_data_dir / "provider_health.json"
+
+    @property
+    def import_checkpoint_dir(self) -> Path:
+        return self.myreads_data_dir / "imports"
+
+    @property
+    def jobs_path(self) -> Path:
+        return self.myreads_data_dir / "jobs.sqlite3"
+
     def ensure_data_dir(self) -> None:
         self.myreads_data_dir.mkdir(parents=True, exist_ok=True)
 
 
+_settings_lock = threading.Lock()
+_settings_cache: tuple[float | None, Settings] | None = None
+
+
+def _env_file_mtime() -> float | None:
+    try:
+        return Path(Settings.model_config["env_file"]).stat().st_mtime
+    except OSError:
+        return None
+
+
 def get_settings() -> Settings:
-    return Settings()
+    """Return the shared Settings, re-reading ``.env`` only when it has changed."""
+    global _settings_cache
+    mtime = _env_file_mtime()
+    with _settings_lock:
+        if _settings_cache is None or _settings_cache[0] != mtime:
+            _settings_cache = (mtime, Settings())
+        return _settings_cache[1]
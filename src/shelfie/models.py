@@ -3,9 +3,12 @@ from __future__ import annotations
 import uuid
 from datetime import date, datetime
 from enum import Enum
+from typing import Generic, TypeVar
 
 from pydantic import BaseModel, Field
 
+T = TypeVar("T")
+
 
 class ReadStatus(str, Enum):
     READING = "reading"
@@ -19,6 +22,9 @@ class Direction(str, Enum):
     BALANCE = "balance"
 
 
+MAX_RECOMMENDATIONS_PER_CALL = 10
+
+
 def _new_id() -> str:
     return uuid.uuid4().hex[:8]
 
@@ -73,7 +79,7 @@ class BookRecommendation(BaseModel):
 class RecommendationResponse(BaseModel):
     """A list of book recommendations from the engine."""
 
-    recommendations: list[BookRecommendation] = Field(min_length=1, max_length=10)
+    recommendations: list[BookRecommendation] = Field(min_length=1, max_length=MAX_RECOMMENDATIONS_PER_CALL)
 
 
 class RecommendationSession(BaseModel):
@@ -83,6 +89,12 @@ class RecommendationSession(BaseModel):
     mood: str
     direction: Direction = Direction.BALANCE
     recommendations: list[BookRecommendation] = []
+    llm_round_trips: int = 0
+    prompt_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    generation_ms: int = 0
+    cache_status: str | None = None  # "hit", "miss" or "bypass" when the session cache is on
+    cached_from: str | None = None
     created_at: datetime = Field(default_factory=datetime.now)
 
     def to_doc(self) -> dict:
@@ -109,3 +121,10 @@ class BookSearchResult(BaseModel):
     ratings_count: int = 0
     source: str = ""
     info_url: str = ""
+
+
+class Page(BaseModel, Generic[T]):
+    """One page of a newest-first listing; pass ``next_cursor`` back to get the next one."""
+
+    items: list[T] = []
+    next_cursor: str | None = None
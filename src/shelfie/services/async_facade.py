@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TypeVar
+
+from shelfie.apis import http_client, openai_client
+from shelfie.models import (
+    BookRecommendation,
+    BookSearchResult,
+    Direction,
+    Page,
+    Read,
+    RecommendationSession,
+)
+from shelfie.services.reads import ImportResult, ReadService
+from shelfie.services.recommendations import RecommendationEngine
+
+T = TypeVar("T")
+
+
+class ThreadRunner:
+    """A bounded thread pool for running blocking storage/API calls off the event loop."""
+
+    def __init__(self, max_workers: int = 8) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="shelfie-io"
+        )
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(fn, *args, **kwargs)
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+class AsyncReadService:
+    """Awaitable wrapper around :class:`ReadService` for async callers."""
+
+    def __init__(self, read_service: ReadService, runner: ThreadRunner) -> None:
+        self._read_service = read_service
+        self._runner = runner
+
+    async def log_read(self, read: Read) -> Read:
+        return await self._runner.run(self._read_service.log_read, read)
+
+    async def list_reads(
+        self,
+        status: str | None = None,
+        min_rating: int | None = None,
+        year: int | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> Page[Read]:
+        return await self._runner.run(
+            self._read_service.list_reads,
+            status=status,
+            min_rating=min_rating,
+            year=year,
+            limit=limit,
+            cursor=cursor,
+        )
+
+    async def get_read(self, read_id: str) -> Read | None:
+        return await self._runner.run(self._read_service.get_read, read_id)
+
+    async def book_metadata(self, reads: list[Read], refresh: bool = False) -> dict[str, BookSearchResult]:
+        return await self._runner.run(self._read_service.book_metadata, reads, refresh=refresh)
+
+    async def enrichment_status(self, read_id: str) -> dict[str, dict]:
+        return await self._runner.run(self._read_service.enrichment_status, read_id)
+
+    async def enrichment_counts(self) -> dict[str, int]:
+        return await self._runner.run(self._read_service.enrichment_counts)
+
+    async def import_csv(
+        self,
+        path: Path,
+        resolve_isbns: bool = True,
+        on_progress: Callable[[ImportResult], None] | None = None,
+    ) -> ImportResult:
+        return await self._runner.run(
+            self._read_service.import_csv, path, resolve_isbns=resolve_isbns, on_progress=on_progress
+        )
+
+
+class AsyncRecommendationEngine:
+    """Awaitable wrapper around :class:`RecommendationEngine` for async callers."""
+
+    def __init__(self, rec_engine: RecommendationEngine, runner: ThreadRunner) -> None:
+        self._rec_engine = rec_engine
+        self._runner = runner
+
+    async def recommend(
+        self, mood: str, direction: Direction, refresh: bool = False
+    ) -> RecommendationSession:
+        # The engine keeps its blocking storage work off the loop itself.
+        return await self._rec_engine.recommend(mood, direction, refresh=refresh)
+
+    def recommend_stream(
+        self, mood: str, direction: Direction, refresh: bool = False
+    ) -> AsyncIterator[BookRecommendation | RecommendationSession]:
+        return self._rec_engine.recommend_stream(mood, direction, refresh=refresh)
+
+    async def session_cache_stats(self) -> dict:
+        return await self._runner.run(self._rec_engine.session_cache_stats)
+
+    async def get_sessions(
+        self, limit: int | None = None, cursor: str | None = None
+    ) -> Page[RecommendationSession]:
+        return await self._runner.run(self._rec_engine.get_sessions, limit=limit, cursor=cursor)
+
+    async def aclose(self) -> None:
+        """Close the async OpenAI and book API clients recommendations opened on this loop.
+
+        The clients are shared process-wide, so call this at shutdown, not
+        when one generation of services is swapped for the next.
+        """
+        await openai_client.aclose_clients()
+        await http_client.aclose_clients()
@@ -1,41 +1,527 @@
 from __future__ import annotations
 
-from shelfie.apis import google_books, open_library
+import asyncio
+import re
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TypeVar
+
+from shelfie.apis import google_books, health, open_library
+from shelfie.apis.cache import BookMetadataStore, ResponseCache
 from shelfie.models import BookSearchResult
 
+T = TypeVar("T")
+
+_executors: dict[str, ThreadPoolExecutor] = {}
+_executor_lock = threading.Lock()
+
+# A provider batch that failed is retried this long after, not on every lookup.
+_FAILED_BATCH_RETRY_SECONDS = 60.0
+_failed_until: dict[tuple[str, str], float] = {}
+_failed_lock = threading.Lock()
+
+
+def _get_executor(provider: str) -> ThreadPoolExecutor:
+    """One pool per provider, so calls stuck on a slow provider can't starve the other."""
+    with _executor_lock:
+        executor = _executors.get(provider)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix=f"book-lookup-{provider}")
+            _executors[provider] = executor
+        return executor
+
+
+# ── Caching ──────────────────────────────────────────────────────────
+
+
+def _cached_search(
+    cache: ResponseCache | None,
+    provider: str,
+    query: str,
+    fetch: Callable[[], list[BookSearchResult]],
+    refresh: bool,
+) -> list[BookSearchResult]:
+    fetch = health.guarded(provider, fetch)
+    if cache is None:
+        return fetch()
+    docs = cache.get_or_fetch(
+        provider,
+        query,
+        lambda: [r.model_dump() for r in fetch()],
+        params={"max_results": 5},
+        refresh=refresh,
+    )
+    return [BookSearchResult.model_validate(d) for d in docs]
+
+
+async def _cached_search_async(
+    cache: ResponseCache | None,
+    provider: str,
+    query: str,
+    fetch: Callable[[], Awaitable[list[BookSearchResult]]],
+    refresh: bool,
+) -> list[BookSearchResult]:
+    fetch = health.guarded_async(provider, fetch)
+    if cache is None:
+        return await fetch()
+    # The cache is SQLite: keep its reads and writes (and eviction) off the loop.
+    params = {"max_results": 5}
+    docs = None if refresh else await asyncio.to_thread(cache.get, provider, query, params)
+    if docs is None:
+        docs = [r.model_dump() for r in await fetch()]
+        await asyncio.to_thread(cache.set, provider, query, docs, params)
+    return [BookSearchResult.model_validate(d) for d in docs]
+
+
+def _cached_isbn(
+    cache: ResponseCache | None,
+    provider: str,
+    title: str,
+    author: str,
+    fetch: Callable[[], str | None],
+    refresh: bool,
+) -> str | None:
+    fetch = health.guarded(provider, fetch)
+    if cache is None:
+        return fetch()
+    # Store misses as "" so a known-unresolvable book isn't re-queried until TTL.
+    isbn = cache.get_or_fetch(
+        f"{provider}:isbn",
+        f"{title}\n{author}",
+        lambda: fetch() or "",
+        refresh=refresh,
+    )
+    return isbn or None
+
+
+async def _cached_isbn_async(
+    cache: ResponseCache | None,
+    provider: str,
+    title: str,
+    author: str,
+    fetch: Callable[[], Awaitable[str | None]],
+    refresh: bool,
+) -> str | None:
+    fetch = health.guarded_async(provider, fetch)
+    if cache is None:
+        return await fetch()
+    key = f"{title}\n{author}"
+    isbn = None if refresh else await asyncio.to_thread(cache.get, f"{provider}:isbn", key)
+    if isbn is None:
+        isbn = await fetch() or ""
+        await asyncio.to_thread(cache.set, f"{provider}:isbn", key, isbn)
+    return isbn or None
+
+
+# ── Fan-out ──────────────────────────────────────────────────────────
+
 
-def search_books(query: str, google_api_key: str = "") -> list[BookSearchResult]:
-    """Search for books across available APIs, with graceful fallback."""
-    results: list[BookSearchResult] = []
+def _first_sync(
+    calls: list[tuple[str, Callable[[], T]]],
+    accept: Callable[[T], bool],
+    strict: bool = False,
+) -> T | None:
+    """Try ``(provider, call)`` pairs in order; return the first result that ``accept``s.
+
+    Each provider gets until its p95 latency to answer before the next one
+    is started alongside it (a hedged request). A provider that fails, is
+    skipped by its circuit breaker or comes back empty starts the next one
+    at once. With hedging off they all start together.
+
+    ``None`` means nobody had an acceptable answer. With ``strict`` it also
+    means at least one provider answered: if every call raised (including
+    :class:`~shelfie.apis.health.ProviderUnavailable`), the last error is
+    raised instead.
+    """
+    waiting = list(calls)
+    running: dict[Future, str] = {}
+    hedge_at: float | None = None
+    error: Exception | None = None
+    answered = False
+
+    def start_next() -> None:
+        nonlocal hedge_at
+        provider, call = waiting.pop(0)
+        running[_get_executor(provider).submit(call)] = provider
+        delay = health.hedge_delay(provider)
+        hedge_at = None if delay is None else time.monotonic() + delay
 
     try:
-        results = google_books.search(query, api_key=google_api_key)
-    except Exception:
-        pass
+        while running or waiting:
+            if waiting and (not running or hedge_at is None):
+                start_next()
+                continue
+            timeout = max(0.0, hedge_at - time.monotonic()) if waiting else None
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                start_next()
+                continue
+            for future in done:
+                del running[future]
+                try:
+                    value = future.result()
+                except Exception as exc:
+                    error = exc
+                    continue
+                answered = True
+                if accept(value):
+                    return value
+        if strict and not answered and error is not None:
+            raise error
+        return None
+    finally:
+        # Calls already under way finish on their own, so their latency
+        # still reaches the provider's health.
+        for future in running:
+            future.cancel()
 
-    if not results:
+
+def _all_sync(calls: list[tuple[str, Callable[[], T]]]) -> list[T]:
+    """Run ``calls`` concurrently and return every successful result, in call order."""
+    futures = [_get_executor(provider).submit(call) for provider, call in calls]
+    values: list[T] = []
+    for future in futures:
         try:
-            results = open_library.search(query)
+            values.append(future.result())
         except Exception:
             pass
+    return values
 
-    return results
 
+_detached: set[asyncio.Task] = set()
 
-def resolve_isbn(title: str, author: str, google_api_key: str = "") -> str:
-    """Try to find an ISBN for a book via available APIs."""
-    try:
-        isbn = google_books.lookup_isbn(title, author, api_key=google_api_key)
-        if isbn:
-            return isbn
-    except Exception:
-        pass
+
+def _detach(task: asyncio.Task) -> None:
+    """Let a losing hedged call finish in the background instead of cancelling it."""
+    _detached.add(task)
+    task.add_done_callback(_detached.discard)
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+async def _first_async(
+    calls: list[tuple[str, Callable[[], Awaitable[T]]]],
+    accept: Callable[[T], bool],
+    strict: bool = False,
+) -> T | None:
+    """Async counterpart of :func:`_first_sync`."""
+    waiting = list(calls)
+    running: set[asyncio.Task] = set()
+    hedge_at: float | None = None
+    error: Exception | None = None
+    answered = False
+
+    def start_next() -> None:
+        nonlocal hedge_at
+        provider, call = waiting.pop(0)
+        running.add(asyncio.ensure_future(call()))
+        delay = health.hedge_delay(provider)
+        hedge_at = None if delay is None else time.monotonic() + delay
 
     try:
-        isbn = open_library.lookup_isbn(title, author)
-        if isbn:
-            return isbn
-    except Exception:
-        pass
+        while running or waiting:
+            if waiting and (not running or hedge_at is None):
+                start_next()
+                continue
+            timeout = max(0.0, hedge_at - time.monotonic()) if waiting else None
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                start_next()
+                continue
+            for task in done:
+                running.discard(task)
+                try:
+                    value = task.result()
+                except Exception as exc:
+                    error = exc
+                    continue
+                answered = True
+                if accept(value):
+                    return value
+        if strict and not answered and error is not None:
+            raise error
+        return None
+    finally:
+        for task in running:
+            _detach(task)
+
+
+async def _all_async(calls: list[tuple[str, Callable[[], Awaitable[T]]]]) -> list[T]:
+    values = await asyncio.gather(*(call() for _, call in calls), return_exceptions=True)
+    return [v for v in values if not isinstance(v, BaseException)]
+
+
+# ── Merge / dedupe ───────────────────────────────────────────────────
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def _dedupe_keys(result: BookSearchResult) -> set[str]:
+    keys = {f"{_normalize(result.title)}|{_normalize(result.author)}"}
+    if result.isbn:
+        keys.add(f"isbn:{result.isbn}")
+    return keys
+
+
+def merge_results(result_sets: list[list[BookSearchResult]]) -> list[BookSearchResult]:
+    """Concatenate result sets in priority order, dropping duplicates by ISBN or title + author."""
+    merged: list[BookSearchResult] = []
+    seen: set[str] = set()
+    for results in result_sets:
+        for result in results:
+            keys = _dedupe_keys(result)
+            if keys & seen:
+                continue
+            seen |= keys
+            merged.append(result)
+    return merged
+
+
+# ── Metadata by ISBN ─────────────────────────────────────────────────
+
+
+def merge_metadata(results: list[BookSearchResult | None]) -> BookSearchResult | None:
+    """The first result, with any empty field filled from the ones after it."""
+    present = [r for r in results if r is not None]
+    if not present:
+        return None
+    merged = present[0].model_copy()
+    for other in present[1:]:
+        for field, value in other:
+            if value and not getattr(merged, field):
+                setattr(merged, field, value)
+    return merged
+
+
+def _remember(store: BookMetadataStore | None, results: list[BookSearchResult]) -> None:
+    """File search results under their ISBNs, keeping fields a result lacks."""
+    if store is None:
+        return
+    by_isbn = {r.isbn: r for r in results if r.isbn}
+    if not by_isbn:
+        return
+    existing = store.get_many(list(by_isbn))
+    docs = {}
+    for isbn, result in by_isbn.items():
+        old, _ = existing.get(isbn, (None, True))
+        old_result = BookSearchResult.model_validate(old) if old else None
+        docs[isbn] = merge_metadata([result, old_result]).model_dump()
+    store.put_many(docs)
+
+
+def _chunks(items: list[str], size: int) -> list[list[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _recently_failed(provider: str, isbns: list[str]) -> set[str]:
+    now = time.monotonic()
+    with _failed_lock:
+        for key in [k for k, until in _failed_until.items() if until <= now]:
+            del _failed_until[key]
+        return {isbn for isbn in isbns if (provider, isbn) in _failed_until}
+
+
+def _remember_failure(provider: str, isbns: list[str]) -> None:
+    until = time.monotonic() + _FAILED_BATCH_RETRY_SECONDS
+    with _failed_lock:
+        for isbn in isbns:
+            _failed_until[(provider, isbn)] = until
+
+
+def _fetch_metadata(isbns: list[str], google_api_key: str) -> tuple[dict[str, BookSearchResult], set[str]]:
+    """Batch-fetch both providers concurrently.
+
+    Returns the merged results (Google Books first, for its descriptions)
+    and the ISBNs at least one provider answered for, found or not. ISBNs
+    whose batch failed at a provider aren't sent there again for
+    ``_FAILED_BATCH_RETRY_SECONDS``, so a bookshelf reload doesn't wait on
+    the same failure each time.
+    """
+    lookups = {
+        "google_books": (
+            google_books.ISBN_BATCH,
+            lambda c: google_books.lookup_isbns(c, api_key=google_api_key),
+        ),
+        "open_library": (
+            open_library.ISBN_BATCH,
+            lambda c: (open_library.lookup_isbns(c), set(c)),
+        ),
+    }
+    futures = []
+    for provider, (batch, lookup) in lookups.items():
+        skip = _recently_failed(provider, isbns)
+        for chunk in _chunks([i for i in isbns if i not in skip], batch):
+            call = health.guarded(provider, lambda c=chunk, lookup=lookup: lookup(c))
+            futures.append((provider, chunk, _get_executor(provider).submit(call)))
+    found: dict[str, dict[str, BookSearchResult]] = {"google_books": {}, "open_library": {}}
+    answered: set[str] = set()
+    for provider, chunk, future in futures:
+        try:
+            results, covered = future.result()
+        except Exception:
+            _remember_failure(provider, chunk)
+            continue
+        found[provider].update(results)
+        answered |= covered
+    merged = {}
+    for isbn in isbns:
+        result = merge_metadata([found["google_books"].get(isbn), found["open_library"].get(isbn)])
+        if result is not None:
+            merged[isbn] = result
+    return merged, answered
+
+
+# ── Public API ───────────────────────────────────────────────────────
+
+
+def search_books(
+    query: str,
+    google_api_key: str = "",
+    cache: ResponseCache | None = None,
+    refresh: bool = False,
+    merge: bool = False,
+    metadata: BookMetadataStore | None = None,
+) -> list[BookSearchResult]:
+    """Search for books across the available APIs.
+
+    By default Google Books is asked first and Open Library is hedged in
+    once Google runs past its p95 (or fails, or its breaker is open); the
+    first non-empty result set wins. With ``merge=True`` both providers are
+    awaited and their results deduped.
+    Results with an ISBN are filed in ``metadata`` when given.
+    """
+    calls = [
+        ("google_books", lambda: _cached_search(
+            cache, "google_books", query,
+            lambda: google_books.search(query, api_key=google_api_key), refresh,
+        )),
+        ("open_library", lambda: _cached_search(
+            cache, "open_library", query,
+            lambda: open_library.search(query), refresh,
+        )),
+    ]
+    if merge:
+        results = merge_results(_all_sync(calls))
+    else:
+        results = _first_sync(calls, bool) or []
+    _remember(metadata, results)
+    return results
+
+
+async def search_books_async(
+    query: str,
+    google_api_key: str = "",
+    cache: ResponseCache | None = None,
+    refresh: bool = False,
+    merge: bool = False,
+    metadata: BookMetadataStore | None = None,
+) -> list[BookSearchResult]:
+    """Async counterpart of :func:`search_books` for use inside an event loop."""
+    calls = [
+        ("google_books", lambda: _cached_search_async(
+            cache, "google_books", query,
+            lambda: google_books.search_async(query, api_key=google_api_key), refresh,
+        )),
+        ("open_library", lambda: _cached_search_async(
+            cache, "open_library", query,
+            lambda: open_library.search_async(query), refresh,
+        )),
+    ]
+    if merge:
+        results = merge_results(await _all_async(calls))
+    else:
+        results = await _first_async(calls, bool) or []
+    if metadata is not None:
+        await asyncio.to_thread(_remember, metadata, results)
+    return results
+
+
+def resolve_isbn(
+    title: str,
+    author: str,
+    google_api_key: str = "",
+    cache: ResponseCache | None = None,
+    refresh: bool = False,
+    strict: bool = False,
+) -> str:
+    """Ask the providers for an ISBN, hedged like :func:`search_books`; the first non-empty answer wins.
+
+    ``""`` means no ISBN was found. By default that includes every provider
+    failing; with ``strict`` that raises instead, so ``""`` always means a
+    provider looked and had no match.
+    """
+    calls = [
+        ("google_books", lambda: _cached_isbn(
+            cache, "google_books", title, author,
+            lambda: google_books.lookup_isbn(title, author, api_key=google_api_key), refresh,
+        )),
+        ("open_library", lambda: _cached_isbn(
+            cache, "open_library", title, author,
+            lambda: open_library.lookup_isbn(title, author), refresh,
+        )),
+    ]
+    return _first_sync(calls, bool, strict) or ""
+
+
+async def resolve_isbn_async(
+    title: str,
+    author: str,
+    google_api_key: str = "",
+    cache: ResponseCache | None = None,
+    refresh: bool = False,
+    strict: bool = False,
+) -> str:
+    calls = [
+        ("google_books", lambda: _cached_isbn_async(
+            cache, "google_books", title, author,
+            lambda: google_books.lookup_isbn_async(title, author, api_key=google_api_key), refresh,
+        )),
+        ("open_library", lambda: _cached_isbn_async(
+            cache, "open_library", title, author,
+            lambda: open_library.lookup_isbn_async(title, author), refresh,
+        )),
+    ]
+    return await _first_async(calls, bool, strict) or ""
+
+
+def lookup_books(
+    isbns: list[str],
+    google_api_key: str = "",
+    store: BookMetadataStore | None = None,
+    refresh: bool = False,
+) -> dict[str, BookSearchResult]:
+    """Metadata for each ISBN, from ``store`` where it's fresh and fetched in batches otherwise.
+
+    Missing and stale ISBNs go to Open Library's multi-bibkey endpoint (50
+    per request) and to OR-ed Google Books ``isbn:`` queries (20 per
+    request) at the same time, so a whole shelf costs a handful of
+    requests. If a refresh fails the stale copy is returned instead, and
+    the failed batch is left alone for a minute. ISBNs nobody knows are
+    left out.
+    """
+    isbns = list(dict.fromkeys(i for i in isbns if i))
+    cached = store.get_many(isbns) if store is not None else {}
+    books = {
+        isbn: BookSearchResult.model_validate(doc)
+        for isbn, (doc, _) in cached.items()
+        if doc is not None
+    }
+    todo = [i for i in isbns if refresh or i not in cached or cached[i][1]]
+    if not todo:
+        return books
 
-    return ""
+    fetched, answered = _fetch_metadata(todo, google_api_key)
+    updates: dict[str, dict | None] = {}
+    for isbn in todo:
+        if isbn in fetched:
+            books[isbn] = fetched[isbn]
+            updates[isbn] = fetched[isbn].model_dump()
+        elif isbn in answered:
+            # Nobody has it (any more): keep what we had, and don't ask again until it's stale.
+            updates[isbn] = books[isbn].model_dump() if isbn in books else None
+    if store is not None:
+        store.put_many(updates)
+    return books
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import math
+
+# Chosen so a library that only ever grows keeps the same oldest-included read
+# for several new entries in a row; see ``ContextBuilder.reading_history``.
+WINDOW_STEP = 8
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English prose (~4 characters per token)."""
+    return math.ceil(len(text) / 4)
+
+
+class ContextBuilder:
+    """Renders the reading history for the recommendation prompt within a token budget.
+
+    Reads are listed oldest to newest, so the history extends at the end
+    as the library grows and the text before it (system prompt plus older
+    reads) stays byte-identical between calls, which is what provider-side
+    prompt caching keys on. The oldest read shown only moves forward in
+    steps of ``WINDOW_STEP`` reads, not on every new entry.
+
+    Rendered lines and their token estimates are cached per read and only
+    re-rendered when the read's title, author, rating, status or review changes.
+    """
+
+    def __init__(self, token_budget: int = 1500, review_chars: int = 300) -> None:
+        self.token_budget = token_budget
+        self.review_chars = review_chars
+        self._lines: dict[str, tuple[tuple, str, int]] = {}
+
+    def reading_history(self, docs: list[dict]) -> str:
+        if not docs:
+            return "No reading history yet."
+
+        docs = sorted(docs, key=lambda d: d["created_at"])
+        rendered = [self._line(doc) for doc in docs]
+
+        # Walk back from the newest read until the budget is spent...
+        start = len(rendered)
+        used = 0
+        while start > 0 and used + rendered[start - 1][1] <= self.token_budget:
+            start -= 1
+            used += rendered[start][1]
+        start = min(start, len(rendered) - 1)  # always show the latest read
+
+        # ...then round the cut-off up to a window boundary so it stays put.
+        if start > 0:
+            start = min(math.ceil(start / WINDOW_STEP) * WINDOW_STEP, len(rendered) - 1)
+
+        return "\n".join(line for line, _ in rendered[start:])
+
+    def _line(self, doc: dict) -> tuple[str, int]:
+        key = (
+            doc.get("title"),
+            doc.get("author"),
+            doc.get("rating"),
+            doc.get("status"),
+            doc.get("review"),
+        )
+        cached = self._lines.get(doc["id"])
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
+
+        line = f"- {doc['title']} by {doc['author']} | Rating: {doc['rating']}/5 | Status: {doc['status']}"
+        review = doc.get("review") or ""
+        if review:
+            preview = review[: self.review_chars] + ("..." if len(review) > self.review_chars else "")
+            line += f'\n  Review: "{preview}"'
+        tokens = estimate_tokens(line) + 1  # + the newline joining it to the next line
+        self._lines[doc["id"]] = (key, line, tokens)
+        return line, tokens
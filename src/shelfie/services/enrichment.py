@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+
+from shelfie.config import Settings
+from shelfie.storage.jobs import Job, JobQueue
+
+# Job kinds, one row per read each.
+ISBN = "isbn"
+EMBEDDING = "embedding"
+
+# Even with nothing due, look again now and then for jobs another
+# process (the CLI next to a running server) has queued.
+_POLL_SECONDS = 30.0
+
+
+class EnrichmentWorker:
+    """Runs queued enrichment jobs, on a daemon thread or in the foreground.
+
+    ``handlers`` maps a job kind to a function taking the read id. A
+    handler that raises is retried with exponential backoff
+    (``enrichment_backoff_seconds``, doubling per attempt, capped at
+    ``enrichment_backoff_max_seconds``) until ``enrichment_max_attempts``
+    is used up, after which the job is marked failed with the last error.
+    """
+
+    def __init__(
+        self,
+        jobs: JobQueue,
+        handlers: dict[str, Callable[[str], None]],
+        settings: Settings,
+    ) -> None:
+        self._jobs = jobs
+        self._handlers = handlers
+        self._max_attempts = max(1, settings.enrichment_max_attempts)
+        self._backoff = settings.enrichment_backoff_seconds
+        self._backoff_max = settings.enrichment_backoff_max_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="shelfie-enrichment", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self) -> None:
+        """Tell the thread new jobs are queued (a no-op if it isn't running)."""
+        self._wake.set()
+
+    def run_pending(self, force: bool = False, deadline: float | None = None) -> int:
+        """Run due jobs in this thread; ``force`` includes ones backing off.
+
+        Stops once nothing is due or, between jobs, at ``deadline`` (a
+        ``time.monotonic()`` value). A job that fails here is rescheduled,
+        not retried in the same call. Returns the number of jobs run.
+        """
+        waiting_since = time.time() if force else None
+        ran = 0
+        while deadline is None or time.monotonic() < deadline:
+            job = self._jobs.claim(waiting_since)
+            if job is None:
+                break
+            self._run(job)
+            ran += 1
+        return ran
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_pending()
+                wait = self._jobs.seconds_until_due()
+            except Exception:
+                wait = None
+            self._wake.wait(_POLL_SECONDS if wait is None else min(wait, _POLL_SECONDS))
+            self._wake.clear()
+
+    def _run(self, job: Job) -> None:
+        handler = self._handlers.get(job.kind)
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job kind '{job.kind}'.")
+            handler(job.read_id)
+        except BaseException as exc:
+            error = str(exc) or type(exc).__name__
+            if not isinstance(exc, Exception):
+                # Interrupted (Ctrl-C in the CLI): hand the job straight back.
+                self._jobs.retry(job, error, 0.0)
+                raise
+            if job.attempts >= self._max_attempts:
+                self._jobs.fail(job, error)
+            else:
+                delay = min(self._backoff * 2 ** (job.attempts - 1), self._backoff_max)
+                self._jobs.retry(job, error, delay)
+        else:
+            self._jobs.complete(job)
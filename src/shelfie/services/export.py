@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from shelfie.config import Settings
+from shelfie.storage import Storage
+from shelfie.storage.base import read_key
+
+FORMAT_VERSION = 1
+_BATCH = 500
+
+# Snapshot layout: one directory holding these files.
+MANIFEST = "manifest.json"
+READS = "reads.jsonl"
+SESSIONS = "sessions.jsonl"
+VECTORS = "review_vectors.npy"
+VECTORS_SIDECAR = "review_vectors.jsonl"
+
+
+@dataclass
+class ExportResult:
+    reads: int = 0
+    sessions: int = 0
+    vectors: int = 0
+
+
+@dataclass
+class RestoreResult:
+    reads: int = 0
+    sessions: int = 0
+    vectors: int = 0
+    duplicates: int = 0
+    vectors_skipped: int = 0
+
+
+class ExportService:
+    """Streams the library out and back in without holding it in memory.
+
+    Two formats:
+
+    - **NDJSON** — one JSON record per line (``manifest``, then ``read``,
+      ``session`` and ``review_vector`` records). Easy to pipe and inspect.
+    - **Snapshot** — a directory with ``reads.jsonl`` / ``sessions.jsonl``,
+      review vectors as a float32 ``.npy`` matrix plus a ``.jsonl`` sidecar
+      (id, document, metadata per row) and a ``manifest.json``. Restoring it
+      memory-maps the matrix and upserts it in batches, with no re-embedding.
+
+    Both read the stores a page at a time, so memory stays flat as the
+    library grows.
+    """
+
+    def __init__(self, storage: Storage, settings: Settings) -> None:
+        self._storage = storage
+        self._settings = settings
+
+    # ── Export ───────────────────────────────────────────────────────
+
+    def iter_ndjson(self) -> Iterator[str]:
+        for record in self._records():
+            yield _line(record)
+
+    def write_ndjson(
+        self, path: Path, on_progress: Callable[[ExportResult], None] | None = None
+    ) -> ExportResult:
+        result = ExportResult()
+        counters = {"read": "reads", "session": "sessions", "review_vector": "vectors"}
+        with open(path, "w", encoding="utf-8") as f:
+            for record in self._records():
+                f.write(_line(record))
+                field = counters.get(record["type"])
+                if field:
+                    setattr(result, field, getattr(result, field) + 1)
+                    if on_progress and getattr(result, field) % _BATCH == 0:
+                        on_progress(result)
+        return result
+
+    def _records(self) -> Iterator[dict]:
+        yield {"type": "manifest", **self._manifest()}
+        for doc in self._storage.iter_reads(_BATCH):
+            yield {"type": "read", "doc": doc}
+        for doc in self._storage.iter_sessions(_BATCH):
+            yield {"type": "session", "doc": doc}
+        for batch in self._storage.iter_review_embeddings(_BATCH):
+            for item_id, document, metadata, embedding in _rows(batch):
+                yield {
+                    "type": "review_vector",
+                    "id": item_id,
+                    "document": document,
+                    "metadata": metadata,
+                    "embedding": embedding.tolist(),
+                }
+
+    def write_snapshot(
+        self, directory: Path, on_progress: Callable[[ExportResult], None] | None = None
+    ) -> ExportResult:
+        import numpy as np
+
+        directory.mkdir(parents=True, exist_ok=True)
+        result = ExportResult()
+        result.reads = _write_jsonl(directory / READS, self._storage.iter_reads(_BATCH))
+        result.sessions = _write_jsonl(directory / SESSIONS, self._storage.iter_sessions(_BATCH))
+        if on_progress:
+            on_progress(result)
+
+        # The .npy header needs the shape up front: size it from the current
+        # count and record how many rows actually got written.
+        expected = self._storage.review_embedding_count()
+        matrix = None
+        with open(directory / VECTORS_SIDECAR, "w", encoding="utf-8") as sidecar:
+            for batch in self._storage.iter_review_embeddings(_BATCH):
+                embeddings = batch["embeddings"]
+                if matrix is None:
+                    matrix = np.lib.format.open_memmap(
+                        directory / VECTORS, mode="w+", dtype=np.float32,
+                        shape=(expected, embeddings.shape[1]),
+                    )
+                take = min(len(embeddings), expected - result.vectors)
+                matrix[result.vectors:result.vectors + take] = embeddings[:take]
+                for item_id, document, metadata, _ in list(_rows(batch))[:take]:
+                    sidecar.write(_line({"id": item_id, "document": document, "metadata": metadata}))
+                result.vectors += take
+                if on_progress:
+                    on_progress(result)
+                if result.vectors >= expected:
+                    break
+        if matrix is not None:
+            matrix.flush()
+            del matrix
+
+        manifest = self._manifest()
+        manifest.update(reads=result.reads, sessions=result.sessions, vector_rows=result.vectors)
+        (directory / MANIFEST).write_text(json.dumps(manifest, indent=2))
+        return result
+
+    def _manifest(self) -> dict:
+        return {
+            "format": "shelfie-export",
+            "version": FORMAT_VERSION,
+            "exported_at": datetime.now().isoformat(),
+            "vector_collection": self._settings.reviews_collection,
+        }
+
+    # ── Restore ──────────────────────────────────────────────────────
+
+    def restore(
+        self, path: Path, on_progress: Callable[[RestoreResult], None] | None = None
+    ) -> RestoreResult:
+        """Load an NDJSON export or a snapshot directory into this library.
+
+        Reads already present (same title + author) and sessions with a known
+        id are skipped, along with their vectors. Vectors from a different
+        embedding provider or dimension are skipped too; run ``shelfie
+        reindex`` afterwards to embed those reviews.
+        """
+        restorer = _Restorer(self._storage, self._settings, on_progress)
+        path = Path(path)
+        if path.is_dir():
+            manifest = json.loads((path / MANIFEST).read_text())
+            restorer.check(manifest)
+            restorer.add_reads(_read_jsonl(path / READS))
+            restorer.add_sessions(_read_jsonl(path / SESSIONS))
+            if manifest.get("vector_rows") and (path / VECTORS).exists():
+                restorer.add_vectors(_snapshot_vectors(path, manifest["vector_rows"]))
+        else:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        restorer.add_record(json.loads(line))
+        return restorer.finish()
+
+
+class _Restorer:
+    """Buffers restored records and writes them in batches."""
+
+    def __init__(
+        self,
+        storage: Storage,
+        settings: Settings,
+        on_progress: Callable[[RestoreResult], None] | None,
+    ) -> None:
+        self._storage = storage
+        self._collection = settings.reviews_collection
+        self._on_progress = on_progress
+        self._known_reads = {read_key(d["title"], d["author"]) for d in storage.iter_reads(_BATCH)}
+        self._known_sessions = {d["id"] for d in storage.iter_sessions(_BATCH)}
+        self._restored_ids: set[str] = set()
+        self._vectors_compatible = True
+        self._reads: list[dict] = []
+        self._sessions: list[dict] = []
+        self._vectors: list[tuple[str, str, dict, list[float]]] = []
+        self.result = RestoreResult()
+
+    def check(self, manifest: dict) -> None:
+        if manifest.get("format") != "shelfie-export":
+            raise ValueError("Not a Shelfie export.")
+        if manifest.get("version", 0) > FORMAT_VERSION:
+            raise ValueError(f"Export format v{manifest['version']} is newer than this Shelfie.")
+        self._vectors_compatible = manifest.get("vector_collection") == self._collection
+
+    def add_record(self, record: dict) -> None:
+        kind = record.get("type")
+        if kind == "manifest":
+            self.check(record)
+        elif kind == "read":
+            self.add_reads([record["doc"]])
+        elif kind == "session":
+            self.add_sessions([record["doc"]])
+        elif kind == "review_vector":
+            self.add_vectors([(record["id"], record["document"], record["metadata"], record["embedding"])])
+
+    def add_reads(self, docs: Iterable[dict]) -> None:
+        for doc in docs:
+            key = read_key(doc["title"], doc["author"])
+            if key in self._known_reads:
+                self.result.duplicates += 1
+                continue
+            self._known_reads.add(key)
+            self._restored_ids.add(doc["id"])
+            self._reads.append(doc)
+            if len(self._reads) >= _BATCH:
+                self._flush_reads()
+
+    def add_sessions(self, docs: Iterable[dict]) -> None:
+        for doc in docs:
+            if doc["id"] in self._known_sessions:
+                self.result.duplicates += 1
+                continue
+            self._known_sessions.add(doc["id"])
+            self._sessions.append(doc)
+            if len(self._sessions) >= _BATCH:
+                self._flush_sessions()
+
+    def add_vectors(self, rows: Iterable[tuple[str, str, dict, list[float]]]) -> None:
+        # Reads are flushed first so every vector lands next to its read.
+        self._flush_reads()
+        for row in rows:
+            if not self._vectors_compatible or row[0] not in self._restored_ids:
+                self.result.vectors_skipped += 1
+                continue
+            self._vectors.append(row)
+            if len(self._vectors) >= _BATCH:
+                self._flush_vectors()
+
+    def finish(self) -> RestoreResult:
+        self._flush_reads()
+        self._flush_sessions()
+        self._flush_vectors()
+        return self.result
+
+    def _flush_reads(self) -> None:
+        if self._reads:
+            self._storage.insert_reads(self._reads)
+            self.result.reads += len(self._reads)
+            self._reads = []
+            self._progress()
+
+    def _flush_sessions(self) -> None:
+        if self._sessions:
+            self._storage.insert_sessions(self._sessions)
+            self.result.sessions += len(self._sessions)
+            self._sessions = []
+            self._progress()
+
+    def _flush_vectors(self) -> None:
+        if self._vectors:
+            import numpy as np
+
+            ids, documents, metadatas, embeddings = zip(*self._vectors)
+            self._storage.upsert_review_embeddings(
+                read_ids=list(ids),
+                review_texts=list(documents),
+                embeddings=np.asarray(embeddings, dtype=np.float32).tolist(),
+                metadatas=list(metadatas),
+            )
+            self.result.vectors += len(self._vectors)
+            self._vectors = []
+            self._progress()
+
+    def _progress(self) -> None:
+        if self._on_progress:
+            self._on_progress(self.result)
+
+
+def _line(record: dict) -> str:
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+def _rows(batch: dict) -> Iterator[tuple]:
+    return zip(batch["ids"], batch["documents"], batch["metadatas"], batch["embeddings"])
+
+
+def _write_jsonl(path: Path, docs: Iterable[dict]) -> int:
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for doc in docs:
+            f.write(_line(doc))
+            written += 1
+    return written
+
+
+def _read_jsonl(path: Path) -> Iterator[dict]:
+    if not path.exists():
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _snapshot_vectors(directory: Path, rows: int) -> Iterator[tuple[str, str, dict, list[float]]]:
+    import numpy as np
+
+    matrix = np.load(directory / VECTORS, mmap_mode="r")
+    for row, entry in enumerate(_read_jsonl(directory / VECTORS_SIDECAR)):
+        if row >= rows:
+            return
+        yield entry["id"], entry["document"], entry["metadata"], matrix[row]
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import os
+import re
+from collections.abc import Iterator
+from datetime import date, datetime
+from pathlib import Path
+
+from shelfie.models import Read, ReadStatus
+
+_DATE_FORMATS = ("%Y/%m/%d", "%Y-%m-%d", "%m/%d/%Y")
+_ISBN = re.compile(r"^(\d{9}[\dX]|\d{13})$")
+_HTML_BREAK = re.compile(r"<br\s*/?>", re.IGNORECASE)
+
+_STATUSES = {
+    "read": ReadStatus.READ,
+    "currently-reading": ReadStatus.READING,
+    "paused": ReadStatus.READING,
+    "did-not-finish": ReadStatus.DNF,
+    "dnf": ReadStatus.DNF,
+    "abandoned": ReadStatus.DNF,
+}
+# Shelves for books that haven't been started; nothing to import for them.
+_UNREAD = {"to-read", "want-to-read"}
+
+
+def detect_format(header: list[str]) -> str:
+    """``goodreads`` or ``storygraph``, from the export's header row."""
+    columns = set(header)
+    if {"Title", "Author", "Exclusive Shelf"} <= columns:
+        return "goodreads"
+    if {"Title", "Authors", "Read Status"} <= columns:
+        return "storygraph"
+    raise ValueError(
+        "Unrecognised CSV: expected a Goodreads or StoryGraph library export."
+    )
+
+
+def iter_export(path: Path) -> Iterator[Read | None]:
+    """Stream an export file one row at a time.
+
+    Yields a :class:`Read` per importable row and ``None`` for rows that
+    are skipped (unread shelves, missing title or author), so row counts
+    line up with the file for resuming.
+    """
+    f = open(path, newline="", encoding="utf-8-sig")
+    try:
+        reader = csv.DictReader(f)
+        # Checked here rather than on the first row, so a wrong file fails at once.
+        parse = _goodreads_row if detect_format(reader.fieldnames or []) == "goodreads" else _storygraph_row
+    except BaseException:
+        f.close()
+        raise
+    return _rows(f, reader, parse)
+
+
+def _rows(f, reader: csv.DictReader, parse) -> Iterator[Read | None]:
+    with f:
+        for row in reader:
+            yield parse(row)
+
+
+def file_digest(path: Path) -> str:
+    """Content hash identifying an export, so a re-run of the same file resumes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ── Checkpoints ──────────────────────────────────────────────────────
+
+
+def load_checkpoint(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_checkpoint(path: Path, state: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, path)
+
+
+# ── Row parsing ──────────────────────────────────────────────────────
+
+
+def _goodreads_row(row: dict) -> Read | None:
+    shelf = (row.get("Exclusive Shelf") or "").strip().lower()
+    return _make_read(
+        title=row.get("Title"),
+        author=row.get("Author"),
+        isbn=_isbn(row.get("ISBN13")) or _isbn(row.get("ISBN")),
+        status=shelf,
+        rating=row.get("My Rating"),
+        review=row.get("My Review"),
+        finished=row.get("Date Read"),
+        added=row.get("Date Added"),
+    )
+
+
+def _storygraph_row(row: dict) -> Read | None:
+    return _make_read(
+        title=row.get("Title"),
+        author=row.get("Authors"),
+        isbn=_isbn(row.get("ISBN/UID")),
+        status=(row.get("Read Status") or "").strip().lower(),
+        rating=row.get("Star Rating"),
+        review=row.get("Review"),
+        finished=row.get("Last Date Read"),
+        added=row.get("Date Added"),
+    )
+
+
+def _make_read(
+    title: str | None,
+    author: str | None,
+    isbn: str,
+    status: str,
+    rating: str | None,
+    review: str | None,
+    finished: str | None,
+    added: str | None,
+) -> Read | None:
+    title = (title or "").strip()
+    author = (author or "").strip()
+    if not title or not author or status in _UNREAD:
+        return None
+
+    read = Read(
+        title=title,
+        author=author,
+        isbn=isbn,
+        status=_STATUSES.get(status, ReadStatus.READ),
+        rating=_rating(rating),
+        review=_HTML_BREAK.sub("\n", review or "").strip(),
+        finished_at=_date(finished),
+    )
+    added_on = _date(added)
+    if added_on:
+        # Keep the export's chronology, so history and listings read in order.
+        read.created_at = datetime.combine(added_on, datetime.min.time())
+    return read
+
+
+def _isbn(value: str | None) -> str:
+    # Goodreads wraps ISBNs as ="0441013597" to stop spreadsheets eating zeros.
+    cleaned = (value or "").strip().lstrip("=").strip('"').replace("-", "").upper()
+    return cleaned if _ISBN.match(cleaned) else ""
+
+
+def _rating(value: str | None) -> int:
+    try:
+        stars = float(value or 0)
+    except ValueError:
+        stars = 0
+    if stars <= 0:
+        return 3  # unrated; same default as a manually logged read
+    return min(5, max(1, int(stars + 0.5)))
+
+
+def _date(value: str | None) -> date | None:
+    value = (value or "").strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
@@ -1,28 +1,82 @@
 from __future__ import annotations
 
-from shelfie.apis import openai_client
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from itertools import islice
+from pathlib import Path
+from time import monotonic
+
+from shelfie.apis.cache import get_metadata_store, get_response_cache, text_hash
+from shelfie.apis.embeddings import get_embedding_provider
 from shelfie.config import Settings
-from shelfie.models import Read
-from shelfie.services.book_lookup import resolve_isbn
+from shelfie.models import BookSearchResult, Page, Read
+from shelfie.services.book_lookup import lookup_books, resolve_isbn
+from shelfie.services.enrichment import EMBEDDING, ISBN, EnrichmentWorker
+from shelfie.services.importer import file_digest, iter_export, load_checkpoint, save_checkpoint
 from shelfie.storage import Storage
+from shelfie.storage.base import read_key
+
+
+@dataclass
+class ReindexResult:
+    scanned: int = 0
+    stale: int = 0
+    embedded: int = 0
+    failed: int = 0
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+    isbns_resolved: int = 0
+    embedded: int = 0
+    failed: int = 0
+    resumed_from: int = 0
 
 
 class ReadService:
     def __init__(self, storage: Storage, settings: Settings) -> None:
         self._storage = storage
         self._settings = settings
+        self._embedder = get_embedding_provider(settings)
+        self._worker: EnrichmentWorker | None = None
 
     def log_read(self, read: Read) -> Read:
+        """Save a read, then fill in its ISBN and review embedding.
+
+        With ``enrichment_background`` (the default) the read is saved as is
+        and the lookups are queued as jobs for :meth:`start_enrichment` or
+        :meth:`run_enrichment` to pick up, so this returns without waiting on
+        any API. Otherwise they run inline before returning.
+        """
         if self._storage.read_exists(read.title, read.author):
             raise ValueError(
                 f"You've already logged '{read.title}' by {read.author}."
             )
 
+        if self._settings.enrichment_background:
+            self._storage.insert_read(read.to_doc())
+            kinds = []
+            if not read.isbn:
+                kinds.append(ISBN)
+            if read.review and self._embedder.available:
+                kinds.append(EMBEDDING)
+            if kinds:
+                self._storage.jobs.enqueue(read.id, kinds)
+                self._enrichment_worker().wake()
+            return read
+
         if not read.isbn:
             read.isbn = resolve_isbn(
                 read.title,
                 read.author,
                 google_api_key=self._settings.google_books_api_key,
+                cache=get_response_cache(self._settings),
             )
 
         self._storage.insert_read(read.to_doc())
@@ -37,40 +91,288 @@ class ReadService:
         status: str | None = None,
         min_rating: int | None = None,
         year: int | None = None,
-    ) -> list[Read]:
-        docs = self._storage.get_all_reads()
-        reads = [Read.from_doc(d) for d in docs]
-
-        if status:
-            reads = [r for r in reads if r.status.value == status]
-        if min_rating is not None:
-            reads = [r for r in reads if r.rating >= min_rating]
-        if year is not None:
-            reads = [r for r in reads if r.finished_at and r.finished_at.year == year]
-
-        reads.sort(key=lambda r: r.created_at, reverse=True)
-        return reads
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> Page[Read]:
+        """Newest reads first. Filters run in the document store on raw docs,
+        so only the reads on the returned page are turned into models."""
+        docs, next_cursor = self._storage.list_reads(
+            status=status, min_rating=min_rating, year=year, limit=limit, cursor=cursor
+        )
+        return Page[Read](items=[Read.from_doc(d) for d in docs], next_cursor=next_cursor)
 
     def get_read(self, read_id: str) -> Read | None:
         doc = self._storage.get_read_by_id(read_id)
         return Read.from_doc(doc) if doc else None
 
-    def _embed_review(self, read: Read) -> None:
-        if not self._settings.openai_api_key:
+    # ── Background enrichment ────────────────────────────────────────
+
+    def _enrichment_worker(self) -> EnrichmentWorker:
+        if self._worker is None:
+            self._worker = EnrichmentWorker(
+                self._storage.jobs,
+                {ISBN: self._enrich_isbn, EMBEDDING: self._enrich_embedding},
+                self._settings,
+            )
+        return self._worker
+
+    def start_enrichment(self) -> None:
+        """Drain the enrichment queue on a background thread until :meth:`stop_enrichment`."""
+        self._enrichment_worker().start()
+
+    def stop_enrichment(self) -> None:
+        if self._worker is not None:
+            self._worker.stop()
+
+    def run_enrichment(self, timeout: float | None = None, force: bool = False) -> int:
+        """Run queued enrichment jobs in the calling thread; returns how many ran.
+
+        ``force`` also runs jobs still waiting out a retry backoff.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        return self._enrichment_worker().run_pending(force=force, deadline=deadline)
+
+    def enrichment_status(self, read_id: str) -> dict[str, dict]:
+        """Per job kind: ``status`` (pending, running, done, failed), ``attempts``, ``last_error``."""
+        return self._storage.jobs.status_for(read_id)
+
+    def enrichment_counts(self) -> dict[str, int]:
+        return self._storage.jobs.counts()
+
+    def retry_failed_enrichment(self) -> int:
+        return self._storage.jobs.requeue_failed()
+
+    def _stored_read(self, read_id: str) -> dict:
+        """The read a job is for, as the store has it now.
+
+        Jobs can be queued by another process (a CLI ``log`` next to
+        ``shelfie web``), so a read that isn't found is an error the worker
+        retries, not a finished job.
+        """
+        doc = self._storage.get_read_by_id(read_id)
+        if doc is None:
+            raise LookupError(f"Read '{read_id}' not found.")
+        return doc
+
+    def _enrich_isbn(self, read_id: str) -> None:
+        doc = self._stored_read(read_id)
+        if doc.get("isbn"):
             return
+        # Strict: a lookup every provider failed raises, so the worker retries it.
+        isbn = resolve_isbn(
+            doc["title"],
+            doc["author"],
+            google_api_key=self._settings.google_books_api_key,
+            cache=get_response_cache(self._settings),
+            strict=True,
+        )
+        if isbn:
+            doc["isbn"] = isbn
+            self._storage.update_read(doc)
 
-        text = f"Book: {read.title} by {read.author}\nRating: {read.rating}/5\nReview: {read.review}"
-        embedding = openai_client.get_embedding(
-            text,
-            api_key=self._settings.openai_api_key,
-            model=self._settings.openai_embedding_model,
+    def _enrich_embedding(self, read_id: str) -> None:
+        doc = self._stored_read(read_id)
+        if not doc.get("review"):
+            return
+        if not self._embedder.available:
+            raise ValueError("No embedding provider is configured.")
+        self._embed_review(Read.from_doc(doc))
+
+    def book_metadata(self, reads: list[Read], refresh: bool = False) -> dict[str, BookSearchResult]:
+        """Provider metadata (pages, categories, description...) per read id, for reads with an ISBN.
+
+        Served from the local ISBN store; anything missing or stale is
+        fetched for the whole list in a few batched requests.
+        """
+        books = lookup_books(
+            [r.isbn for r in reads],
+            google_api_key=self._settings.google_books_api_key,
+            store=get_metadata_store(self._settings),
+            refresh=refresh,
         )
+        return {r.id: books[r.isbn] for r in reads if r.isbn in books}
+
+    def reindex(
+        self,
+        batch_size: int = 256,
+        concurrency: int = 4,
+        force: bool = False,
+        on_progress: Callable[[ReindexResult], None] | None = None,
+    ) -> ReindexResult:
+        """Embed every review whose vector is missing or stale.
+
+        A vector is stale when it was made with a different embedding model or
+        from different text. Batches are embedded ``concurrency`` at a time and
+        upserted as soon as each one returns, so an interrupted run picks up
+        where it left off the next time.
+        """
+        if not self._embedder.available:
+            raise ValueError(
+                "OPENAI_API_KEY is required to embed reviews (or set EMBEDDING_PROVIDER=local)."
+            )
+
+        result = ReindexResult()
+        reads = [Read.from_doc(d) for d in self._storage.get_all_reads()]
+        reads = [r for r in reads if r.review]
+        result.scanned = len(reads)
+
+        existing = {} if force else self._storage.get_review_metadata([r.id for r in reads])
+        model = self._embedder.model
+        stale: list[tuple[Read, str, dict]] = []
+        for read in reads:
+            text, metadata = self._review_document(read)
+            current = existing.get(read.id) or {}
+            if current.get("model") == model and current.get("text_hash") == metadata["text_hash"]:
+                continue
+            stale.append((read, text, metadata))
+        result.stale = len(stale)
+        if on_progress:
+            on_progress(result)
+
+        batches = [stale[i:i + batch_size] for i in range(0, len(stale), batch_size)]
+
+        def embed(batch: list[tuple[Read, str, dict]]) -> list[list[float]]:
+            return self._embedder.embed([text for _, text, _ in batch])
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            futures = {pool.submit(embed, batch): batch for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    embeddings = future.result()
+                except Exception:
+                    result.failed += len(batch)
+                else:
+                    self._storage.upsert_review_embeddings(
+                        read_ids=[read.id for read, _, _ in batch],
+                        review_texts=[text for _, text, _ in batch],
+                        embeddings=embeddings,
+                        metadatas=[metadata for _, _, metadata in batch],
+                    )
+                    result.embedded += len(batch)
+                if on_progress:
+                    on_progress(result)
+
+        return result
+
+    def import_csv(
+        self,
+        path: Path,
+        resolve_isbns: bool = True,
+        on_progress: Callable[[ImportResult], None] | None = None,
+    ) -> ImportResult:
+        """Import a Goodreads or StoryGraph CSV export.
+
+        The file is streamed in chunks of ``import_chunk_size`` rows. Each
+        chunk is deduped against the library (and earlier rows), has missing
+        ISBNs resolved ``import_isbn_concurrency`` at a time, is inserted in
+        one write and has its reviews embedded in batches. A checkpoint keyed
+        by the file's content is saved after every chunk, so running the
+        same file again after an interruption carries on where it stopped.
+        """
+        path = Path(path)
+        checkpoint = self._settings.import_checkpoint_dir / f"{file_digest(path)}.json"
+        result = ImportResult(**load_checkpoint(checkpoint).get("result", {}))
+        result.resumed_from = result.rows
+
+        known = {read_key(d["title"], d["author"]) for d in self._storage.get_all_reads()}
+        rows = iter_export(path)
+        deque(islice(rows, result.rows), maxlen=0)  # already committed
+        if on_progress:
+            on_progress(result)
+
+        with ThreadPoolExecutor(max_workers=max(1, self._settings.import_isbn_concurrency)) as pool:
+            while chunk := list(islice(rows, max(1, self._settings.import_chunk_size))):
+                reads: list[Read] = []
+                for read in chunk:
+                    if read is None:
+                        result.skipped += 1
+                        continue
+                    key = read_key(read.title, read.author)
+                    if key in known:
+                        result.duplicates += 1
+                        continue
+                    known.add(key)
+                    reads.append(read)
+
+                if resolve_isbns:
+                    result.isbns_resolved += self._resolve_isbns(pool, [r for r in reads if not r.isbn])
+                self._storage.insert_reads([r.to_doc() for r in reads])
+                result.imported += len(reads)
+
+                embedded, failed = self._embed_reviews([r for r in reads if r.review])
+                result.embedded += embedded
+                result.failed += failed
+
+                result.rows += len(chunk)
+                save_checkpoint(checkpoint, {"file": str(path), "result": asdict(result)})
+                if on_progress:
+                    on_progress(result)
+
+        checkpoint.unlink(missing_ok=True)
+        return result
+
+    def _resolve_isbns(self, pool: ThreadPoolExecutor, reads: list[Read]) -> int:
+        futures = {
+            pool.submit(
+                resolve_isbn,
+                read.title,
+                read.author,
+                google_api_key=self._settings.google_books_api_key,
+                cache=get_response_cache(self._settings),
+            ): read
+            for read in reads
+        }
+        resolved = 0
+        for future in as_completed(futures):
+            try:
+                isbn = future.result()
+            except Exception:
+                continue
+            if isbn:
+                futures[future].isbn = isbn
+                resolved += 1
+        return resolved
+
+    def _embed_reviews(self, reads: list[Read], batch_size: int = 256) -> tuple[int, int]:
+        """Embed and store review vectors in batches; returns (embedded, failed)."""
+        if not self._embedder.available:
+            return 0, 0
+        embedded = failed = 0
+        for i in range(0, len(reads), batch_size):
+            batch = [(read, *self._review_document(read)) for read in reads[i:i + batch_size]]
+            try:
+                embeddings = self._embedder.embed([text for _, text, _ in batch])
+            except Exception:
+                failed += len(batch)
+                continue
+            self._storage.upsert_review_embeddings(
+                read_ids=[read.id for read, _, _ in batch],
+                review_texts=[text for _, text, _ in batch],
+                embeddings=embeddings,
+                metadatas=[metadata for _, _, metadata in batch],
+            )
+            embedded += len(batch)
+        return embedded, failed
+
+    def _review_document(self, read: Read) -> tuple[str, dict]:
+        text = f"Book: {read.title} by {read.author}\nRating: {read.rating}/5\nReview: {read.review}"
         metadata = {
             "title": read.title,
             "author": read.author,
             "rating": read.rating,
             "status": read.status.value,
+            "model": self._embedder.model,
+            "text_hash": text_hash(text),
         }
+        return text, metadata
+
+    def _embed_review(self, read: Read) -> None:
+        if not self._embedder.available:
+            return
+
+        text, metadata = self._review_document(read)
+        embedding = self._embedder.embed([text])[0]
         self._storage.upsert_review_embedding(
             read_id=read.id,
             review_text=text,
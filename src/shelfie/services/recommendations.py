@@ -1,129 +1,243 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+
 from shelfie.apis import openai_client
+from shelfie.apis.embeddings import get_embedding_provider
 from shelfie.config import Settings
+from shelfie.services.context import ContextBuilder
+from shelfie.services.session_cache import SessionCache, cache_stats, history_version
 from shelfie.models import (
+    MAX_RECOMMENDATIONS_PER_CALL,
     BookRecommendation,
     Direction,
-    Read,
+    Page,
     RecommendationSession,
 )
 from shelfie.storage import Storage
-
-MAX_RETRIES = 1
+from shelfie.storage.base import normalize_title
 
 
 class RecommendationEngine:
     def __init__(self, storage: Storage, settings: Settings) -> None:
         self._storage = storage
         self._settings = settings
-
-    async def recommend(self, mood: str, direction: Direction) -> RecommendationSession:
+        self._embedder = get_embedding_provider(settings)
+        self._context = ContextBuilder(
+            token_budget=settings.context_token_budget,
+            review_chars=settings.context_review_chars,
+        )
+        self._cache = SessionCache(storage, settings) if settings.session_cache_enabled else None
+
+    async def recommend(
+        self, mood: str, direction: Direction, refresh: bool = False
+    ) -> RecommendationSession:
+        items = [item async for item in self._recommend(mood, direction, stream=False, refresh=refresh)]
+        return items[-1]
+
+    async def recommend_stream(
+        self, mood: str, direction: Direction, refresh: bool = False
+    ) -> AsyncIterator[BookRecommendation | RecommendationSession]:
+        """Like :meth:`recommend`, but yields each recommendation as soon as it
+        has validated and passed the blocklist, then the saved session."""
+        async with aclosing(self._recommend(mood, direction, stream=True, refresh=refresh)) as items:
+            async for item in items:
+                yield item
+
+    async def _recommend(
+        self, mood: str, direction: Direction, stream: bool, refresh: bool
+    ) -> AsyncIterator[BookRecommendation | RecommendationSession]:
         if not self._settings.openai_api_key:
             raise ValueError("OPENAI_API_KEY is required for recommendations.")
+        started = time.perf_counter()
+
+        # The three context stages are independent: the local ones run on worker
+        # threads while the mood is embedded, so the LLM call waits only for
+        # the slowest of them.
+        reading_history, (mood_embedding, semantic_context), blocklist = await asyncio.gather(
+            asyncio.to_thread(self._build_reading_history),
+            self._build_semantic_context(mood),
+            asyncio.to_thread(self._build_blocklist),
+        )
 
-        reading_history = self._build_reading_history()
-        semantic_context = self._build_semantic_context(mood)
-        blocklist = self._build_blocklist()
-
+        cache_status: str | None = None
+        version = ""
+        if self._cache is not None:
+            version = history_version(
+                reading_history, self._settings.openai_model, self._settings.recommendation_count
+            )
+            if refresh:
+                cache_status = "bypass"
+            else:
+                cache_status = "miss"
+                hit = None
+                if mood_embedding is not None:
+                    hit = await asyncio.to_thread(
+                        self._cache.lookup, mood_embedding, direction, version
+                    )
+                if hit is not None:
+                    for rec in hit.recommendations:
+                        yield rec
+                    session = RecommendationSession(
+                        mood=mood,
+                        direction=direction,
+                        recommendations=hit.recommendations,
+                        generation_ms=_elapsed_ms(started),
+                        cache_status="hit",
+                        cached_from=hit.session_id,
+                    )
+                    await asyncio.to_thread(self._storage.insert_session, session.to_doc())
+                    yield session
+                    return
+
+        # The first call asks for a few extra picks so that blocked ones can
+        # usually be dropped without another round trip. If it still falls
+        # short, each refill asks only for the missing count and names every
+        # title seen so far as off limits.
+        target = self._settings.recommendation_count
+        count = min(target + self._settings.recommendation_overgenerate, MAX_RECOMMENDATIONS_PER_CALL)
         filtered_recs: list[BookRecommendation] = []
-        for attempt in range(MAX_RETRIES + 1):
-            recs = await openai_client.generate_recommendations(
+        seen_titles: list[str] = []
+        round_trips = 0
+        usage = openai_client.PromptUsage()
+        while True:
+            round_trips += 1
+            recs = self._generate(
+                stream,
                 reading_history=reading_history,
                 semantic_context=semantic_context,
                 mood=mood,
                 direction=direction.value,
                 api_key=self._settings.openai_api_key,
                 model=self._settings.openai_model,
+                base_url=self._settings.openai_base_url,
+                count=count,
+                exclude=seen_titles,
+                usage=usage,
             )
 
-            for rec in recs:
-                if not self._is_blocked(rec, blocklist):
+            async with aclosing(recs):
+                async for rec in recs:
+                    seen_titles.append(rec.title)
+                    if self._is_blocked(rec, blocklist):
+                        continue
                     filtered_recs.append(rec)
-                    blocklist.add(self._normalize(rec.title))
+                    blocklist.add(normalize_title(rec.title))
+                    yield rec
+                    if len(filtered_recs) >= target:
+                        break
 
-            if len(filtered_recs) >= 5 or attempt == MAX_RETRIES:
+            missing = target - len(filtered_recs)
+            if missing <= 0 or round_trips > self._settings.recommendation_max_refills:
                 break
+            count = min(missing, MAX_RECOMMENDATIONS_PER_CALL)
 
         session = RecommendationSession(
             mood=mood,
             direction=direction,
-            recommendations=filtered_recs[:5],
+            recommendations=filtered_recs[:target],
+            llm_round_trips=round_trips,
+            prompt_tokens=usage.prompt_tokens,
+            cached_prompt_tokens=usage.cached_prompt_tokens,
+            generation_ms=_elapsed_ms(started),
+            cache_status=cache_status,
+        )
+        await asyncio.to_thread(self._storage.insert_session, session.to_doc())
+        if self._cache is not None and mood_embedding is not None:
+            await asyncio.to_thread(self._cache.store, session, mood_embedding, version)
+        yield session
+
+    @staticmethod
+    async def _generate(stream: bool, **kwargs) -> AsyncIterator[BookRecommendation]:
+        if stream:
+            async with aclosing(openai_client.stream_recommendations(**kwargs)) as recs:
+                async for rec in recs:
+                    yield rec
+        else:
+            for rec in await openai_client.generate_recommendations(**kwargs):
+                yield rec
+
+    def get_sessions(
+        self, limit: int | None = None, cursor: str | None = None
+    ) -> Page[RecommendationSession]:
+        docs, next_cursor = self._storage.list_sessions(limit=limit, cursor=cursor)
+        return Page[RecommendationSession](
+            items=[RecommendationSession.from_doc(d) for d in docs], next_cursor=next_cursor
         )
-        self._storage.insert_session(session.to_doc())
-        return session
 
-    def get_sessions(self) -> list[RecommendationSession]:
-        docs = self._storage.get_all_sessions()
-        sessions = [RecommendationSession.from_doc(d) for d in docs]
-        sessions.sort(key=lambda s: s.created_at, reverse=True)
-        return sessions
+    def session_cache_stats(self) -> dict:
+        return cache_stats(self.get_sessions().items)
 
-    def _build_reading_history(self) -> str:
-        docs = self._storage.get_all_reads()
-        reads = [Read.from_doc(d) for d in docs]
-        reads.sort(key=lambda r: r.created_at, reverse=True)
+    def clear_session_cache(self) -> None:
+        if self._cache is not None:
+            self._cache.clear()
 
-        recent = reads[:20]
-        if not recent:
-            return "No reading history yet."
+    def blocklist_size(self) -> int:
+        return len(self._storage.get_blocked_titles())
 
-        lines: list[str] = []
-        for r in recent:
-            line = f"- {r.title} by {r.author} | Rating: {r.rating}/5 | Status: {r.status.value}"
-            if r.review:
-                preview = r.review[:150] + ("..." if len(r.review) > 150 else "")
-                line += f'\n  Review: "{preview}"'
-            lines.append(line)
-        return "\n".join(lines)
-
-    def _build_semantic_context(self, mood: str) -> str:
-        """Query ChromaDB for reviews semantically related to the current mood."""
+    def rebuild_blocklist(self) -> int:
+        """Recompute the persisted blocklist from every read and session."""
+        return self._storage.rebuild_blocked_titles()
+
+    def _build_reading_history(self) -> str:
+        return self._context.reading_history(self._storage.get_all_reads())
+
+    async def _build_semantic_context(self, mood: str) -> tuple[list[float] | None, str]:
+        """Embed the mood and query the vector store for reviews related to it.
+
+        Returns the mood embedding too, for the session cache. The embed call
+        and the query are each bounded by ``semantic_context_timeout``: a slow
+        or failing one drops the semantic context rather than holding up the
+        LLM call. Opening the vector store (a cold chromadb import) runs
+        alongside the embed call and isn't counted against the timeout.
+        """
+        timeout = self._settings.semantic_context_timeout
+        opening = asyncio.ensure_future(asyncio.to_thread(self._storage.open_review_store))
+        opening.add_done_callback(lambda t: t.cancelled() or t.exception())
         try:
-            mood_embedding = openai_client.get_embedding(
-                mood,
-                api_key=self._settings.openai_api_key,
-                model=self._settings.openai_embedding_model,
+            mood_embedding = (await asyncio.wait_for(self._embedder.aembed([mood]), timeout))[0]
+        except Exception:
+            return None, "No semantic context available."
+        try:
+            await opening
+            results = await asyncio.wait_for(
+                asyncio.to_thread(
+                    self._storage.query_similar_reviews,
+                    query_embedding=mood_embedding,
+                    n_results=5,
+                ),
+                timeout,
             )
         except Exception:
-            return "No semantic context available."
-
-        results = self._storage.query_similar_reviews(
-            query_embedding=mood_embedding,
-            n_results=5,
-        )
+            return mood_embedding, "No semantic context available."
 
         documents = results.get("documents", [[]])[0]
         metadatas = results.get("metadatas", [[]])[0]
 
         if not documents:
-            return "No relevant past reviews found."
+            return mood_embedding, "No relevant past reviews found."
 
         lines: list[str] = []
         for doc, meta in zip(documents, metadatas):
             title = meta.get("title", "Unknown") if meta else "Unknown"
             rating = meta.get("rating", "?") if meta else "?"
             lines.append(f"[{title}, rated {rating}/5]\n{doc}")
-        return "\n\n".join(lines)
+        return mood_embedding, "\n\n".join(lines)
 
     def _build_blocklist(self) -> set[str]:
-        """Build a set of normalized titles from all reads + past recommendations."""
-        blocked: set[str] = set()
+        """Normalized titles of all reads + past recommendations.
 
-        for doc in self._storage.get_all_reads():
-            read = Read.from_doc(doc)
-            blocked.add(self._normalize(read.title))
+        The document store maintains this set as reads and sessions are
+        inserted, so nothing is re-parsed here.
+        """
+        return self._storage.get_blocked_titles()
 
-        for doc in self._storage.get_all_sessions():
-            session = RecommendationSession.from_doc(doc)
-            for rec in session.recommendations:
-                blocked.add(self._normalize(rec.title))
+    def _is_blocked(self, rec: BookRecommendation, blocklist: set[str]) -> bool:
+        return normalize_title(rec.title) in blocklist
 
-        return blocked
 
-    @staticmethod
-    def _normalize(title: str) -> str:
-        return title.lower().strip()
-
-    def _is_blocked(self, rec: BookRecommendation, blocklist: set[str]) -> bool:
-        return self._normalize(rec.title) in blocklist
+def _elapsed_ms(started: float) -> int:
+    return round((time.perf_counter() - started) * 1000)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+
+from shelfie.apis.cache import text_hash
+from shelfie.config import Settings
+from shelfie.models import BookRecommendation, Direction, RecommendationSession
+from shelfie.storage import Storage
+
+# How many near neighbours to inspect; the closest one may be for another
+# direction or an older library, and a more recent one should win anyway.
+_CANDIDATES = 5
+
+
+def history_version(reading_history: str, model: str, count: int) -> str:
+    """Fingerprint of everything besides the mood that shapes a session's picks."""
+    return text_hash(f"{model}\n{count}\n{reading_history}")
+
+
+@dataclass
+class CacheHit:
+    session_id: str
+    recommendations: list[BookRecommendation]
+    similarity: float
+    generation_ms: int
+
+
+class SessionCache:
+    """Reuses a past session whose mood means nearly the same thing.
+
+    Each generated session's mood vector is stored in its own vector
+    collection with the direction, a :func:`history_version` and the time
+    it took to generate. A lookup is a hit when a stored mood is within
+    ``session_cache_threshold`` cosine similarity, the direction matches,
+    the reading history is unchanged and the entry is younger than
+    ``session_cache_ttl_seconds``.
+    """
+
+    def __init__(self, storage: Storage, settings: Settings) -> None:
+        self._storage = storage
+        self._threshold = settings.session_cache_threshold
+        self._ttl = settings.session_cache_ttl_seconds
+
+    def lookup(
+        self, embedding: list[float], direction: Direction, version: str
+    ) -> CacheHit | None:
+        results = self._storage.query_similar_sessions(embedding, n_results=_CANDIDATES)
+        now = time.time()
+        best: tuple[float, CacheHit] | None = None
+        for session_id, document, meta, distance in zip(
+            results["ids"][0],
+            results["documents"][0],
+            results["metadatas"][0],
+            results["distances"][0],
+        ):
+            meta = meta or {}
+            similarity = 1.0 - distance
+            created_at = float(meta.get("created_at", 0))
+            if (
+                similarity < self._threshold
+                or meta.get("direction") != direction.value
+                or meta.get("history_version") != version
+                or now - created_at > self._ttl
+            ):
+                continue
+            # Among qualifying entries the newest wins, so a refreshed session
+            # replaces the one it was refreshed from.
+            if best is None or created_at > best[0]:
+                recs = [BookRecommendation.model_validate(r) for r in json.loads(document)]
+                hit = CacheHit(session_id, recs, similarity, int(meta.get("generation_ms", 0)))
+                best = (created_at, hit)
+        return best[1] if best else None
+
+    def store(
+        self,
+        session: RecommendationSession,
+        embedding: list[float],
+        version: str,
+    ) -> None:
+        document = json.dumps([r.model_dump(mode="json") for r in session.recommendations])
+        self._storage.upsert_session_embedding(
+            session.id,
+            document,
+            embedding,
+            {
+                "direction": session.direction.value,
+                "history_version": version,
+                "created_at": session.created_at.timestamp(),
+                "generation_ms": session.generation_ms,
+            },
+        )
+
+
+    def clear(self) -> None:
+        """Forget every stored mood; the sessions themselves stay in the history."""
+        self._storage.clear_session_embeddings()
+
+
+def cache_stats(sessions: list[RecommendationSession]) -> dict:
+    """Hit rate and latency saved, derived from the saved sessions themselves."""
+    generated_ms = {s.id: s.generation_ms for s in sessions}
+    hits = [s for s in sessions if s.cache_status == "hit"]
+    misses = sum(1 for s in sessions if s.cache_status == "miss")
+    bypassed = sum(1 for s in sessions if s.cache_status == "bypass")
+    saved_ms = sum(
+        max(generated_ms.get(s.cached_from or "", 0) - s.generation_ms, 0) for s in hits
+    )
+    lookups = len(hits) + misses
+    return {
+        "hits": len(hits),
+        "misses": misses,
+        "bypassed": bypassed,
+        "hit_rate": len(hits) / lookups if lookups else 0.0,
+        "saved_ms": saved_ms,
+    }
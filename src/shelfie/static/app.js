@@ -3,11 +3,18 @@
 const API = {
   search:    (q) => fetch(`/api/search?q=${encodeURIComponent(q)}`).then(r => r.json()),
   logRead:   (d) => fetch('/api/reads', { method: 'POST', headers: {'Content-Type':'application/json'}, body: JSON.stringify(d) }).then(r => { if (!r.ok) return r.json().then(e => Promise.reject(e)); return r.json(); }),
-  listReads: (p) => { const u = new URL('/api/reads', location.origin); Object.entries(p || {}).forEach(([k, v]) => { if (v) u.searchParams.set(k, v); }); return fetch(u).then(r => r.json()); },
+  listReads: (p) => fetchPage('/api/reads', p),
   recommend: (d) => fetch('/api/recommend', { method: 'POST', headers: {'Content-Type':'application/json'}, body: JSON.stringify(d) }).then(r => { if (!r.ok) return r.json().then(e => Promise.reject(e)); return r.json(); }),
-  sessions:  ()  => fetch('/api/sessions').then(r => r.json()),
+  sessions:  (p) => fetchPage('/api/sessions', p),
 };
 
+// Listings come back a page at a time; X-Next-Cursor fetches the one after.
+function fetchPage(path, params) {
+  const u = new URL(path, location.origin);
+  Object.entries(params || {}).forEach(([k, v]) => { if (v) u.searchParams.set(k, v); });
+  return fetch(u).then(r => r.json().then(items => ({ items, next: r.headers.get('X-Next-Cursor') })));
+}
+
 /* ── Tab Navigation ──────────────────────────────────────────── */
 
 const tabBtns = document.querySelectorAll('.tab-btn');
@@ -88,13 +95,27 @@ function formatDate(iso) {
 const shelfGrid  = document.getElementById('bookshelf-grid');
 const shelfEmpty = document.getElementById('bookshelf-empty');
 
-async function loadBookshelf() {
+const shelfMore  = document.getElementById('bookshelf-more');
+let shelfCursor  = null;
+let shelfLoad    = 0;
+
+// The page comes straight from the store; provider metadata (pages,
+// categories) can mean live lookups, so it's fetched afterwards and filled in.
+async function loadBookshelf(more = false) {
   const status = document.getElementById('filter-status').value;
   const rating = document.getElementById('filter-rating').value;
-  const reads  = await API.listReads({ status, min_rating: rating });
-
-  shelfGrid.innerHTML = '';
-  shelfEmpty.classList.toggle('hidden', reads.length > 0);
+  const params = { status, min_rating: rating, cursor: more ? shelfCursor : null };
+  const load   = more ? shelfLoad : ++shelfLoad;
+  const page   = await API.listReads(params);
+  if (load !== shelfLoad) return;
+  const reads  = page.items;
+  shelfCursor  = page.next;
+  shelfMore.classList.toggle('hidden', !shelfCursor);
+
+  if (!more) {
+    shelfGrid.innerHTML = '';
+    shelfEmpty.classList.toggle('hidden', reads.length > 0);
+  }
 
   reads.forEach(r => {
     const card = document.createElement('div');
@@ -108,15 +129,40 @@ async function loadBookshelf() {
         ${starsHtml(r.rating)}
         ${statusPill(r.status)}
       </div>
+      <div class="hidden" data-book="${esc(r.id)}"></div>
       ${r.review ? `<p class="text-[13px] text-gray-400 line-clamp-2 leading-relaxed">${esc(r.review)}</p>` : ''}
       ${r.finished_at ? `<p class="text-xs text-gray-500">${formatDate(r.finished_at)}</p>` : ''}
     `;
     shelfGrid.appendChild(card);
   });
+
+  if (reads.some(r => r.isbn)) fillBookMeta(params, load);
+}
+
+async function fillBookMeta(params, load) {
+  let page;
+  try {
+    page = await API.listReads({ ...params, metadata: 'true' });
+  } catch { return; }
+  if (load !== shelfLoad) return;
+  page.items.forEach(r => {
+    const slot = shelfGrid.querySelector(`[data-book="${CSS.escape(r.id)}"]`);
+    if (slot) slot.outerHTML = bookMeta(r.book);
+  });
 }
 
-document.getElementById('filter-status').addEventListener('change', loadBookshelf);
-document.getElementById('filter-rating').addEventListener('change', loadBookshelf);
+// Pages and top categories from the stored provider metadata, when there is any.
+function bookMeta(book) {
+  if (!book) return '';
+  const parts = [];
+  if (book.page_count) parts.push(`${book.page_count} pages`);
+  if (book.categories && book.categories.length) parts.push(book.categories.slice(0, 2).join(', '));
+  return parts.length ? `<p class="text-xs text-gray-500">${esc(parts.join(' · '))}</p>` : '';
+}
+
+document.getElementById('filter-status').addEventListener('change', () => loadBookshelf());
+document.getElementById('filter-rating').addEventListener('change', () => loadBookshelf());
+shelfMore.addEventListener('click', () => loadBookshelf(true));
 
 /* ── Log ─────────────────────────────────────────────────────── */
 
@@ -303,43 +349,53 @@ document.getElementById('rec-submit').addEventListener('click', async () => {
   recLoading.classList.remove('hidden');
   recResults.classList.add('hidden');
 
+  let count = 0;
   try {
-    const session = await API.recommend({ mood, direction });
-    renderRecs(session);
-    recLoading.classList.add('hidden');
-    recResults.classList.remove('hidden');
+    const session = await streamRecommend({ mood, direction }, (rec) => {
+      if (count === 0) {
+        renderRecsHeader();
+        recLoading.classList.add('hidden');
+        recResults.classList.remove('hidden');
+      }
+      appendRecCard(rec, count++);
+      setRecCount(count);
+    });
+    if (count === 0) {
+      renderRecsHeader();
+      recLoading.classList.add('hidden');
+      recResults.classList.remove('hidden');
+    }
+    setRecCount(session.recommendations.length);
   } catch (err) {
     recLoading.classList.add('hidden');
-    recForm.classList.remove('hidden');
+    if (count === 0) recForm.classList.remove('hidden');
     alert(err.detail || 'Failed to get recommendations.');
   }
 });
 
-function renderRecs(session) {
+// Recommendations arrive over server-sent events, one card at a time;
+// resolves with the saved session once the stream is done.
+function streamRecommend({ mood, direction }, onRec) {
+  const params = new URLSearchParams({ mood, direction });
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`/api/recommend/stream?${params}`);
+    source.addEventListener('recommendation', (e) => onRec(JSON.parse(e.data)));
+    source.addEventListener('session', (e) => { source.close(); resolve(JSON.parse(e.data)); });
+    source.addEventListener('error', (e) => {
+      source.close();
+      reject(e.data ? JSON.parse(e.data) : { detail: 'Lost connection while streaming recommendations.' });
+    });
+  });
+}
+
+function renderRecsHeader() {
   recResults.innerHTML = `
     <div class="flex items-center justify-between mb-4">
-      <p class="text-sm text-gray-400">${session.recommendations.length} recommendations</p>
+      <p class="text-sm text-gray-400" id="rec-count">0 recommendations</p>
       <button class="btn-secondary text-xs" id="rec-new-btn">New request</button>
     </div>
   `;
 
-  session.recommendations.forEach((rec, i) => {
-    const badge = matchBadge(rec.match_type);
-    const card = document.createElement('div');
-    card.className = 'card';
-    card.innerHTML = `
-      <div class="flex items-start gap-3">
-        <span class="text-brand-400 font-bold text-sm mt-0.5 shrink-0">#${i + 1}</span>
-        <div class="min-w-0">
-          <p class="font-semibold text-white">${esc(rec.title)} <span class="font-normal text-gray-400">by ${esc(rec.author)}</span></p>
-          <p class="text-[13px] text-gray-400 mt-1.5 leading-relaxed">${esc(rec.reason)}</p>
-          <span class="badge ${badge.cls} mt-2 inline-block">${badge.label}</span>
-        </div>
-      </div>
-    `;
-    recResults.appendChild(card);
-  });
-
   document.getElementById('rec-new-btn').addEventListener('click', () => {
     recResults.classList.add('hidden');
     recForm.classList.remove('hidden');
@@ -347,6 +403,27 @@ function renderRecs(session) {
   });
 }
 
+function setRecCount(n) {
+  document.getElementById('rec-count').textContent = `${n} recommendation${n === 1 ? '' : 's'}`;
+}
+
+function appendRecCard(rec, i) {
+  const badge = matchBadge(rec.match_type);
+  const card = document.createElement('div');
+  card.className = 'card';
+  card.innerHTML = `
+    <div class="flex items-start gap-3">
+      <span class="text-brand-400 font-bold text-sm mt-0.5 shrink-0">#${i + 1}</span>
+      <div class="min-w-0">
+        <p class="font-semibold text-white">${esc(rec.title)} <span class="font-normal text-gray-400">by ${esc(rec.author)}</span></p>
+        <p class="text-[13px] text-gray-400 mt-1.5 leading-relaxed">${esc(rec.reason)}</p>
+        <span class="badge ${badge.cls} mt-2 inline-block">${badge.label}</span>
+      </div>
+    </div>
+  `;
+  recResults.appendChild(card);
+}
+
 function matchBadge(type) {
   const map = {
     'safe bet':     { cls: 'badge-safe',    label: 'safe bet' },
@@ -356,14 +433,22 @@ function matchBadge(type) {
   return map[type] || { cls: 'badge-safe', label: type };
 }
 
-async function loadRecHistory() {
+const recHistoryMore = document.getElementById('rec-history-more');
+let recHistoryCursor = null;
+
+async function loadRecHistory(more = false) {
   const container = document.getElementById('rec-history');
   const emptyMsg  = document.getElementById('rec-history-empty');
 
   try {
-    const sessions = await API.sessions();
-    container.innerHTML = '';
-    emptyMsg.classList.toggle('hidden', sessions.length > 0);
+    const page = await API.sessions({ cursor: more ? recHistoryCursor : null });
+    const sessions = page.items;
+    recHistoryCursor = page.next;
+    recHistoryMore.classList.toggle('hidden', !recHistoryCursor);
+    if (!more) {
+      container.innerHTML = '';
+      emptyMsg.classList.toggle('hidden', sessions.length > 0);
+    }
 
     sessions.forEach(session => {
       const el = document.createElement('div');
@@ -391,6 +476,8 @@ async function loadRecHistory() {
   }
 }
 
+recHistoryMore.addEventListener('click', () => loadRecHistory(true));
+
 attachVoice(document.getElementById('mood-mic'), document.getElementById('rec-mood'), { continuous: true });
 
 /* ── Boot ────────────────────────────────────────────────────── */
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+from shelfie.config import Settings
+from shelfie.storage.base import DocumentStore
+
+if TYPE_CHECKING:
+    from shelfie.storage.jobs import JobQueue
+    from shelfie.storage.vectors import VectorStore
+
+
+def open_document_store(settings: Settings) -> DocumentStore:
+    """Open the document store selected by ``settings.storage_backend``."""
+    # Backends are imported on demand, so TinyDB users never load sqlite3.
+    if settings.storage_backend == "sqlite":
+        from shelfie.storage.sqlite_backend import SQLiteDocumentStore
+
+        store = SQLiteDocumentStore(settings.sqlite_path)
+        store.migrate_from_tinydb(settings.tinydb_path)
+        return store
+    from shelfie.storage.tinydb_backend import TinyDBDocumentStore
+
+    return TinyDBDocumentStore(
+        settings.tinydb_path,
+        journal=settings.tinydb_journal,
+        compact_bytes=settings.tinydb_journal_compact_bytes,
+    )
+
+
+def open_vector_store(settings: Settings, name: str) -> VectorStore:
+    """Open the vector collection ``name`` on the backend selected by ``settings.vector_backend``."""
+    from shelfie.storage.vectors import ChromaVectorStore, NumpyVectorStore
+
+    if settings.vector_backend == "numpy":
+        return NumpyVectorStore(settings.numpy_vectors_path / name)
+    return ChromaVectorStore(settings.chroma_path, name)
+
+
+class Storage:
+    """Manages both the document store (reads, sessions) and the vector store (embeddings)."""
+
+    def __init__(self, settings: Settings) -> None:
+        settings.ensure_data_dir()
+        self._settings = settings
+
+        self._docs = open_document_store(settings)
+
+        # Opened on first use: listing or showing reads never touches vectors.
+        self._vector_stores: dict[str, VectorStore] = {}
+        self._vectors_lock = threading.Lock()
+        self._jobs: JobQueue | None = None
+
+    def _collection(self, name: str) -> VectorStore:
+        with self._vectors_lock:
+            store = self._vector_stores.get(name)
+            if store is None:
+                store = open_vector_store(self._settings, name)
+                self._vector_stores[name] = store
+            return store
+
+    @property
+    def jobs(self) -> JobQueue:
+        """The background enrichment queue, opened on first use."""
+        from shelfie.storage.jobs import JobQueue
+
+        with self._vectors_lock:
+            if self._jobs is None:
+                self._jobs = JobQueue(self._settings.jobs_path)
+            return self._jobs
+
+    @property
+    def _reviews(self) -> VectorStore:
+        return self._collection(self._settings.reviews_collection)
+
+    @property
+    def _sessions(self) -> VectorStore:
+        return self._collection(self._settings.sessions_collection)
+
+    def insert_read(self, doc: dict) -> None:
+        self._docs.insert_read(doc)
+
+    def insert_reads(self, docs: list[dict]) -> None:
+        self._docs.insert_reads(docs)
+
+    def get_all_reads(self) -> list[dict]:
+        return self._docs.get_all_reads()
+
+    def get_read_by_id(self, read_id: str) -> dict | None:
+        return self._docs.get_read_by_id(read_id)
+
+    def read_exists(self, title: str, author: str) -> bool:
+        return self._docs.read_exists(title, author)
+
+    def update_read(self, doc: dict) -> None:
+        self._docs.update_read(doc)
+
+    def list_reads(
+        self,
+        status: str | None = None,
+        min_rating: int | None = None,
+        year: int | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        return self._docs.list_reads(status, min_rating, year, limit, cursor)
+
+    def insert_session(self, doc: dict) -> None:
+        self._docs.insert_session(doc)
+
+    def insert_sessions(self, docs: list[dict]) -> None:
+        self._docs.insert_sessions(docs)
+
+    def get_all_sessions(self) -> list[dict]:
+        return self._docs.get_all_sessions()
+
+    def list_sessions(
+        self, limit: int | None = None, cursor: str | None = None
+    ) -> tuple[list[dict], str | None]:
+        return self._docs.list_sessions(limit, cursor)
+
+    def iter_reads(self, batch_size: int = 500) -> Iterator[dict]:
+        """Every read, newest first, fetched a page at a time."""
+        return _iter_pages(self._docs.list_reads, batch_size)
+
+    def iter_sessions(self, batch_size: int = 500) -> Iterator[dict]:
+        return _iter_pages(self._docs.list_sessions, batch_size)
+
+    def get_blocked_titles(self) -> set[str]:
+        return self._docs.get_blocked_titles()
+
+    def rebuild_blocked_titles(self) -> int:
+        return self._docs.rebuild_blocked_titles()
+
+    def close(self) -> None:
+        """Flush and close the document and vector stores and the job queue."""
+        self._docs.close()
+        with self._vectors_lock:
+            if self._jobs is not None:
+                self._jobs.close()
+                self._jobs = None
+            for store in self._vector_stores.values():
+                store.close()
+            self._vector_stores.clear()
+
+    def upsert_review_embedding(
+        self,
+        read_id: str,
+        review_text: str,
+        embedding: list[float],
+        metadata: dict,
+    ) -> None:
+        self._reviews.upsert(
+            ids=[read_id],
+            documents=[review_text],
+            embeddings=[embedding],
+            metadatas=[metadata],
+        )
+
+    def upsert_review_embeddings(
+        self,
+        read_ids: list[str],
+        review_texts: list[str],
+        embeddings: list[list[float]],
+        metadatas: list[dict],
+    ) -> None:
+        if not read_ids:
+            return
+        self._reviews.upsert(
+            ids=read_ids,
+            documents=review_texts,
+            embeddings=embeddings,
+            metadatas=metadatas,
+        )
+
+    def review_embedding_count(self) -> int:
+        return self._reviews.count()
+
+    def iter_review_embeddings(self, batch_size: int = 500) -> Iterator[dict]:
+        return self._reviews.iter_batches(batch_size)
+
+    def get_review_metadata(self, read_ids: list[str]) -> dict[str, dict]:
+        """Return the stored metadata for each read that has an embedding."""
+        return self._reviews.get_metadata(read_ids)
+
+    def open_review_store(self) -> None:
+        """Open the review collection now rather than on its first use.
+
+        The first open imports the backend (chromadb takes most of a second)
+        and loads the collection from disk.
+        """
+        self._collection(self._settings.reviews_collection)
+
+    def query_similar_reviews(
+        self,
+        query_embedding: list[float],
+        n_results: int = 5,
+    ) -> dict:
+        return self._reviews.query(query_embedding, n_results=n_results)
+
+    def upsert_session_embedding(
+        self,
+        session_id: str,
+        document: str,
+        embedding: list[float],
+        metadata: dict,
+    ) -> None:
+        self._sessions.upsert(
+            ids=[session_id],
+            documents=[document],
+            embeddings=[embedding],
+            metadatas=[metadata],
+        )
+
+    def query_similar_sessions(
+        self,
+        query_embedding: list[float],
+        n_results: int = 5,
+    ) -> dict:
+        return self._sessions.query(query_embedding, n_results=n_results)
+
+    def clear_session_embeddings(self) -> None:
+        self._sessions.clear()
+
+
+def _iter_pages(list_page, batch_size: int) -> Iterator[dict]:
+    cursor = None
+    while True:
+        docs, cursor = list_page(limit=batch_size, cursor=cursor)
+        yield from docs
+        if cursor is None:
+            return
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import base64
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+
+
+def read_key(title: str, author: str) -> str:
+    """Normalized title + author used for duplicate detection."""
+    return f"{title.strip().lower()}\x1f{author.strip().lower()}"
+
+
+def normalize_title(title: str) -> str:
+    """Normalized title used by the recommendation blocklist."""
+    return title.strip().lower()
+
+
+def blocked_titles_of(doc: dict) -> set[str]:
+    """Normalized titles a read or session doc adds to the blocklist."""
+    if "recommendations" in doc:
+        return {normalize_title(rec["title"]) for rec in doc["recommendations"]}
+    return {normalize_title(doc["title"])}
+
+
+def read_matches(
+    doc: dict,
+    status: str | None = None,
+    min_rating: int | None = None,
+    year: int | None = None,
+) -> bool:
+    """Apply the listing filters to a raw read doc, before any model is built."""
+    if status and doc.get("status") != status:
+        return False
+    if min_rating is not None and doc.get("rating", 0) < min_rating:
+        return False
+    if year is not None and not (doc.get("finished_at") or "").startswith(f"{year:04d}-"):
+        return False
+    return True
+
+
+# ── Cursors ──────────────────────────────────────────────────────────
+# Listings run newest first, ordered by (created_at, id). A cursor is the
+# key of the last doc on the previous page; the next page starts just
+# below it, so pages stay stable while new docs are inserted.
+
+
+def encode_cursor(doc: dict) -> str:
+    key = f"{doc['created_at']}\x1f{doc['id']}"
+    return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        created_at, doc_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("\x1f")
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from None
+    return created_at, doc_id
+
+
+def take_page(
+    docs_newest_first: Iterable[dict],
+    limit: int | None,
+    match: Callable[[dict], bool] = lambda doc: True,
+) -> tuple[list[dict], str | None]:
+    """Collect up to ``limit`` matching docs; a full page also returns the next cursor."""
+    page: list[dict] = []
+    for doc in docs_newest_first:
+        if not match(doc):
+            continue
+        page.append(doc)
+        if limit is not None and len(page) >= limit:
+            return page, encode_cursor(doc)
+    return page, None
+
+
+class DocumentStore(ABC):
+    """Persistence for reads and recommendation sessions, as plain dicts."""
+
+    @abstractmethod
+    def insert_read(self, doc: dict) -> None: ...
+
+    @abstractmethod
+    def insert_reads(self, docs: list[dict]) -> None:
+        """Insert many reads in one write (one transaction, one journal append)."""
+
+    @abstractmethod
+    def get_all_reads(self) -> list[dict]: ...
+
+    @abstractmethod
+    def get_read_by_id(self, read_id: str) -> dict | None: ...
+
+    @abstractmethod
+    def read_exists(self, title: str, author: str) -> bool: ...
+
+    @abstractmethod
+    def update_read(self, doc: dict) -> None:
+        """Replace the stored read with the same id (used by background enrichment)."""
+
+    @abstractmethod
+    def list_reads(
+        self,
+        status: str | None = None,
+        min_rating: int | None = None,
+        year: int | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """Reads newest first, filtered, one page at a time.
+
+        Returns the page and the cursor for the next one (``None`` once the
+        listing is exhausted). The cost depends on the page, not the library.
+        """
+
+    @abstractmethod
+    def insert_session(self, doc: dict) -> None: ...
+
+    @abstractmethod
+    def insert_sessions(self, docs: list[dict]) -> None:
+        """Insert many sessions in one write; see :meth:`insert_reads`."""
+
+    @abstractmethod
+    def get_all_sessions(self) -> list[dict]: ...
+
+    @abstractmethod
+    def list_sessions(
+        self, limit: int | None = None, cursor: str | None = None
+    ) -> tuple[list[dict], str | None]:
+        """Sessions newest first, one page at a time; see :meth:`list_reads`."""
+
+    @abstractmethod
+    def get_blocked_titles(self) -> set[str]:
+        """Normalized titles of every read and every past recommendation.
+
+        Kept up to date by ``insert_read`` and ``insert_session``.
+        """
+
+    @abstractmethod
+    def rebuild_blocked_titles(self) -> int:
+        """Recompute the blocklist from all reads and sessions; returns its size."""
+
+    @abstractmethod
+    def close(self) -> None: ...
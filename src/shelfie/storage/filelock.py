@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: threads in this process are still serialized
+    fcntl = None
+
+
+class FileLock:
+    """An exclusive lock shared by the threads of this process and by other processes.
+
+    Across processes it's an ``flock`` on ``path``, so the web server and a
+    CLI command writing the same data files take turns, and a lock held by
+    a process that dies is released with it. Reentrant within a thread.
+    Without ``fcntl`` (Windows) only threads are serialized.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = Path(path)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd: int | None = None
+
+    def __enter__(self) -> FileLock:
+        self._lock.acquire()
+        try:
+            if self._depth == 0 and fcntl is not None:
+                if self._fd is None:
+                    self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+        except BaseException:
+            self._lock.release()
+            raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._lock.release()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+def try_lock(path: Path) -> int | None:
+    """Take an exclusive ``flock`` on ``path`` without waiting.
+
+    Returns the descriptor holding it (``os.close`` it to let go), or
+    ``None`` if another process has it.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    if fcntl is None:
+        return fd
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    read_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    last_error TEXT,
+    UNIQUE (read_id, kind)
+);
+CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, run_at);
+"""
+
+# A job left "running" this long belongs to a process that died mid-job.
+_LEASE_SECONDS = 300
+
+
+@dataclass
+class Job:
+    id: int
+    read_id: str
+    kind: str
+    attempts: int
+
+
+class JobQueue:
+    """Durable per-read enrichment jobs in SQLite (WAL mode).
+
+    One row per (read, kind), moving pending → running → done, or back to
+    pending with a later ``run_at`` after a failure, or to failed once the
+    attempts run out. Claiming is a single ``BEGIN IMMEDIATE`` transaction,
+    so the web server and a CLI process can drain the same file safely.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+
+    def enqueue(self, read_id: str, kinds: list[str]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO jobs (read_id, kind, status, attempts, run_at, updated_at)"
+                " VALUES (?, ?, 'pending', 0, ?, ?)"
+                " ON CONFLICT (read_id, kind) DO UPDATE SET"
+                " status = 'pending', attempts = 0, run_at = excluded.run_at,"
+                " updated_at = excluded.updated_at, last_error = NULL",
+                [(read_id, kind, now, now) for kind in kinds],
+            )
+
+    def claim(self, waiting_since: float | None = None) -> Job | None:
+        """Take the next due job and mark it running.
+
+        With ``waiting_since`` (a ``time.time()`` value), jobs still backing
+        off from a failure before then count as due too.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, read_id, kind, attempts FROM jobs"
+                    " WHERE (status = 'pending' AND (run_at <= ? OR updated_at < ?))"
+                    " OR (status = 'running' AND updated_at < ?)"
+                    " ORDER BY run_at LIMIT 1",
+                    (now, waiting_since or 0.0, now - _LEASE_SECONDS),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ?"
+                        " WHERE id = ?",
+                        (now, row[0]),
+                    )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        if row is None:
+            return None
+        return Job(id=row[0], read_id=row[1], kind=row[2], attempts=row[3] + 1)
+
+    def requeue_failed(self) -> int:
+        """Give every failed job a fresh set of attempts; returns how many."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'pending', attempts = 0, run_at = ?, updated_at = ?, last_error = NULL"
+                " WHERE status = 'failed'",
+                (now, now),
+            )
+        return cursor.rowcount
+
+    def complete(self, job: Job) -> None:
+        self._set(job, "done", time.time(), None)
+
+    def retry(self, job: Job, error: str, delay: float) -> None:
+        self._set(job, "pending", time.time() + delay, error)
+
+    def fail(self, job: Job, error: str) -> None:
+        self._set(job, "failed", time.time(), error)
+
+    def _set(self, job: Job, status: str, run_at: float, error: str | None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, run_at = ?, updated_at = ?, last_error = ? WHERE id = ?",
+                (status, run_at, time.time(), error, job.id),
+            )
+
+    def seconds_until_due(self) -> float | None:
+        """How long until the next pending job is due; ``None`` if nothing is pending."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(run_at) FROM jobs WHERE status = 'pending'"
+            ).fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def status_for(self, read_id: str) -> dict[str, dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, status, attempts, last_error FROM jobs WHERE read_id = ?", (read_id,)
+            ).fetchall()
+        return {
+            kind: {"status": status, "attempts": attempts, "last_error": last_error}
+            for kind, status, attempts, last_error in rows
+        }
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from tinydb.storages import Storage as TinyDBStorage
+
+from shelfie.storage.filelock import FileLock, try_lock
+
+
+class JournalStorage(TinyDBStorage):
+    """TinyDB storage that appends mutations to a journal instead of rewriting the file.
+
+    State lives in memory. :meth:`commit` appends a list of ops (one JSON
+    line per call, fsynced) to ``<path>.journal`` and applies them, so a
+    write costs the size of the record, not of the library. Once the journal
+    passes ``compact_bytes`` it is rotated to ``<path>.journal.compacting``
+    and a fresh snapshot is written to ``<path>`` in the background;
+    :meth:`close` compacts whatever is left. The snapshot uses TinyDB's
+    plain JSON layout, so after a clean close the file is complete for the
+    default ``JSONStorage``. A journal left by a crash is folded in by
+    :func:`fold_journal`.
+
+    Several processes (``shelfie web`` next to CLI commands) may share the
+    files. Appends and the swap to a new snapshot happen under ``lock``, a
+    :class:`FileLock` on ``<path>.lock``, and each append first replays
+    whatever other processes wrote since this one last looked, so doc ids
+    stay unique and no one's write is lost. One process compacts at a time.
+
+    TinyDB's ``read`` / ``write`` still work (``write`` diffs the tables
+    against memory), but a Table operation is a read then a write: hold
+    ``lock`` around it when another process may write in between.
+
+    On open the snapshot is loaded and both journals are replayed; a torn
+    line from a crash is skipped. Replaying is idempotent, so a crash at
+    any point during compaction loses nothing that was acknowledged.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        compact_bytes: int = 4 * 1024 * 1024,
+        fsync: bool = True,
+        background: bool = True,
+        lock: FileLock | None = None,
+    ) -> None:
+        self._path = Path(path)
+        self._journal_path = self._path.with_name(self._path.name + ".journal")
+        self._compacting_path = self._path.with_name(self._path.name + ".journal.compacting")
+        self._compact_lock_path = self._path.with_name(self._path.name + ".compact.lock")
+        self._compact_bytes = compact_bytes
+        self._fsync = fsync
+        self._background = background
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._owns_lock = lock is None
+        self.lock = lock or FileLock(self._path.with_name(self._path.name + ".lock"))
+        self._compactor: threading.Thread | None = None
+        self._next_ids: dict[str, int] = {}
+        self._journal = None
+        with self.lock:
+            self._open()
+
+    # ── TinyDB Storage interface ─────────────────────────────────────
+
+    def read(self) -> dict | None:
+        with self.lock:
+            self.catch_up()
+            if not self._state:
+                return None
+            # Hand out copies: TinyDB updates documents in place before calling
+            # write(), and the diff needs the untouched originals to compare to.
+            return {
+                table: {doc_id: dict(doc) for doc_id, doc in docs.items()}
+                for table, docs in self._state.items()
+            }
+
+    def write(self, data: dict) -> None:
+        with self.lock:
+            self.catch_up()
+            ops = self._diff(data)
+            if ops:
+                self._append(ops)
+
+    def close(self) -> None:
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self.lock:
+            if not self._journal.closed:
+                # Leave everything in the snapshot, so plain JSONStorage sees it.
+                self.catch_up()
+                if self._journal_size or self._compacting_path.exists():
+                    self._start_compaction(background=False)
+                self._journal.close()
+        if self._owns_lock:
+            self.lock.close()
+
+    # ── Direct access ────────────────────────────────────────────────
+
+    def commit(self, ops: list[dict]) -> list[dict]:
+        """Append ``ops`` as one journal line and apply them.
+
+        Besides the ops :meth:`write` produces (``table``, ``put``, ``del``,
+        ``drop``), ``{"op": "ins", "t": table, "doc": doc}`` adds a document
+        under the table's next free doc id. Returns the ops as written, with
+        every ``ins`` turned into a ``put`` carrying its id.
+        """
+        with self.lock:
+            self.catch_up()
+            ops = assign_ids(ops, self._next_id)
+            self._append(ops)
+        return ops
+
+    def catch_up(self) -> bool:
+        """Replay what other processes appended since the last look; ``True`` if anything did.
+
+        A rotated journal or a new snapshot (another process compacted)
+        means a full reload.
+        """
+        with self.lock:
+            try:
+                stat = os.stat(self._journal_path)
+            except FileNotFoundError:
+                stat = None
+            if (
+                stat is None
+                or stat.st_ino != os.fstat(self._journal.fileno()).st_ino
+                or stat.st_size < self._journal_size
+                or file_signature(self._path) != self._snapshot_signature
+            ):
+                self._open()
+                return True
+            if stat.st_size == self._journal_size:
+                return False
+            with open(self._journal_path, "rb") as f:
+                f.seek(self._journal_size)
+                tail = f.read()
+            self._journal_size += len(tail)
+            for line in tail.splitlines():
+                ops = _decode(line)
+                if ops is not None:
+                    self._apply(ops)
+            if not tail.endswith(b"\n"):
+                self._end_torn_line()
+            return True
+
+    # ── Compaction ───────────────────────────────────────────────────
+
+    def compact(self) -> None:
+        """Fold the journal into a new snapshot and wait for it to finish.
+
+        Does nothing if another process is compacting right now.
+        """
+        with self.lock:
+            self.catch_up()
+            self._start_compaction(background=False)
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    def _start_compaction(self, background: bool | None = None) -> None:
+        """Rotate the journal and write a snapshot of memory; called with ``lock`` held."""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        compact_fd = try_lock(self._compact_lock_path)
+        if compact_fd is None:
+            return  # another process is compacting
+
+        try:
+            self._journal.close()
+            if self._compacting_path.exists():
+                # A previous compaction died before finishing; keep its ops ahead of ours.
+                with open(self._compacting_path, "a", encoding="utf-8") as dst, \
+                        open(self._journal_path, encoding="utf-8") as src:
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                self._journal_path.unlink()
+            else:
+                os.replace(self._journal_path, self._compacting_path)
+            self._journal = open(self._journal_path, "a", encoding="utf-8")
+            self._journal_size = 0
+        except BaseException:
+            os.close(compact_fd)
+            raise
+
+        # Documents in _state are never mutated in place, so a shallow copy is
+        # a consistent snapshot even while new writes keep arriving.
+        snapshot = {table: dict(docs) for table, docs in self._state.items()}
+        if self._background if background is None else background:
+            self._compactor = threading.Thread(
+                target=self._write_snapshot,
+                args=(snapshot, compact_fd),
+                name="tinydb-journal-compactor",
+                daemon=False,
+            )
+            self._compactor.start()
+        else:
+            self._write_snapshot(snapshot, compact_fd)
+
+    def _write_snapshot(self, snapshot: dict, compact_fd: int) -> None:
+        try:
+            tmp_path = self._path.with_name(self._path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+                f.flush()
+                os.fsync(f.fileno())
+            # Other processes load snapshot + .compacting under the lock, so
+            # they must see both files change together.
+            with self.lock:
+                os.replace(tmp_path, self._path)
+                _fsync_dir(self._path.parent)
+                self._compacting_path.unlink(missing_ok=True)
+                self._snapshot_signature = file_signature(self._path)
+        finally:
+            os.close(compact_fd)
+
+    # ── Internals ────────────────────────────────────────────────────
+
+    def _open(self) -> None:
+        """Load everything from disk and (re)open the journal; called with ``lock`` held."""
+        if self._journal is not None and not self._journal.closed:
+            self._journal.close()
+        self._snapshot_signature = file_signature(self._path)
+        self._state: dict[str, dict[str, dict]] = self._load()
+        self._next_ids.clear()
+        self._journal = open(self._journal_path, "a", encoding="utf-8")
+        self._journal_size = os.fstat(self._journal.fileno()).st_size
+        if self._journal_size:
+            with open(self._journal_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._end_torn_line()
+
+    def _load(self) -> dict[str, dict[str, dict]]:
+        state: dict[str, dict[str, dict]] = {}
+        if self._path.exists() and self._path.stat().st_size > 0:
+            with open(self._path, encoding="utf-8") as f:
+                state = json.load(f)
+        for journal in (self._compacting_path, self._journal_path):
+            if not journal.exists():
+                continue
+            with open(journal, "rb") as f:
+                for line in f:
+                    ops = _decode(line)
+                    if ops is not None:
+                        apply_ops(state, ops)
+        return state
+
+    def _append(self, ops: list[dict]) -> None:
+        """Write one journal line and apply it; called with ``lock`` held, caught up."""
+        line = json.dumps({"ops": ops}, separators=(",", ":")) + "\n"
+        self._write_line(line)
+        self._apply(ops)
+        if self._journal_size >= self._compact_bytes:
+            self._start_compaction()
+
+    def _end_torn_line(self) -> None:
+        # A writer died mid-line; close it off so the next op starts on its own line.
+        self._write_line("\n")
+
+    def _write_line(self, line: str) -> None:
+        self._journal.write(line)
+        self._journal.flush()
+        if self._fsync:
+            os.fsync(self._journal.fileno())
+        self._journal_size += len(line.encode("utf-8"))
+
+    def _apply(self, ops: list[dict]) -> None:
+        apply_ops(self._state, ops)
+        for op in ops:
+            if op["op"] == "put" and op["t"] in self._next_ids:
+                self._next_ids[op["t"]] = max(self._next_ids[op["t"]], int(op["id"]) + 1)
+            elif op["op"] == "drop":
+                self._next_ids.pop(op["t"], None)
+
+    def _next_id(self, table: str) -> int:
+        next_id = self._next_ids.get(table)
+        if next_id is None:
+            next_id = max(map(int, self._state.get(table, {})), default=0) + 1
+        self._next_ids[table] = next_id + 1
+        return next_id
+
+    def _diff(self, data: dict) -> list[dict]:
+        ops: list[dict] = []
+        for table, docs in data.items():
+            old = self._state.get(table)
+            if old is None:
+                ops.append({"op": "table", "t": table})
+                old = {}
+            for doc_id, doc in docs.items():
+                if old.get(doc_id) != doc:
+                    ops.append({"op": "put", "t": table, "id": doc_id, "doc": doc})
+            for doc_id in old.keys() - docs.keys():
+                ops.append({"op": "del", "t": table, "id": doc_id})
+        for table in self._state.keys() - data.keys():
+            ops.append({"op": "drop", "t": table})
+        return ops
+
+
+def has_journal(path: Path) -> bool:
+    """Whether ``path`` has journaled writes that aren't in its snapshot yet."""
+    journal = path.with_name(path.name + ".journal")
+    compacting = path.with_name(path.name + ".journal.compacting")
+    return compacting.exists() or (journal.exists() and journal.stat().st_size > 0)
+
+
+def fold_journal(path: Path, lock: FileLock | None = None) -> None:
+    """Compact ``path``'s leftover journal into the snapshot, for readers that use plain JSON."""
+    JournalStorage(str(path), background=False, lock=lock).close()
+
+
+def assign_ids(ops: list[dict], next_id: Callable[[str], int]) -> list[dict]:
+    """Turn each ``ins`` op into a ``put`` under the doc id ``next_id(table)`` hands out."""
+    return [
+        {"op": "put", "t": op["t"], "id": str(next_id(op["t"])), "doc": op["doc"]}
+        if op["op"] == "ins" else op
+        for op in ops
+    ]
+
+
+def apply_ops(state: dict[str, dict[str, dict]], ops: list[dict]) -> None:
+    """Apply ops (ids already assigned) to TinyDB's ``{table: {doc_id: doc}}`` layout."""
+    for op in ops:
+        kind, table = op["op"], op["t"]
+        if kind == "table":
+            state.setdefault(table, {})
+        elif kind == "put":
+            state.setdefault(table, {})[op["id"]] = dict(op["doc"])
+        elif kind == "del":
+            state.get(table, {}).pop(op["id"], None)
+        elif kind == "drop":
+            state.pop(table, None)
+
+
+def _decode(line: bytes) -> list[dict] | None:
+    try:
+        return json.loads(line)["ops"]
+    except (ValueError, KeyError, TypeError):
+        return None  # torn write from a crash
+
+
+def file_signature(path: Path) -> tuple[int, int, int] | None:
+    """Identity and version of a file, to tell when another process replaced it."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
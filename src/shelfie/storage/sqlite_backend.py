@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from tinydb import TinyDB
+
+from shelfie.storage.base import (
+    DocumentStore,
+    blocked_titles_of,
+    decode_cursor,
+    encode_cursor,
+    read_key,
+)
+from shelfie.storage.journal import JournalStorage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reads (
+    id TEXT PRIMARY KEY,
+    title_key TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    status TEXT,
+    rating INTEGER,
+    finished_at TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reads_title_key ON reads (title_key);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    doc TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS blocked_titles (
+    title TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Listings walk (created_at, id) backwards; the status index keeps the
+# commonest filter in index order too. Created after _migrate_filter_columns
+# so databases from before those columns existed get them first.
+_LISTING_INDEXES = """
+DROP INDEX IF EXISTS reads_created_at;
+DROP INDEX IF EXISTS sessions_created_at;
+CREATE INDEX IF NOT EXISTS reads_listing ON reads (created_at, id);
+CREATE INDEX IF NOT EXISTS reads_status_listing ON reads (status, created_at, id);
+CREATE INDEX IF NOT EXISTS sessions_listing ON sessions (created_at, id);
+"""
+
+
+class SQLiteDocumentStore(DocumentStore):
+    """Reads and sessions in SQLite (WAL mode) with indexed id, title + author and created_at.
+
+    Documents are kept as JSON alongside the indexed columns, so the dicts
+    handed back are identical to what the TinyDB backend returns.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate_filter_columns()
+        self._conn.executescript(_LISTING_INDEXES)
+        built = self._conn.execute(
+            "SELECT 1 FROM meta WHERE key = 'blocked_titles_built'"
+        ).fetchone()
+        if not built:
+            self.rebuild_blocked_titles()
+
+    def insert_read(self, doc: dict) -> None:
+        with self._lock, self._transaction():
+            self._conn.execute(
+                "INSERT INTO reads (id, title_key, created_at, status, rating, finished_at, doc)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                _read_row(doc),
+            )
+            self._block(doc)
+
+    def insert_reads(self, docs: list[dict]) -> None:
+        if not docs:
+            return
+        with self._lock, self._transaction():
+            self._conn.executemany(
+                "INSERT INTO reads (id, title_key, created_at, status, rating, finished_at, doc)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [_read_row(doc) for doc in docs],
+            )
+            for doc in docs:
+                self._block(doc)
+
+    def update_read(self, doc: dict) -> None:
+        read_id, *columns = _read_row(doc)
+        with self._lock, self._transaction():
+            self._conn.execute(
+                "UPDATE reads SET title_key = ?, created_at = ?, status = ?, rating = ?,"
+                " finished_at = ?, doc = ? WHERE id = ?",
+                (*columns, read_id),
+            )
+            self._block(doc)
+
+    def get_all_reads(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT doc FROM reads ORDER BY rowid").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_read_by_id(self, read_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT doc FROM reads WHERE id = ?", (read_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def read_exists(self, title: str, author: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM reads WHERE title_key = ? LIMIT 1",
+                (read_key(title, author),),
+            ).fetchone()
+        return row is not None
+
+    def list_reads(
+        self,
+        status: str | None = None,
+        min_rating: int | None = None,
+        year: int | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        where: list[str] = []
+        params: list = []
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if min_rating is not None:
+            where.append("rating >= ?")
+            params.append(min_rating)
+        if year is not None:
+            where.append("finished_at >= ? AND finished_at < ?")
+            params += [f"{year:04d}-01-01", f"{year + 1:04d}-01-01"]
+        return self._page("reads", where, params, limit, cursor)
+
+    def insert_session(self, doc: dict) -> None:
+        with self._lock, self._transaction():
+            self._conn.execute(
+                "INSERT INTO sessions (id, created_at, doc) VALUES (?, ?, ?)",
+                _session_row(doc),
+            )
+            self._block(doc)
+
+    def insert_sessions(self, docs: list[dict]) -> None:
+        if not docs:
+            return
+        with self._lock, self._transaction():
+            self._conn.executemany(
+                "INSERT INTO sessions (id, created_at, doc) VALUES (?, ?, ?)",
+                [_session_row(doc) for doc in docs],
+            )
+            for doc in docs:
+                self._block(doc)
+
+    def get_all_sessions(self) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT doc FROM sessions ORDER BY rowid").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def list_sessions(
+        self, limit: int | None = None, cursor: str | None = None
+    ) -> tuple[list[dict], str | None]:
+        return self._page("sessions", [], [], limit, cursor)
+
+    def _page(
+        self,
+        table: str,
+        where: list[str],
+        params: list,
+        limit: int | None,
+        cursor: str | None,
+    ) -> tuple[list[dict], str | None]:
+        if cursor:
+            where = [*where, "(created_at, id) < (?, ?)"]
+            params = [*params, *decode_cursor(cursor)]
+        sql = f"SELECT doc FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = [*params, limit]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        docs = [json.loads(row[0]) for row in rows]
+        full = limit is not None and len(docs) >= limit
+        return docs, encode_cursor(docs[-1]) if full else None
+
+    def get_blocked_titles(self) -> set[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT title FROM blocked_titles").fetchall()
+        return {row[0] for row in rows}
+
+    def rebuild_blocked_titles(self) -> int:
+        with self._lock, self._transaction():
+            blocked: set[str] = set()
+            for table in ("reads", "sessions"):
+                for (doc,) in self._conn.execute(f"SELECT doc FROM {table}"):
+                    blocked |= blocked_titles_of(json.loads(doc))
+            self._conn.execute("DELETE FROM blocked_titles")
+            self._conn.executemany(
+                "INSERT INTO blocked_titles (title) VALUES (?)", [(t,) for t in blocked]
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('blocked_titles_built', '1')"
+            )
+            return len(blocked)
+
+    def _block(self, doc: dict) -> None:
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO blocked_titles (title) VALUES (?)",
+            [(t,) for t in blocked_titles_of(doc)],
+        )
+
+    def _migrate_filter_columns(self) -> None:
+        """Add and backfill the status / rating / finished_at columns on older databases."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(reads)")}
+        if "status" in columns:
+            return
+        with self._transaction():
+            for column, kind in (("status", "TEXT"), ("rating", "INTEGER"), ("finished_at", "TEXT")):
+                self._conn.execute(f"ALTER TABLE reads ADD COLUMN {column} {kind}")
+            rows = self._conn.execute("SELECT id, doc FROM reads").fetchall()
+            self._conn.executemany(
+                "UPDATE reads SET status = ?, rating = ?, finished_at = ? WHERE id = ?",
+                [(*_filter_columns(json.loads(doc)), read_id) for read_id, doc in rows],
+            )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._conn.execute("BEGIN")
+        try:
+            yield
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def migrate_from_tinydb(self, tinydb_path: Path) -> int:
+        """Copy reads and sessions out of an existing TinyDB file, once.
+
+        Returns the number of documents imported. Later calls are no-ops, and
+        the TinyDB file is left untouched.
+        """
+        with self._lock:
+            done = self._conn.execute(
+                "SELECT 1 FROM meta WHERE key = 'migrated_from_tinydb'"
+            ).fetchone()
+            if done or not (tinydb_path.exists() or _journal_exists(tinydb_path)):
+                return 0
+
+            # JournalStorage also replays any journal that hasn't been compacted
+            # yet, and reads a plain TinyDB file as-is.
+            db = TinyDB(str(tinydb_path), storage=JournalStorage)
+            try:
+                reads = db.table("reads").all()
+                sessions = db.table("sessions").all()
+            finally:
+                db.close()
+
+            with self._transaction():
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO reads (id, title_key, created_at, status, rating, finished_at, doc)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [_read_row(dict(d)) for d in reads],
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO sessions (id, created_at, doc) VALUES (?, ?, ?)",
+                    [_session_row(dict(d)) for d in sessions],
+                )
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('migrated_from_tinydb', ?)",
+                    (str(tinydb_path),),
+                )
+            self.rebuild_blocked_titles()
+            return len(reads) + len(sessions)
+
+
+def _journal_exists(tinydb_path: Path) -> bool:
+    return tinydb_path.with_name(tinydb_path.name + ".journal").exists()
+
+
+def _filter_columns(doc: dict) -> tuple:
+    return (doc.get("status"), doc.get("rating"), doc.get("finished_at"))
+
+
+def _read_row(doc: dict) -> tuple:
+    return (
+        doc["id"],
+        read_key(doc["title"], doc["author"]),
+        doc["created_at"],
+        *_filter_columns(doc),
+        json.dumps(doc),
+    )
+
+
+def _session_row(doc: dict) -> tuple:
+    return (doc["id"], doc["created_at"], json.dumps(doc))
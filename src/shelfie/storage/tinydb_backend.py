@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import bisect
+from collections.abc import Iterator
+from pathlib import Path
+
+from tinydb import TinyDB
+
+from shelfie.storage.base import (
+    DocumentStore,
+    blocked_titles_of,
+    decode_cursor,
+    read_key,
+    read_matches,
+    take_page,
+)
+from shelfie.storage.filelock import FileLock
+from shelfie.storage.journal import (
+    JournalStorage,
+    apply_ops,
+    assign_ids,
+    file_signature,
+    fold_journal,
+    has_journal,
+)
+
+
+class _CreatedAtIndex:
+    """Docs keyed by id plus their (created_at, id) keys kept in sorted order.
+
+    TinyDB has no indexes and re-reads the whole table for every lookup, so
+    listings walk this instead: a page starts with a bisect, not a scan.
+    """
+
+    def __init__(self, docs: list[dict]) -> None:
+        self._docs = {doc["id"]: doc for doc in docs}
+        self._keys = sorted((doc["created_at"], doc["id"]) for doc in docs)
+
+    def add(self, doc: dict) -> None:
+        old = self._docs.get(doc["id"])
+        self._docs[doc["id"]] = doc
+        if old is not None:
+            if old["created_at"] == doc["created_at"]:
+                return
+            self._keys.pop(bisect.bisect_left(self._keys, (old["created_at"], old["id"])))
+        bisect.insort(self._keys, (doc["created_at"], doc["id"]))
+
+    def get(self, doc_id: str) -> dict | None:
+        return self._docs.get(doc_id)
+
+    def newest_first(self, cursor: str | None = None) -> Iterator[dict]:
+        end = bisect.bisect_left(self._keys, decode_cursor(cursor)) if cursor else len(self._keys)
+        for i in range(end - 1, -1, -1):
+            yield self._docs[self._keys[i][1]]
+
+
+class TinyDBDocumentStore(DocumentStore):
+    """Reads and sessions as two tables in a single TinyDB JSON file.
+
+    With ``journal=True`` writes go through :class:`JournalStorage`, which
+    appends each change instead of rewriting the whole file. Every write is
+    built as a list of journal ops (see :meth:`JournalStorage.commit`) and
+    committed in one go, document and blocklist titles together. Closing
+    compacts the journal into the file; without ``journal``, a journal still
+    left next to the file is folded in before it is read.
+
+    Lookups and listings are served from in-memory indexes. The web server
+    and CLI commands may share the file, so every call holds a
+    :class:`FileLock` on ``<path>.lock`` and first checks whether another
+    process has written since (a journal that grew, or a file whose
+    size/mtime changed); if so the indexes are rebuilt from disk.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        journal: bool = False,
+        compact_bytes: int = 4 * 1024 * 1024,
+    ) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._path = path
+        # Serializes the web app's worker threads as well as other processes.
+        self._lock = FileLock(path.with_name(path.name + ".lock"))
+        with self._lock:
+            if journal:
+                self._db = TinyDB(
+                    str(path), storage=JournalStorage, compact_bytes=compact_bytes, lock=self._lock
+                )
+                self._journal: JournalStorage | None = self._db.storage
+                self._open_tables()
+            else:
+                self._db = None
+                self._journal = None
+                self._open_plain()
+            self._load()
+
+    def _open_tables(self) -> None:
+        self._reads_table = self._db.table("reads")
+        self._sessions_table = self._db.table("sessions")
+
+    def _open_plain(self) -> None:
+        """(Re)open the JSON file without the journal; called with the lock held.
+
+        A journal left next to it (a journaled run that crashed, or one
+        running right now) holds writes the file doesn't have yet, and new
+        doc ids here would collide with them, so it is folded in first.
+        """
+        if has_journal(self._path):
+            fold_journal(self._path, self._lock)
+            if has_journal(self._path):
+                raise RuntimeError(
+                    f"{self._path} is being compacted by another process; try again in a moment."
+                )
+        if self._db is not None:
+            self._db.close()
+        # A compaction elsewhere replaces the file, so don't keep the old handle.
+        self._db = TinyDB(str(self._path))
+        self._open_tables()
+
+    def _load(self) -> None:
+        """Build the indexes and the blocklist from what's on disk; called with the lock held."""
+        tables = self._db.storage.read() or {}
+        self._signature = file_signature(self._path)
+        reads = tables.get("reads", {})
+        self._reads_index = _CreatedAtIndex(list(reads.values()))
+        self._read_doc_ids = {doc["id"]: doc_id for doc_id, doc in reads.items()}
+        self._read_keys = {read_key(doc["title"], doc["author"]) for doc in reads.values()}
+        self._sessions_index = _CreatedAtIndex(list(tables.get("sessions", {}).values()))
+
+        # One small doc per title, so the journal only ever appends new ones.
+        if "blocked_titles" in tables:
+            self._blocked = {doc["title"] for doc in tables["blocked_titles"].values()}
+        else:
+            self.rebuild_blocked_titles()
+
+    def _sync(self) -> None:
+        """Reload if another process wrote since our last look; called with the lock held."""
+        if self._journal is not None:
+            if self._journal.catch_up():
+                self._load()
+        elif has_journal(self._path) or file_signature(self._path) != self._signature:
+            self._open_plain()
+            self._load()
+
+    def insert_read(self, doc: dict) -> None:
+        self.insert_reads([doc])
+
+    def insert_reads(self, docs: list[dict]) -> None:
+        if not docs:
+            return
+        with self._lock:
+            self._sync()
+            self._write_reads([{"op": "ins", "t": "reads", "doc": doc} for doc in docs])
+
+    def update_read(self, doc: dict) -> None:
+        with self._lock:
+            self._sync()
+            doc_id = self._read_doc_ids.get(doc["id"])
+            if doc_id is None:
+                return
+            old = self._reads_index.get(doc["id"])
+            self._read_keys.discard(read_key(old["title"], old["author"]))
+            self._write_reads([{"op": "put", "t": "reads", "id": doc_id, "doc": doc}])
+
+    def _write_reads(self, ops: list[dict]) -> None:
+        titles: set[str] = set()
+        for op in ops:
+            titles |= blocked_titles_of(op["doc"])
+        committed = self._commit(ops + self._block_ops(titles))
+        self._blocked |= titles
+        for op in committed:
+            if op["t"] != "reads":
+                continue
+            doc = op["doc"]
+            self._read_doc_ids[doc["id"]] = op["id"]
+            self._reads_index.add(dict(doc))
+            self._read_keys.add(read_key(doc["title"], doc["author"]))
+
+    def get_all_reads(self) -> list[dict]:
+        with self._lock:
+            self._sync()
+            return self._reads_table.all()
+
+    def get_read_by_id(self, read_id: str) -> dict | None:
+        with self._lock:
+            self._sync()
+            doc = self._reads_index.get(read_id)
+        return dict(doc) if doc else None
+
+    def read_exists(self, title: str, author: str) -> bool:
+        with self._lock:
+            self._sync()
+            return read_key(title, author) in self._read_keys
+
+    def list_reads(
+        self,
+        status: str | None = None,
+        min_rating: int | None = None,
+        year: int | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        with self._lock:
+            self._sync()
+            page, next_cursor = take_page(
+                self._reads_index.newest_first(cursor),
+                limit,
+                lambda doc: read_matches(doc, status, min_rating, year),
+            )
+        return [dict(doc) for doc in page], next_cursor
+
+    def insert_session(self, doc: dict) -> None:
+        self.insert_sessions([doc])
+
+    def insert_sessions(self, docs: list[dict]) -> None:
+        if not docs:
+            return
+        with self._lock:
+            self._sync()
+            titles: set[str] = set()
+            for doc in docs:
+                titles |= blocked_titles_of(doc)
+            self._commit(
+                [{"op": "ins", "t": "sessions", "doc": doc} for doc in docs]
+                + self._block_ops(titles)
+            )
+            self._blocked |= titles
+            for doc in docs:
+                self._sessions_index.add(dict(doc))
+
+    def get_all_sessions(self) -> list[dict]:
+        with self._lock:
+            self._sync()
+            return self._sessions_table.all()
+
+    def list_sessions(
+        self, limit: int | None = None, cursor: str | None = None
+    ) -> tuple[list[dict], str | None]:
+        with self._lock:
+            self._sync()
+            page, next_cursor = take_page(self._sessions_index.newest_first(cursor), limit)
+        return [dict(doc) for doc in page], next_cursor
+
+    def get_blocked_titles(self) -> set[str]:
+        with self._lock:
+            self._sync()
+            return set(self._blocked)
+
+    def rebuild_blocked_titles(self) -> int:
+        with self._lock:
+            self._sync()
+            blocked: set[str] = set()
+            for doc in self._reads_table.all() + self._sessions_table.all():
+                blocked |= blocked_titles_of(doc)
+            self._commit(
+                [{"op": "drop", "t": "blocked_titles"}, {"op": "table", "t": "blocked_titles"}]
+                + [{"op": "ins", "t": "blocked_titles", "doc": {"title": t}} for t in sorted(blocked)]
+            )
+            self._blocked = blocked
+            return len(blocked)
+
+    def _block_ops(self, titles: set[str]) -> list[dict]:
+        """Ops adding whichever of ``titles`` aren't blocked yet."""
+        return [
+            {"op": "ins", "t": "blocked_titles", "doc": {"title": t}}
+            for t in sorted(titles - self._blocked)
+        ]
+
+    def _commit(self, ops: list[dict]) -> list[dict]:
+        """Apply journal ops (see :meth:`JournalStorage.commit`); returns them with doc ids assigned.
+
+        Without the journal this is one read and one rewrite of the JSON
+        file, however many documents and blocklist titles the ops touch.
+        """
+        if self._journal is not None:
+            return self._journal.commit(ops)
+        data = self._db.storage.read() or {}
+        next_ids: dict[str, int] = {}
+
+        def next_id(table: str) -> int:
+            doc_id = next_ids.get(table) or max(map(int, data.get(table, {})), default=0) + 1
+            next_ids[table] = doc_id + 1
+            return doc_id
+
+        ops = assign_ids(ops, next_id)
+        apply_ops(data, ops)
+        self._db.storage.write(data)
+        self._signature = file_signature(self._path)
+        return ops
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+        self._lock.close()
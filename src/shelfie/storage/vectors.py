@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+import json
+import os
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+
+from shelfie.storage.filelock import FileLock
+
+
+def empty_query_result() -> dict:
+    return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+
+class VectorStore(ABC):
+    """An id-keyed collection of (vector, document, metadata) with cosine top-k search.
+
+    ``query`` returns the same nested-list shape as a Chroma query, with
+    cosine distances, so callers don't care which backend is in use.
+    """
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: list[str],
+        documents: list[str],
+        embeddings: list[list[float]],
+        metadatas: list[dict],
+    ) -> None: ...
+
+    @abstractmethod
+    def get_metadata(self, ids: list[str]) -> dict[str, dict]: ...
+
+    @abstractmethod
+    def query(self, embedding: list[float], n_results: int = 5) -> dict: ...
+
+    @abstractmethod
+    def count(self) -> int: ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry, keeping the (now empty) collection."""
+
+    @abstractmethod
+    def iter_batches(self, batch_size: int = 500) -> Iterator[dict]:
+        """Every entry, ``batch_size`` at a time, as ``{ids, documents, metadatas, embeddings}``.
+
+        ``embeddings`` is a float32 array of shape ``(len(ids), dim)``.
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class ChromaVectorStore(VectorStore):
+    """A persistent ChromaDB collection using cosine space."""
+
+    def __init__(self, path: Path, name: str) -> None:
+        import chromadb  # heavy; only paid for when this backend is selected
+
+        self._client = chromadb.PersistentClient(path=str(path))
+        self._name = name
+        self._collection = self._open_collection()
+
+    def _open_collection(self):
+        return self._client.get_or_create_collection(
+            name=self._name,
+            metadata={"hnsw:space": "cosine"},
+        )
+
+    def upsert(self, ids, documents, embeddings, metadatas) -> None:
+        self._collection.upsert(
+            ids=ids,
+            documents=documents,
+            embeddings=embeddings,
+            metadatas=metadatas,
+        )
+
+    def get_metadata(self, ids: list[str]) -> dict[str, dict]:
+        found: dict[str, dict] = {}
+        for start in range(0, len(ids), 1000):
+            chunk = ids[start:start + 1000]
+            result = self._collection.get(ids=chunk, include=["metadatas"])
+            for item_id, metadata in zip(result["ids"], result["metadatas"]):
+                found[item_id] = metadata or {}
+        return found
+
+    def query(self, embedding: list[float], n_results: int = 5) -> dict:
+        count = self._collection.count()
+        if count == 0:
+            return empty_query_result()
+        return self._collection.query(
+            query_embeddings=[embedding],
+            n_results=min(n_results, count),
+        )
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    def clear(self) -> None:
+        self._client.delete_collection(self._name)
+        self._collection = self._open_collection()
+
+    def iter_batches(self, batch_size: int = 500) -> Iterator[dict]:
+        offset = 0
+        while True:
+            result = self._collection.get(
+                limit=batch_size,
+                offset=offset,
+                include=["documents", "metadatas", "embeddings"],
+            )
+            if not result["ids"]:
+                return
+            yield {
+                "ids": result["ids"],
+                "documents": result["documents"],
+                "metadatas": [m or {} for m in result["metadatas"]],
+                "embeddings": np.asarray(result["embeddings"], dtype=np.float32),
+            }
+            offset += len(result["ids"])
+
+
+class NumpyVectorStore(VectorStore):
+    """Exact cosine search over a memory-mapped float32 matrix.
+
+    Layout under ``path``:
+
+    - ``vectors.f32`` — row-major float32 matrix of L2-normalized vectors
+    - ``index.jsonl`` — append-only sidecar; one ``{id, row, document, metadata}``
+      line per upsert, last line for an id wins
+    - ``meta.json`` — the vector dimension
+
+    New ids append a row; existing ids overwrite their row in place. A query
+    is one matrix-vector product plus ``argpartition``, which beats an HNSW
+    index at personal-library scale and needs no background threads.
+
+    Several processes (the web app's enrichment worker next to ``shelfie
+    reindex``) may share a collection. Every call holds a :class:`FileLock`
+    on ``lock`` and first picks up the index lines and rows other processes
+    appended, so new rows are always numbered from the file as it is.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._vectors_path = path / "vectors.f32"
+        self._index_path = path / "index.jsonl"
+        self._meta_path = path / "meta.json"
+
+        path.mkdir(parents=True, exist_ok=True)
+        self._lock = FileLock(path / "lock")
+        self._matrix: np.memmap | None = None
+        with self._lock:
+            self._reload()
+
+    def _reload(self) -> None:
+        self._dim: int | None = None
+        if self._meta_path.exists():
+            self._dim = json.loads(self._meta_path.read_text())["dim"]
+        self._rows: dict[str, int] = {}
+        self._ids: list[str] = []
+        self._documents: list[str] = []
+        self._metadatas: list[dict] = []
+        self._load_index()
+        self._remap()
+
+    def _catch_up(self) -> None:
+        """Apply what other processes appended since the last look; called with the lock held."""
+        current = _file_id(self._index_path)
+        seen = self._index_id
+        if current == seen:
+            return
+        if current is None or seen is None or current[0] != seen[0] or current[1] < seen[1]:
+            self._reload()  # rewritten by another process's load
+            return
+        with open(self._index_path, "rb") as f:
+            f.seek(seen[1])
+            tail = f.read()
+        if not tail.endswith(b"\n"):
+            self._reload()  # a writer died mid-line; loading repairs it
+            return
+        if self._dim is None:
+            self._dim = json.loads(self._meta_path.read_text())["dim"]
+        for line in tail.decode("utf-8").splitlines():
+            entry = json.loads(line)
+            self._set_entry(entry["id"], entry["row"], entry["document"], entry["metadata"])
+        self._index_id = current
+        self._remap()
+
+    def _load_index(self) -> None:
+        self._index_id = _file_id(self._index_path)
+        if self._index_id is None:
+            return
+        with open(self._index_path, encoding="utf-8") as f:
+            lines = f.read().split("\n")
+        # Every complete entry ends in a newline, so the last piece is either
+        # empty or a torn write; parse the rest in a single call.
+        torn = lines.pop() != ""
+        try:
+            entries = json.loads("[" + ",".join(lines) + "]")
+        except json.JSONDecodeError:
+            entries = _parse_lines(lines)
+        for entry in entries:
+            self._set_entry(entry["id"], entry["row"], entry["document"], entry["metadata"])
+
+        # A crash between the two appends in ``upsert`` leaves vector rows
+        # with no index entry; drop them so the next append lines up again.
+        on_disk = self._rows_on_disk()
+        if on_disk > len(self._ids):
+            with open(self._vectors_path, "r+b") as f:
+                f.truncate(len(self._ids) * 4 * self._dim)
+        if torn or len(entries) < len(lines) or len(entries) > 2 * max(len(self._ids), 1):
+            self._rewrite_index()
+            self._index_id = _file_id(self._index_path)
+
+    def _set_entry(self, item_id: str, row: int, document: str, metadata: dict) -> None:
+        if row == len(self._ids):
+            self._ids.append(item_id)
+            self._documents.append(document)
+            self._metadatas.append(metadata)
+        else:
+            self._documents[row] = document
+            self._metadatas[row] = metadata
+        self._rows[item_id] = row
+
+    def _rows_on_disk(self) -> int:
+        if not self._dim or not self._vectors_path.exists():
+            return 0
+        return self._vectors_path.stat().st_size // (4 * self._dim)
+
+    def _rewrite_index(self) -> None:
+        tmp = self._index_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for row, item_id in enumerate(self._ids):
+                f.write(_index_line(item_id, row, self._documents[row], self._metadatas[row]))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._index_path)
+
+    def _remap(self) -> None:
+        rows = len(self._ids)
+        if rows == 0 or not self._dim:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+", shape=(rows, self._dim)
+        )
+
+    def upsert(self, ids, documents, embeddings, metadatas) -> None:
+        if not ids:
+            return
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            self._catch_up()
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+                self._meta_path.write_text(json.dumps({"dim": self._dim}))
+            if vectors.shape[1] != self._dim:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} doesn't match this index ({self._dim})."
+                )
+
+            lines: list[str] = []
+            appended: list[np.ndarray] = []
+            first_new_row = len(self._ids)
+            for item_id, document, vector, metadata in zip(ids, documents, vectors, metadatas):
+                row = self._rows.get(item_id)
+                if row is None:
+                    row = len(self._ids)
+                    appended.append(vector)
+                    self._ids.append(item_id)
+                    self._documents.append(document)
+                    self._metadatas.append(metadata)
+                    self._rows[item_id] = row
+                else:
+                    if row >= first_new_row:
+                        appended[row - first_new_row] = vector
+                    else:
+                        self._matrix[row] = vector
+                    self._documents[row] = document
+                    self._metadatas[row] = metadata
+                lines.append(_index_line(item_id, row, document, metadata))
+
+            if self._matrix is not None:
+                self._matrix.flush()
+            if appended:
+                with open(self._vectors_path, "ab") as f:
+                    f.write(np.stack(appended).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            # The sidecar is written after the vectors, so a crash can only leave
+            # rows without metadata (truncated on load), never metadata without rows.
+            with open(self._index_path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._index_id = _file_id(self._index_path)
+            if appended:
+                self._remap()
+
+    def get_metadata(self, ids: list[str]) -> dict[str, dict]:
+        with self._lock:
+            self._catch_up()
+            return {
+                item_id: self._metadatas[self._rows[item_id]]
+                for item_id in ids
+                if item_id in self._rows
+            }
+
+    def query(self, embedding: list[float], n_results: int = 5) -> dict:
+        with self._lock:
+            self._catch_up()
+            if self._matrix is None:
+                return empty_query_result()
+            q = _normalize(np.asarray([embedding], dtype=np.float32))[0]
+            similarities = self._matrix @ q
+            k = min(n_results, len(similarities))
+            top = np.argpartition(-similarities, k - 1)[:k]
+            top = top[np.argsort(-similarities[top])]
+            return {
+                "ids": [[self._ids[i] for i in top]],
+                "documents": [[self._documents[i] for i in top]],
+                "metadatas": [[self._metadatas[i] for i in top]],
+                "distances": [[float(1.0 - similarities[i]) for i in top]],
+            }
+
+    def count(self) -> int:
+        with self._lock:
+            self._catch_up()
+            return len(self._ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._matrix = None
+            if self._vectors_path.exists():
+                with open(self._vectors_path, "r+b") as f:
+                    f.truncate(0)
+            self._rows, self._ids, self._documents, self._metadatas = {}, [], [], []
+            # A new index file, so other processes see it replaced and reload.
+            self._rewrite_index()
+            self._index_id = _file_id(self._index_path)
+
+    def iter_batches(self, batch_size: int = 500) -> Iterator[dict]:
+        start = 0
+        while True:
+            with self._lock:
+                self._catch_up()
+                end = min(start + batch_size, len(self._ids))
+                if start >= end or self._matrix is None:
+                    return
+                batch = {
+                    "ids": self._ids[start:end],
+                    "documents": self._documents[start:end],
+                    "metadatas": self._metadatas[start:end],
+                    "embeddings": np.array(self._matrix[start:end]),
+                }
+            yield batch
+            start = end
+
+    def close(self) -> None:
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
+            self._matrix = None
+        self._lock.close()
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _parse_lines(lines: list[str]) -> list[dict]:
+    entries = []
+    for line in lines:
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            break
+    return entries
+
+
+def _file_id(path: Path) -> tuple[int, int] | None:
+    """(inode, size) of ``path``: a new inode means it was rewritten, a new size appended to."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_size
+
+
+def _index_line(item_id: str, row: int, document: str, metadata: dict) -> str:
+    entry = {"id": item_id, "row": row, "document": document, "metadata": metadata}
+    return json.dumps(entry, separators=(",", ":")) + "\n"
@@ -1,36 +1,181 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import tempfile
+from dataclasses import asdict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import date
 from pathlib import Path
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.requests import Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel, Field
 
-from shelfie.config import get_settings
-from shelfie.models import Direction, Read, ReadStatus
-from shelfie.services.book_lookup import search_books
+from shelfie.apis import health, http_client, openai_client
+from shelfie.apis.cache import (
+    close_caches,
+    get_embedding_cache,
+    get_metadata_store,
+    get_response_cache,
+)
+from shelfie.config import Settings, get_settings
+from shelfie.models import BookSearchResult, Direction, Read, ReadStatus, RecommendationSession
+from shelfie.services.async_facade import (
+    AsyncReadService,
+    AsyncRecommendationEngine,
+    ThreadRunner,
+)
+from shelfie.services.book_lookup import search_books_async
+from shelfie.services.export import ExportService
 from shelfie.services.reads import ReadService
 from shelfie.services.recommendations import RecommendationEngine
 from shelfie.storage import Storage
 
 _HERE = Path(__file__).resolve().parent
-
-app = FastAPI(title="Shelfie", docs_url="/docs")
+_PAGE_SIZE = 50
+_MAX_PAGE_SIZE = 500
+
+
+class _AppServices:
+    """Storage, services and worker pool shared by every request."""
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.storage = Storage(settings)
+        self.runner = ThreadRunner(max_workers=settings.io_worker_threads)
+        self.read_service = ReadService(self.storage, settings)
+        self.reads = AsyncReadService(self.read_service, self.runner)
+        self.recommendations = AsyncRecommendationEngine(
+            RecommendationEngine(self.storage, settings), self.runner
+        )
+        self.export = ExportService(self.storage, settings)
+        # Requests (and detached imports) still using these services; only
+        # touched on the event loop.
+        self.users = 0
+        self.retired = False
+        if settings.enrichment_background:
+            self.read_service.start_enrichment()
+
+    def close(self) -> None:
+        self.read_service.stop_enrichment()
+        self.runner.shutdown()
+        self.storage.close()
+
+
+_services: _AppServices | None = None
+_services_lock = asyncio.Lock()
+# Replaced services still in use by a request; closed when their last one ends.
+_retired: set[_AppServices] = set()
+_request_services: ContextVar[_AppServices | None] = ContextVar(
+    "shelfie_request_services", default=None
+)
+
+
+async def _current_services() -> _AppServices:
+    """Return the app-wide services, rebuilding them only if settings changed.
+
+    The services they replace stop their enrichment worker at once and are
+    closed (storage, worker pool, HTTP clients) when the last request
+    using them has finished.
+    """
+    global _services
+    settings = get_settings()
+    if _services is None or _services.settings is not settings:
+        async with _services_lock:
+            if _services is None or _services.settings is not settings:
+                previous = _services
+                if previous is not None:
+                    http_client.configure(settings)
+                _services = await asyncio.to_thread(_AppServices, settings)
+                if previous is not None:
+                    previous.retired = True
+                    _retired.add(previous)
+                    await asyncio.to_thread(previous.read_service.stop_enrichment)
+                    if previous.users == 0:
+                        await _close_retired(previous)
+    return _services
+
+
+async def _request_app_services() -> _AppServices:
+    """The services pinned to the current request, or the current ones outside a request."""
+    return _request_services.get() or await _current_services()
+
+
+async def _get_services() -> tuple[AsyncReadService, AsyncRecommendationEngine]:
+    services = await _request_app_services()
+    return services.reads, services.recommendations
+
+
+async def _release(services: _AppServices) -> None:
+    services.users -= 1
+    if services.retired and services.users == 0:
+        await _close_retired(services)
+
+
+async def _close_retired(services: _AppServices) -> None:
+    _retired.discard(services)
+    await asyncio.to_thread(services.close)
+    if not _retired:
+        await http_client.aclose_retired()
+
+
+class _PinServices:
+    """ASGI middleware giving each HTTP request one generation of services.
+
+    A request keeps the services it started with until its response has
+    been sent in full (streams included), even if ``.env`` changes
+    meanwhile, so a reload never closes storage under it.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        services = await _current_services()
+        services.users += 1
+        token = _request_services.set(services)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_services.reset(token)
+            await _release(services)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _services
+    http_client.configure(get_settings())
+    health.configure(get_settings())
+    await _current_services()
+    yield
+    health.save()
+    if _services is not None:
+        await _services.recommendations.aclose()
+    for services in [*_retired, *([_services] if _services else [])]:
+        await asyncio.to_thread(services.close)
+    _retired.clear()
+    _services = None
+    # Clients opened outside the services (search) and on earlier loops.
+    await http_client.aclose_clients()
+    await openai_client.aclose_clients()
+    close_caches()
+
+
+app = FastAPI(title="Shelfie", docs_url="/docs", lifespan=lifespan)
+app.add_middleware(_PinServices)
 app.mount("/static", StaticFiles(directory=_HERE / "static"), name="static")
 _templates = Jinja2Templates(directory=_HERE / "templates")
 
 
-def _get_services() -> tuple[ReadService, RecommendationEngine]:
-    settings = get_settings()
-    storage = Storage(settings)
-    return ReadService(storage, settings), RecommendationEngine(storage, settings)
-
-
 # ── Pages ─────────────────────────────────────────────────────────────
 
 
@@ -43,12 +188,49 @@ async def index(request: Request):
 
 
 @app.get("/api/search")
-async def api_search(q: str = Query(..., min_length=1)):
+async def api_search(q: str = Query(..., min_length=1), refresh: bool = False):
     settings = get_settings()
-    results = search_books(q, google_api_key=settings.google_books_api_key)
+    # Opening the SQLite stores (first request, or after a settings change) is disk I/O.
+    cache, metadata = await asyncio.to_thread(
+        lambda: (get_response_cache(settings), get_metadata_store(settings))
+    )
+    results = await search_books_async(
+        q,
+        google_api_key=settings.google_books_api_key,
+        cache=cache,
+        refresh=refresh,
+        merge=settings.search_merge_providers,
+        metadata=metadata,
+    )
     return [r.model_dump() for r in results]
 
 
+@app.get("/api/cache")
+async def api_cache_stats():
+    settings = get_settings()
+
+    def store_stats() -> dict:
+        stores = {
+            "responses": get_response_cache(settings),
+            "embeddings": get_embedding_cache(settings),
+            "book_metadata": get_metadata_store(settings),
+        }
+        return {name: store.stats() if store else None for name, store in stores.items()}
+
+    stats = await asyncio.to_thread(store_stats)
+    sessions = None
+    if settings.session_cache_enabled:
+        _, rec_engine = await _get_services()
+        sessions = await rec_engine.session_cache_stats()
+    return {**stats, "sessions": sessions}
+
+
+@app.get("/api/health")
+async def api_health():
+    """Per book API: breaker state, recent calls, error rate and p50/p95/p99 latency."""
+    return health.snapshot()
+
+
 # ── API: Reads ────────────────────────────────────────────────────────
 
 
@@ -64,7 +246,7 @@ class LogReadRequest(BaseModel):
 
 @app.post("/api/reads")
 async def api_log_read(body: LogReadRequest):
-    read_service, _ = _get_services()
+    read_service, _ = await _get_services()
 
     status_map = {
         "read": ReadStatus.READ,
@@ -94,31 +276,154 @@ async def api_log_read(body: LogReadRequest):
     )
 
     try:
-        read = read_service.log_read(read)
+        read = await read_service.log_read(read)
     except ValueError as exc:
         raise HTTPException(status_code=409, detail=str(exc))
 
-    return read.model_dump(mode="json")
+    return await _with_enrichment(read_service, read)
+
+
+async def _with_enrichment(read_service: AsyncReadService, read: Read) -> dict:
+    """A read plus the state of its background ISBN / embedding jobs."""
+    return {
+        **read.model_dump(mode="json"),
+        "enrichment": await read_service.enrichment_status(read.id),
+    }
+
+
+async def _with_details(read_service: AsyncReadService, read: Read) -> dict:
+    """:func:`_with_enrichment` plus the book's stored provider metadata."""
+    books = await read_service.book_metadata([read]) if read.isbn else {}
+    return {**await _with_enrichment(read_service, read), "book": _book_json(books.get(read.id))}
+
+
+def _set_next_cursor(response: Response, next_cursor: str | None) -> None:
+    """Listings return a plain JSON array; the cursor for the next page rides in a header."""
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
 
 @app.get("/api/reads")
 async def api_list_reads(
+    response: Response,
     status: Optional[str] = None,
     min_rating: Optional[int] = None,
     year: Optional[int] = None,
+    limit: int = Query(_PAGE_SIZE, ge=1, le=_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    metadata: bool = False,
 ):
-    read_service, _ = _get_services()
-    reads = read_service.list_reads(status=status, min_rating=min_rating, year=year)
-    return [r.model_dump(mode="json") for r in reads]
+    """With ``metadata=true`` each read carries a ``book`` object (pages,
+    categories, description...), fetched for the whole page in a few batched
+    requests."""
+    read_service, _ = await _get_services()
+    try:
+        page = await read_service.list_reads(
+            status=status, min_rating=min_rating, year=year, limit=limit, cursor=cursor
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    _set_next_cursor(response, page.next_cursor)
+    if not metadata:
+        return [r.model_dump(mode="json") for r in page.items]
+    books = await read_service.book_metadata(page.items)
+    return [
+        {**r.model_dump(mode="json"), "book": _book_json(books.get(r.id))}
+        for r in page.items
+    ]
+
+
+def _book_json(book: BookSearchResult | None) -> dict | None:
+    return book.model_dump() if book else None
 
 
 @app.get("/api/reads/{read_id}")
 async def api_get_read(read_id: str):
-    read_service, _ = _get_services()
-    read = read_service.get_read(read_id)
+    read_service, _ = await _get_services()
+    read = await read_service.get_read(read_id)
     if not read:
         raise HTTPException(status_code=404, detail="Read not found")
-    return read.model_dump(mode="json")
+    return await _with_details(read_service, read)
+
+
+@app.get("/api/jobs")
+async def api_jobs():
+    """Enrichment job counts by status (pending, running, done, failed)."""
+    read_service, _ = await _get_services()
+    return await read_service.enrichment_counts()
+
+
+@app.post("/api/import")
+async def api_import(request: Request, resolve_isbns: bool = True):
+    """Import a Goodreads / StoryGraph CSV sent as the raw request body.
+
+    Server-sent events: ``progress`` after every committed chunk, then
+    ``done`` (or ``error``). Re-posting the same file resumes an
+    interrupted import.
+    """
+    services = await _request_app_services()
+    read_service = services.reads
+    settings = get_settings()
+    settings.import_checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+    # Spool the upload to disk as it arrives rather than holding it in memory.
+    upload = tempfile.NamedTemporaryFile(
+        dir=settings.import_checkpoint_dir, prefix="upload-", suffix=".csv", delete=False
+    )
+    try:
+        async for block in request.stream():
+            await asyncio.to_thread(upload.write, block)
+    finally:
+        upload.close()
+    path = Path(upload.name)
+
+    loop = asyncio.get_running_loop()
+    progress: asyncio.Queue[dict | None] = asyncio.Queue()
+
+    def on_progress(result) -> None:
+        loop.call_soon_threadsafe(progress.put_nowait, asdict(result))
+
+    async def run():
+        # Outlives the request if the client goes away, so it holds the services too.
+        services.users += 1
+        try:
+            return await read_service.import_csv(
+                path, resolve_isbns=resolve_isbns, on_progress=on_progress
+            )
+        finally:
+            progress.put_nowait(None)
+            await _release(services)
+
+    async def events():
+        task = asyncio.create_task(run())
+        try:
+            while (update := await progress.get()) is not None:
+                yield _sse("progress", update)
+            yield _sse("done", asdict(await task))
+        except Exception as exc:
+            yield _sse("error", {"detail": str(exc)})
+        finally:
+            # A disconnected client doesn't stop the import; clean up once it ends.
+            task.add_done_callback(lambda _: path.unlink(missing_ok=True))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/export")
+async def api_export():
+    """The whole library as NDJSON, streamed record by record."""
+    services = await _request_app_services()
+    # A sync iterator: Starlette pulls it on a worker thread, so paging
+    # through the stores never blocks the event loop.
+    return StreamingResponse(
+        services.export.iter_ndjson(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="shelfie-export.ndjson"'},
+    )
 
 
 # ── API: Recommendations ─────────────────────────────────────────────
@@ -127,11 +432,12 @@ async def api_get_read(read_id: str):
 class RecommendRequest(BaseModel):
     mood: str
     direction: str = "balance"
+    refresh: bool = False
 
 
 @app.post("/api/recommend")
 async def api_recommend(body: RecommendRequest):
-    _, rec_engine = _get_services()
+    _, rec_engine = await _get_services()
 
     try:
         direction = Direction(body.direction)
@@ -139,7 +445,7 @@ async def api_recommend(body: RecommendRequest):
         direction = Direction.BALANCE
 
     try:
-        session = await rec_engine.recommend(body.mood, direction)
+        session = await rec_engine.recommend(body.mood, direction, refresh=body.refresh)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
     except Exception as exc:
@@ -148,8 +454,47 @@ async def api_recommend(body: RecommendRequest):
     return session.model_dump(mode="json")
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.get("/api/recommend/stream")
+async def api_recommend_stream(
+    mood: str = Query(..., min_length=1), direction: str = "balance", refresh: bool = False
+):
+    """Server-sent events: one ``recommendation`` per pick as it arrives, then ``session``."""
+    _, rec_engine = await _get_services()
+
+    try:
+        direction_choice = Direction(direction)
+    except ValueError:
+        direction_choice = Direction.BALANCE
+
+    async def events():
+        try:
+            async for item in rec_engine.recommend_stream(mood, direction_choice, refresh=refresh):
+                event = "session" if isinstance(item, RecommendationSession) else "recommendation"
+                yield _sse(event, item.model_dump(mode="json"))
+        except Exception as exc:
+            yield _sse("error", {"detail": str(exc)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/sessions")
-async def api_list_sessions():
-    _, rec_engine = _get_services()
-    sessions = rec_engine.get_sessions()
-    return [s.model_dump(mode="json") for s in sessions]
+async def api_list_sessions(
+    response: Response,
+    limit: int = Query(_PAGE_SIZE, ge=1, le=_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    _, rec_engine = await _get_services()
+    try:
+        page = await rec_engine.get_sessions(limit=limit, cursor=cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    _set_next_cursor(response, page.next_cursor)
+    return [s.model_dump(mode="json") for s in page.items]
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+
+from shelfie import web
+from shelfie.config import Settings
+from shelfie.models import Page, Read
+from shelfie.services.reads import ReadService
+
+DELAY = 0.5
+REQUESTS = 4
+
+
+def test_concurrent_requests_overlap(tmp_path, monkeypatch):
+    """Blocking service calls run on the worker pool, so slow requests don't queue up behind each other."""
+    settings = Settings(
+        _env_file=None,
+        myreads_data_dir=tmp_path,
+        enrichment_background=False,
+        io_worker_threads=REQUESTS,
+    )
+
+    def slow_list_reads(self, *args, **kwargs) -> Page[Read]:
+        time.sleep(DELAY)
+        return Page[Read](items=[], next_cursor=None)
+
+    monkeypatch.setattr(ReadService, "list_reads", slow_list_reads)
+    monkeypatch.setattr(web, "get_settings", lambda: settings)
+    services = web._AppServices(settings)
+    monkeypatch.setattr(web, "_services", services)
+
+    async def run() -> float:
+        transport = httpx.ASGITransport(app=web.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(
+                *(client.get("/api/reads") for _ in range(REQUESTS))
+            )
+            elapsed = time.perf_counter() - start
+        assert [r.status_code for r in responses] == [200] * REQUESTS
+        return elapsed
+
+    try:
+        elapsed = asyncio.run(run())
+    finally:
+        services.close()
+
+    # Run one after another they'd take REQUESTS * DELAY (2 s).
+    assert elapsed < REQUESTS * DELAY / 2